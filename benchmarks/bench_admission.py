@@ -0,0 +1,90 @@
+"""
+Benchmark latency under an overload spike with and without admission control.
+
+Sends a burst of concurrent requests straight into an ASGI endpoint that
+spends about a millisecond of CPU per request, as a move does, mixing moves
+with listing requests. Without admission control every request is accepted
+and all of them slow down together; with it, moves go first and requests
+that would wait past the queue time limit are shed with 503.
+
+Usage:
+    python -m benchmarks.bench_admission [requests]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from typing import Dict, List
+from starlette.types import ASGIApp
+from src.backend.middleware.admission import AdmissionControlMiddleware, AdmissionController
+
+WORK_SECONDS = 0.001
+LISTINGS_PER_MOVE = 3
+
+
+async def endpoint(scope, receive, send):
+    """Spend WORK_SECONDS of CPU across two awaits, like a handler that touches storage."""
+    for _ in range(2):
+        deadline = time.perf_counter() + WORK_SECONDS / 2
+        while time.perf_counter() < deadline:
+            pass
+        await asyncio.sleep(0)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def burst(app: ASGIApp, requests: int) -> Dict[str, List[float]]:
+    """Send requests at once. Returns latencies in seconds by 'move', 'listing' and 'shed'."""
+    results: Dict[str, List[float]] = {"move": [], "listing": [], "shed": []}
+
+    async def one(index: int) -> None:
+        is_move = index % (LISTINGS_PER_MOVE + 1) == 0
+        scope = {
+            "type": "http",
+            "method": "POST" if is_move else "GET",
+            "path": "/game/bench/move" if is_move else "/creatures",
+        }
+        status = []
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+
+        started = time.perf_counter()
+        await app(scope, None, send)
+        elapsed = time.perf_counter() - started
+        results["shed" if status[0] == 503 else "move" if is_move else "listing"].append(elapsed)
+
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    return results
+
+
+def report(name: str, results: Dict[str, List[float]]) -> None:
+    """Print latency percentiles for served requests and the shed count."""
+    print(name)
+    for kind in ("move", "listing"):
+        latencies = sorted(results[kind])
+        if not latencies:
+            print(f"  {kind:8} none served")
+            continue
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(
+            f"  {kind:8} {len(latencies):5} served  p50 {statistics.median(latencies) * 1000:7.1f} ms"
+            f"  p99 {p99 * 1000:7.1f} ms"
+        )
+    print(f"  shed     {len(results['shed']):5}")
+
+
+def main(requests: int = 4000) -> None:
+    """Run the same burst without and with admission control."""
+    report("no admission control", asyncio.run(burst(endpoint, requests)))
+    controller = AdmissionController(max_concurrent=16, max_queue=1000, max_queue_seconds=0.5)
+    report(
+        "admission control (16 concurrent, 0.5 s queue limit)",
+        asyncio.run(burst(AdmissionControlMiddleware(endpoint, controller), requests))
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4000)
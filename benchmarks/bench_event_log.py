@@ -0,0 +1,119 @@
+"""
+Benchmark the event log: per-move latency with the journal off and on, replay
+time after a restart, and how much compaction shrinks the log.
+
+Plays moves through the same code path as POST /game/{game_id}/move, first
+without a journal and then with one (batched fsync running), then replays the
+log into empty stores and compacts it.
+
+Usage:
+    python -m benchmarks.bench_event_log [moves]
+"""
+
+import asyncio
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from typing import List, Optional
+from src.backend.logic import journal
+from src.backend.logic.journal import GameJournal
+from src.backend.logic.tournament import TournamentManager
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.models.game_state import GameState
+from src.backend.routes import creature_routes, game_routes
+from src.backend.storage import EventLog, MemoryStore
+from .bench_persistence import report
+
+GAMES = 200
+
+
+def new_game(serial: int, game_journal: Optional[GameJournal]) -> GameState:
+    """A 4-creature tournament with one player creature, recorded like POST /game/start."""
+    creature = Creature.create_with_biases(name=f"Bench{serial}", creature_type=CreatureType.DRAGON)
+    creature.id = f"bench-creature-{serial}"
+    tournament = TournamentManager.create_tournament([creature], tournament_size=4)
+    game = GameState(game_id=f"bench-game-{serial}", num_players=1, player_creatures=[creature], tournament=tournament)
+    game_routes.games_db[game.game_id] = game
+    creature_routes.creatures_db[creature.id] = creature
+    if game_journal is not None:
+        game_journal.record([journal.creature_created(creature), journal.game_started(game)])
+    return game
+
+
+async def play(moves: int, game_journal: Optional[GameJournal]) -> List[float]:
+    """Play moves round-robin across GAMES games and return per-move latencies in seconds."""
+    game_routes.game_journal = game_journal
+    slots = [new_game(serial, game_journal).game_id for serial in range(GAMES)]
+    serial = GAMES
+    if game_journal is not None:
+        game_journal.log.start()
+
+    latencies = []
+    index = 0
+    while len(latencies) < moves:
+        slot = index % GAMES
+        game = game_routes.games_db[slots[slot]]
+        index += 1
+        if game.get_current_match() is None:
+            slots[slot], serial = new_game(serial, game_journal).game_id, serial + 1
+            continue
+        request = game_routes.SubmitMoveRequest(creature_id=game.player_creatures[0].id, move_type="attack")
+        started = time.perf_counter()
+        try:
+            await game_routes.play_move(game.game_id, request)
+        except game_routes.HTTPException:
+            # The player was knocked out; start over
+            slots[slot], serial = new_game(serial, game_journal).game_id, serial + 1
+            continue
+        latencies.append(time.perf_counter() - started)
+        # Let the fsync task run between requests, as it would between real ones
+        await asyncio.sleep(0)
+
+    if game_journal is not None:
+        await game_journal.log.stop()
+    return latencies
+
+
+def main(moves: int = 5000) -> None:
+    """Run the benchmark with the journal off, then on, then replay and compact."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        game_routes.games_db = MemoryStore("games")
+        creature_routes.creatures_db = MemoryStore("creatures")
+        plain = asyncio.run(play(moves, None))
+
+    with tempfile.TemporaryDirectory() as directory:
+        log = EventLog(directory)
+        with contextlib.redirect_stdout(io.StringIO()):
+            game_routes.games_db = MemoryStore("games")
+            creature_routes.creatures_db = MemoryStore("creatures")
+            journaled = asyncio.run(play(moves, GameJournal(log)))
+        stats = log.stats()
+
+        reopened = GameJournal(EventLog(directory))
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            reopened.replay(MemoryStore("games"), MemoryStore("creatures"))
+        replay_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = asyncio.run(reopened.compact())
+        compact_seconds = time.perf_counter() - started
+        reopened.log.close()
+
+    report("no journal", plain)
+    report("journal", journaled)
+    print(
+        f"appended {stats['bytes_appended'] / stats['appends']:.0f} bytes per write on average, "
+        f"{stats['fsyncs']} fsyncs for {stats['appends']} writes"
+    )
+    print(f"replayed {reopened.replayed} events in {replay_seconds:.2f} s")
+    print(
+        f"compacted {result['records_in']} records to {result['records_out']} "
+        f"({result['games_folded']} finished games folded) in {compact_seconds:.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
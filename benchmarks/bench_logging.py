@@ -0,0 +1,85 @@
+"""
+Benchmark the cost of diagnostics in GameState.get_current_match.
+
+Compares the old behaviour (a print() per incomplete match, to a file so the
+terminal is not measured) with the logger at its default INFO level, where
+the debug lines cost one level check, and at DEBUG through the queued log
+pipeline, where the caller only builds and enqueues records, with and
+without sampling.
+
+Usage:
+    python -m benchmarks.bench_logging [iterations]
+"""
+
+import logging
+import os
+import sys
+import timeit
+from contextlib import redirect_stdout
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.models.game_state import GameState, Match, TournamentBracket
+from src.backend.observability import LogPipeline
+
+STATS = {"strength": 10, "defense": 5, "speed": 5, "health": 20, "luck": 1}
+MATCHES = 8
+
+
+def make_game() -> GameState:
+    """A 16-creature bracket whose player's match is listed last."""
+    creatures = [
+        Creature(
+            id=f"c{index}", name=f"Creature {index}", creature_type=CreatureType.DRAGON,
+            base_stats=STATS, stat_allocations=STATS, is_ai=index != 0, current_hp=20, max_hp=20
+        )
+        for index in range(MATCHES * 2)
+    ]
+    matches = [
+        Match(match_id=f"m{index}", creature1=creatures[index * 2], creature2=creatures[index * 2 + 1], bracket_round=0)
+        for index in range(MATCHES)
+    ]
+    matches.reverse()
+    bracket = TournamentBracket(bracket_id="bench", total_rounds=4, matches=matches)
+    return GameState(game_id="bench", num_players=1, player_creatures=[creatures[0]], tournament=bracket)
+
+
+def print_current_match(game: GameState) -> Match:
+    """get_current_match as it was: one print() per incomplete match."""
+    player_ids = {creature.id for creature in game.player_creatures}
+    for match in game.tournament.matches:
+        if not match.is_complete:
+            print(f"[DEBUG] Inspecting match {match.match_id}: {match.creature1.name} ({match.creature1.id}) "
+                  f"vs {match.creature2.name} ({match.creature2.id})")
+            if match.creature1.id in player_ids or match.creature2.id in player_ids:
+                return match
+    return None
+
+
+def main(iterations: int = 20_000) -> None:
+    """Print microseconds per get_current_match call."""
+    game = make_game()
+    with open(os.devnull, "w") as devnull:
+        with redirect_stdout(devnull):
+            seconds = min(timeit.repeat(lambda: print_current_match(game), number=iterations, repeat=5))
+        print(f"{'print() per match':28} {seconds / iterations * 1e6:7.2f} us")
+
+        pipeline = LogPipeline(level=logging.INFO, stream=devnull)
+        pipeline.start()
+        try:
+            seconds = min(timeit.repeat(game.get_current_match, number=iterations, repeat=5))
+            print(f"{'logger at INFO':28} {seconds / iterations * 1e6:7.2f} us")
+        finally:
+            pipeline.stop()
+
+        for name, sample_rate in (("logger at DEBUG (queued)", 1.0), ("logger at DEBUG, 1% sampled", 0.01)):
+            pipeline = LogPipeline(level=logging.DEBUG, sample_rate=sample_rate, stream=devnull)
+            pipeline.start()
+            try:
+                seconds = min(timeit.repeat(game.get_current_match, number=iterations, repeat=5))
+                print(f"{name:28} {seconds / iterations * 1e6:7.2f} us")
+            finally:
+                pipeline.stop()
+        logging.getLogger("src.backend").setLevel(logging.NOTSET)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,41 @@
+"""
+Benchmark the cost of recording a metric.
+
+Times Counter.inc, Histogram.observe, a labelled histogram lookup plus
+observe (what the request middleware does), and rendering /metrics.
+
+Usage:
+    python -m benchmarks.bench_metrics [iterations]
+"""
+
+import sys
+import timeit
+from src.backend.observability import Registry
+
+
+def main(iterations: int = 1_000_000) -> None:
+    """Print nanoseconds per operation."""
+    registry = Registry()
+    counter = registry.counter("bench_total", "Bench counter.")
+    histogram = registry.histogram("bench_seconds", "Bench histogram.")
+    by_route = registry.histogram("bench_route_seconds", "Bench histogram by route.", ("method", "route", "status"))
+    for route in range(20):
+        by_route.labels("GET", f"/route/{route}", "200").observe(0.01)
+
+    cases = [
+        ("Counter.inc()", lambda: counter.inc()),
+        ("Histogram.observe()", lambda: histogram.observe(0.0123)),
+        ("labels(...).observe()", lambda: by_route.labels("GET", "/route/7", "200").observe(0.0123)),
+    ]
+    baseline = min(timeit.repeat(lambda: None, number=iterations, repeat=5)) / iterations
+    for name, operation in cases:
+        seconds = min(timeit.repeat(operation, number=iterations, repeat=5)) / iterations
+        print(f"{name:24} {(seconds - baseline) * 1e9:6.0f} ns")
+
+    renders = 200
+    seconds = timeit.timeit(registry.render, number=renders) / renders
+    print(f"{'render (22 series)':24} {seconds * 1e6:6.0f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,110 @@
+"""
+Benchmark submit_move latency with SQLite persistence off and on.
+
+Plays moves through the same code path as POST /game/{game_id}/move, first
+against the in-memory stores and then against SQLite-backed stores with the
+write-behind flusher running, and reports per-move latency percentiles.
+
+Usage:
+    python -m benchmarks.bench_persistence [moves]
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+from src.backend.logic.tournament import TournamentManager
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.models.game_state import GameState
+from src.backend.routes import creature_routes, game_routes
+from src.backend.storage import MemoryStore, PersistentStore, SQLiteRepository, WriteBehindFlusher
+
+GAMES = 200
+
+
+def new_game(index: int) -> GameState:
+    """A 4-creature tournament with one player creature."""
+    creature = Creature.create_with_biases(name=f"Bench{index}", creature_type=CreatureType.DRAGON)
+    creature.id = f"bench-creature-{index}"
+    tournament = TournamentManager.create_tournament([creature], tournament_size=4)
+    return GameState(game_id=f"bench-game-{index}", num_players=1, player_creatures=[creature], tournament=tournament)
+
+
+async def play(moves: int, flusher: WriteBehindFlusher = None) -> List[float]:
+    """Play moves round-robin across GAMES games and return per-move latencies in seconds."""
+    games = game_routes.games_db
+    for index in range(GAMES):
+        game = new_game(index)
+        games[game.game_id] = game
+        creature_routes.creatures_db[game.player_creatures[0].id] = game.player_creatures[0]
+    if flusher is not None:
+        flusher.start()
+
+    latencies = []
+    index = 0
+    while len(latencies) < moves:
+        game = games[f"bench-game-{index % GAMES}"]
+        index += 1
+        match = game.get_current_match()
+        if match is None:
+            replacement = new_game(index % GAMES)
+            games[replacement.game_id] = replacement
+            continue
+        request = game_routes.SubmitMoveRequest(creature_id=game.player_creatures[0].id, move_type="attack")
+        started = time.perf_counter()
+        try:
+            await game_routes.play_move(game.game_id, request)
+        except game_routes.HTTPException:
+            # The player was knocked out; start over
+            replacement = new_game(index % GAMES)
+            games[replacement.game_id] = replacement
+            continue
+        latencies.append(time.perf_counter() - started)
+        # Let the flusher run between requests, as it would between real ones
+        await asyncio.sleep(0)
+
+    if flusher is not None:
+        await flusher.stop()
+    return latencies
+
+
+def report(label: str, latencies: List[float]) -> None:
+    """Print latency percentiles in microseconds."""
+    ordered = sorted(latencies)
+    p50 = ordered[len(ordered) // 2] * 1e6
+    p99 = ordered[int(len(ordered) * 0.99)] * 1e6
+    mean = statistics.fmean(ordered) * 1e6
+    print(f"{label:>12}: mean {mean:8.1f} us  p50 {p50:8.1f} us  p99 {p99:8.1f} us")
+
+
+def main(moves: int = 5000) -> None:
+    """Run the benchmark with persistence off, then on."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        game_routes.games_db = MemoryStore("games")
+        creature_routes.creatures_db = MemoryStore("creatures")
+        memory = asyncio.run(play(moves))
+
+    with tempfile.TemporaryDirectory() as directory:
+        repository = SQLiteRepository(os.path.join(directory, "bench.db"))
+        games = PersistentStore("games", repository)
+        creatures = PersistentStore("creatures", repository)
+        with contextlib.redirect_stdout(io.StringIO()):
+            game_routes.games_db = games
+            creature_routes.creatures_db = creatures
+            persistent = asyncio.run(play(moves, WriteBehindFlusher([games, creatures], interval_seconds=0.05)))
+        rows = games.rows_written
+        flushes = games.flushes
+        repository.close()
+
+    report("memory", memory)
+    report("sqlite", persistent)
+    print(f"sqlite flushes: {flushes}, game rows written: {rows} for {moves} moves")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,60 @@
+"""
+Benchmark the overhead of the request profiling middleware.
+
+Sends requests straight into a small ASGI endpoint: without the middleware
+(profiling off, the default, where it is not installed), with it installed
+but the request not picked, and with every request profiled and saved to a
+temporary directory.
+
+Usage:
+    python -m benchmarks.bench_profiling [requests]
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from starlette.types import ASGIApp
+from src.backend.middleware.profiling import ProfilingMiddleware
+from src.backend.observability import ProfileStore, RequestProfiler
+
+HEADERS = [(b"host", b"localhost"), (b"accept", b"application/json"), (b"user-agent", b"bench")]
+
+
+async def endpoint(scope, receive, send):
+    """Do a little Python work, as a handler does, and answer."""
+    sorted(range(200), key=str)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def run(app: ASGIApp, requests: int, headers) -> float:
+    """Seconds per request, sent one after another."""
+    scope = {"type": "http", "method": "GET", "path": "/creatures", "headers": headers}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(scope, None, send)
+    return (time.perf_counter() - started) / requests
+
+
+def main(requests: int = 20_000) -> None:
+    """Print microseconds per request for each configuration."""
+    with tempfile.TemporaryDirectory() as directory:
+        profiler = RequestProfiler(ProfileStore(directory, max_profiles=20), token="bench")
+        middleware = ProfilingMiddleware(endpoint, profiler)
+        cases = [
+            ("no middleware", endpoint, HEADERS, requests),
+            ("installed, not picked", middleware, HEADERS, requests),
+            ("every request profiled", middleware, HEADERS + [(b"x-profile-token", b"bench")], max(1, requests // 100)),
+        ]
+        for name, app, headers, count in cases:
+            seconds = min(asyncio.run(run(app, count, headers)) for _ in range(3))
+            print(f"{name:24} {seconds * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,79 @@
+"""
+Benchmark the per-request overhead of the rate limiting middleware.
+
+Sends requests straight into ASGI apps (no server or sockets) and compares a
+bare endpoint with the same endpoint behind the previous BaseHTTPMiddleware
+limiter and behind the ASGI RateLimitMiddleware. Every request comes from a
+different client so none are rejected.
+
+Usage:
+    python -m benchmarks.bench_rate_limit_middleware [requests]
+"""
+
+import asyncio
+import sys
+import time
+from fastapi import HTTPException, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp
+from src.backend.middleware.rate_limit import RateLimitMiddleware, TokenBucketLimiter
+
+
+async def endpoint(scope, receive, send):
+    """A minimal JSON endpoint."""
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+class BaseHTTPRateLimit(BaseHTTPMiddleware):
+    """The previous middleware: the same token bucket behind BaseHTTPMiddleware."""
+
+    def __init__(self, app, requests_per_minute: int = 60):
+        super().__init__(app)
+        self.limiter = TokenBucketLimiter(requests_per_minute, requests_per_minute / 60.0)
+
+    async def dispatch(self, request: Request, call_next):
+        client_ip = (request.client.host if request.client else None) or "unknown"
+        if self.limiter.acquire(client_ip):
+            raise HTTPException(status_code=429, detail="Too many requests. Please try again later.")
+        return await call_next(request)
+
+
+async def drive(app: ASGIApp, requests: int) -> float:
+    """Send requests to app and return microseconds per request."""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    scopes = [
+        {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": "/game/bench/move", "raw_path": b"/game/bench/move", "root_path": "",
+            "query_string": b"", "headers": [], "client": (f"10.0.{i >> 8 & 255}.{i & 255}", 50000),
+            "server": ("testserver", 80),
+        }
+        for i in range(requests)
+    ]
+    started = time.perf_counter()
+    for scope in scopes:
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main(requests: int = 50_000) -> None:
+    """Time the bare endpoint and both middlewares."""
+    apps = [
+        ("no middleware", endpoint),
+        ("BaseHTTPMiddleware", BaseHTTPRateLimit(endpoint)),
+        ("ASGI middleware", RateLimitMiddleware(endpoint)),
+    ]
+    results = {name: asyncio.run(drive(app, requests)) for name, app in apps}
+    bare = results["no middleware"]
+    for name, micros in results.items():
+        print(f"{name:20} {micros:7.2f} us/request  (+{micros - bare:.2f} us)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,74 @@
+"""
+Benchmark the cost of building and encoding a game state response.
+
+Compares the previous path (hand-built dict, jsonable_encoder, JSONResponse)
+with the shared serializer and FastJSONResponse.
+
+Usage:
+    python -m benchmarks.bench_serialization [iterations]
+"""
+
+import sys
+import timeit
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from src.backend.logic.tournament import TournamentManager
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.models.game_state import GameState
+from src.backend.routes.serializers import FastJSONResponse, orjson, serialize_game_state
+
+
+def make_game() -> GameState:
+    """Create an 8-creature tournament game with one player creature."""
+    creature = Creature.create_with_biases(name="Bench", creature_type=CreatureType.DRAGON)
+    creature.id = "bench-creature"
+    tournament = TournamentManager.create_tournament([creature], tournament_size=8)
+    return GameState(game_id="bench-game", num_players=1, player_creatures=[creature], tournament=tournament)
+
+
+def legacy_state_response(game: GameState) -> bytes:
+    """The per-route dict building and encoding used before the shared serializer."""
+    current_match = game.get_current_match()
+    match_state = {
+        "match_id": current_match.match_id,
+        "creature1_id": current_match.creature1.id,
+        "creature1_name": current_match.creature1.name,
+        "creature1_type": current_match.creature1.creature_type.value,
+        "creature1_hp": current_match.creature1.current_hp,
+        "creature1_max_hp": current_match.creature1.max_hp,
+        "creature2_id": current_match.creature2.id,
+        "creature2_name": current_match.creature2.name,
+        "creature2_type": current_match.creature2.creature_type.value,
+        "creature2_hp": current_match.creature2.current_hp,
+        "creature2_max_hp": current_match.creature2.max_hp,
+        "turn_number": current_match.turn_number,
+        "bracket_round": current_match.bracket_round,
+        "current_round": current_match.turn_number,
+        "is_complete": current_match.is_complete,
+        "winner_name": None
+    }
+    content = {
+        "game_id": game.game_id,
+        "current_match": match_state,
+        "tournament_complete": game.is_complete,
+        "champion_name": None
+    }
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast_state_response(game: GameState) -> bytes:
+    """The shared serializer with FastJSONResponse."""
+    return FastJSONResponse(serialize_game_state(game)).body
+
+
+def main(iterations: int = 20000) -> None:
+    """Run both paths and print the cost per response."""
+    game = make_game()
+    print(f"orjson available: {orjson is not None}")
+    for label, func in (("legacy", legacy_state_response), ("serializer", fast_state_response)):
+        seconds = timeit.timeit(lambda f=func: f(game), number=iterations)
+        print(f"{label:>10}: {seconds / iterations * 1e6:8.2f} us/response")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
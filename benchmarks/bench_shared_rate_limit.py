@@ -0,0 +1,95 @@
+"""
+Benchmark rate limiting shared between worker processes.
+
+Each worker process opens the shared SQLite database, as a uvicorn worker
+started with PET_BATTLER_STORAGE=shared would, and checks requests for a set
+of clients as fast as it can for a fixed time. With a few flooding clients it
+reports how many requests were admitted against what a single bucket would
+have admitted, relative to the lease tolerance; with many clients under
+their limit it shows how leasing saves database round trips.
+
+Usage:
+    python -m benchmarks.bench_shared_rate_limit [workers] [seconds]
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from src.backend.middleware.rate_limit import SharedTokenBucketLimiter
+from src.backend.storage import SharedSQLiteRepository
+
+FLOODING_CLIENTS = 20
+QUIET_CLIENTS = 20_000
+CAPACITY = 60.0
+RATE_PER_SECOND = 100.0
+
+
+def worker_main(
+    path: str, clients: int, lease_tokens: float, seconds: float, start: multiprocessing.Event, results
+) -> None:
+    """Entry point of one worker process: check requests round-robin over the clients."""
+    limiter = SharedTokenBucketLimiter(
+        SharedSQLiteRepository(path), CAPACITY, RATE_PER_SECOND, lease_tokens=lease_tokens
+    )
+    names = [f"client-{index}" for index in range(clients)]
+    start.wait()
+    admitted = checks = 0
+    started = time.time()
+    deadline = started + seconds
+    while time.time() < deadline:
+        admitted += limiter.acquire(names[checks % clients]) == 0
+        checks += 1
+    results.put((admitted, checks, limiter.round_trips, started, time.time()))
+
+
+def run(workers: int, clients: int, lease_tokens: float, seconds: float) -> None:
+    """Run workers against one database and print accuracy and cost per check."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "limits.db")
+        SharedSQLiteRepository(path).close()
+        start = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=worker_main, args=(path, clients, lease_tokens, seconds, start, results))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        start.set()
+        totals = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    admitted = sum(result[0] for result in totals)
+    checks = sum(result[1] for result in totals)
+    round_trips = sum(result[2] for result in totals)
+    cost = f"{round_trips / checks:.2f} round trips/check, {seconds / checks * workers * 1e6:.1f} us/check"
+    if clients == FLOODING_CLIENTS:
+        # Every client is saturated, so a single bucket admits its burst plus the
+        # refill over the time any worker was sending
+        elapsed = max(result[4] for result in totals) - min(result[3] for result in totals)
+        exact = clients * (CAPACITY + RATE_PER_SECOND * elapsed)
+        tolerance = clients * workers * lease_tokens
+        print(
+            f"  lease {lease_tokens:>4.0f}: admitted {admitted} of {checks} "
+            f"(single bucket {exact:.0f}, off by {admitted - exact:+.0f}, tolerance +/-{tolerance:.0f}), {cost}"
+        )
+    else:
+        print(f"  lease {lease_tokens:>4.0f}: admitted {admitted} of {checks}, {cost}")
+
+
+def main(workers: int = 4, seconds: float = 3.0) -> None:
+    """Compare exact enforcement with leased tokens."""
+    for clients in (FLOODING_CLIENTS, QUIET_CLIENTS):
+        print(f"{workers} workers, {clients} clients, {CAPACITY:.0f} tokens + {RATE_PER_SECOND:.0f}/s each")
+        for lease_tokens in (0.0, 5.0, 20.0):
+            run(workers, clients, lease_tokens, seconds)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 4,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    )
@@ -0,0 +1,84 @@
+"""
+Benchmark snapshot save and restore of the in-memory stores.
+
+Builds a store of finished-size games (8-creature tournaments with some move
+history), writes a snapshot, restores it with lazy game decoding, and then
+decodes a sample of games on access.
+Every game is a copy of one template, so the snapshot compresses far better
+than one of real, distinct games (about a quarter of their pickled size).
+
+Usage:
+    python -m benchmarks.bench_snapshot [games]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from src.backend.logic.tournament import TournamentManager
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.models.game_state import GameState
+from src.backend.models.move import Move, MoveResult, MoveType
+from src.backend.storage import MemoryStore, restore_snapshot, write_snapshot
+from src.backend.storage.codec import decode, encode
+
+SAMPLE = 1000
+
+
+def make_game(index: int, template: bytes) -> GameState:
+    """A copy of the encoded template game under a new ID."""
+    game = decode(template)
+    game.game_id = f"bench-game-{index}"
+    return game
+
+
+def make_template() -> GameState:
+    """An 8-creature tournament whose first match has a few turns of history."""
+    creature = Creature.create_with_biases(name="Bench", creature_type=CreatureType.MEDUSA)
+    creature.id = "bench-creature"
+    tournament = TournamentManager.create_tournament([creature], tournament_size=8)
+    match = tournament.matches[0]
+    for turn in range(6):
+        match.move_history.append(MoveResult(
+            move=Move(move_type=MoveType.ATTACK, user_id=match.creature1.id, target_id=match.creature2.id),
+            success=True,
+            damage_dealt=3,
+            message=f"Turn {turn}: Bench attacks for 3 damage"
+        ))
+    return GameState(game_id="template", num_players=1, player_creatures=[creature], tournament=tournament)
+
+
+def main(count: int = 100_000) -> None:
+    """Save and restore count games, printing timings."""
+    template = encode(make_template())
+    games = MemoryStore("games")
+    started = time.perf_counter()
+    for index in range(count):
+        games[f"bench-game-{index}"] = make_game(index, template)
+    print(f"built {count} games in {time.perf_counter() - started:.1f} s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.snap")
+
+        started = time.perf_counter()
+        records = write_snapshot(path, {"games": games})
+        elapsed = time.perf_counter() - started
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"save:    {records} games, {size_mb:.1f} MB in {elapsed:.2f} s")
+
+        restored = MemoryStore("games")
+        started = time.perf_counter()
+        restore_snapshot(path, {"games": restored})
+        print(f"restore: {len(restored)} games indexed in {time.perf_counter() - started:.2f} s (lazy)")
+
+        keys = random.sample(range(count), min(SAMPLE, count))
+        started = time.perf_counter()
+        for index in keys:
+            restored[f"bench-game-{index}"]
+        elapsed = time.perf_counter() - started
+        print(f"access:  {len(keys)} games decoded in {elapsed * 1e3:.1f} ms ({elapsed / len(keys) * 1e6:.0f} us/game)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,102 @@
+"""
+Benchmark tracing overhead on submit_move, and break a move's latency down by span.
+
+Plays moves through the submit_move handler (what POST /game/{game_id}/move
+runs) with tracing off and on, exporting to an in-memory collector, and
+prints per-move latency for both. Then it averages the collected spans per
+move: each span's total time and its self time (excluding its child spans),
+which shows how much of a move is combat, AI, bracket progression, response
+building and serialization.
+
+Usage:
+    python -m benchmarks.bench_tracing [moves]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+from src.backend.logic.tournament import TournamentManager
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.models.game_state import GameState
+from src.backend.observability import TRACER, BatchSpanExporter, InMemorySpanCollector
+from src.backend.routes import creature_routes, game_routes
+
+GAMES = 200
+
+
+def new_game(index: int) -> GameState:
+    """A 4-creature tournament with one player creature."""
+    creature = Creature.create_with_biases(name=f"Bench{index}", creature_type=CreatureType.DRAGON)
+    creature.id = f"bench-creature-{index}"
+    tournament = TournamentManager.create_tournament([creature], tournament_size=4)
+    return GameState(game_id=f"bench-game-{index}", num_players=1, player_creatures=[creature], tournament=tournament)
+
+
+async def play(moves: int) -> List[float]:
+    """Play moves round-robin across GAMES games and return per-move latencies in seconds."""
+    games = game_routes.games_db
+    for index in range(GAMES):
+        game = new_game(index)
+        games[game.game_id] = game
+        creature_routes.creatures_db[game.player_creatures[0].id] = game.player_creatures[0]
+
+    latencies = []
+    index = 0
+    while len(latencies) < moves:
+        game = games[f"bench-game-{index % GAMES}"]
+        index += 1
+        if game.get_current_match() is None:
+            replacement = new_game(index % GAMES)
+            games[replacement.game_id] = replacement
+            continue
+        request = game_routes.SubmitMoveRequest(creature_id=game.player_creatures[0].id, move_type="attack")
+        started = time.perf_counter()
+        try:
+            await game_routes.submit_move(game.game_id, request, idempotency_key=None)
+        except game_routes.HTTPException:
+            # The player was knocked out; start over
+            replacement = new_game(index % GAMES)
+            games[replacement.game_id] = replacement
+            continue
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def breakdown(spans: List[Dict], moves: int) -> None:
+    """Print each span name's average total and self time per move, in microseconds."""
+    total: Dict[str, float] = defaultdict(float)
+    children: Dict[str, float] = defaultdict(float)
+    names = {span["span_id"]: span["name"] for span in spans}
+    for span in spans:
+        duration = (span["end_time_unix_nano"] - span["start_time_unix_nano"]) / 1000
+        total[span["name"]] += duration
+        parent = names.get(span["parent_span_id"])
+        if parent is not None:
+            children[parent] += duration
+    move_total = total["submit_move"]
+    print(f"  {'span':38} {'total':>8} {'self':>8} {'share':>6}")
+    for name in sorted(total, key=total.get, reverse=True):
+        own = total[name] - children[name]
+        print(f"  {name:38} {total[name] / moves:6.1f}us {own / moves:6.1f}us {own / move_total:6.1%}")
+
+
+def main(moves: int = 5000) -> None:
+    """Compare latency with tracing off and on, then print the span breakdown."""
+    off = asyncio.run(play(moves))
+    print(f"tracing off  mean {statistics.mean(off) * 1e6:7.1f} us  p50 {statistics.median(off) * 1e6:7.1f} us")
+
+    collector = InMemorySpanCollector()
+    TRACER.start(BatchSpanExporter(collector, max_queue_size=moves * 20))
+    try:
+        on = asyncio.run(play(moves))
+    finally:
+        TRACER.stop()
+    print(f"tracing on   mean {statistics.mean(on) * 1e6:7.1f} us  p50 {statistics.median(on) * 1e6:7.1f} us")
+    breakdown(collector.spans, moves)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
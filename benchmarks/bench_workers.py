@@ -0,0 +1,118 @@
+"""
+Benchmark move throughput as worker processes are added on the shared storage backend.
+
+Each worker process opens the shared SQLite store, as a uvicorn worker started
+with PET_BATTLER_STORAGE=shared would, and plays moves through the same code
+path as POST /game/{game_id}/move on its own set of games for a fixed time.
+Reports total moves per second for 1 to N workers. Scaling is limited by the
+number of cores and by the single SQLite write lock each move takes.
+
+To load-test real HTTP workers instead, run for example:
+    PET_BATTLER_STORAGE=shared PET_BATTLER_DB_PATH=/tmp/pet.db \\
+        uvicorn src.backend.app:app --workers 4
+
+Usage:
+    python -m benchmarks.bench_workers [max_workers] [seconds]
+"""
+
+import asyncio
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from src.backend.logic.tournament import TournamentManager
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.models.game_state import GameState
+from src.backend.routes import creature_routes, game_routes
+from src.backend.storage import SharedSQLiteRepository, SharedStore
+
+GAMES_PER_WORKER = 50
+
+
+def new_game(worker: int, index: int) -> GameState:
+    """A 4-creature tournament with one player creature."""
+    creature = Creature.create_with_biases(name=f"Worker{worker}", creature_type=CreatureType.OWLBEAR)
+    creature.id = f"bench-{worker}-creature-{index}"
+    tournament = TournamentManager.create_tournament([creature], tournament_size=4)
+    return GameState(
+        game_id=f"bench-{worker}-game-{index}",
+        num_players=1,
+        player_creatures=[creature],
+        tournament=tournament
+    )
+
+
+async def play(worker: int, seconds: float) -> int:
+    """Play moves round-robin over this worker's games until time runs out."""
+    games = game_routes.games_db
+    for index in range(GAMES_PER_WORKER):
+        game = new_game(worker, index)
+        games[game.game_id] = game
+
+    moves = 0
+    index = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        game_id = f"bench-{worker}-game-{index % GAMES_PER_WORKER}"
+        index += 1
+        game = games[game_id]
+        if game.get_current_match() is None:
+            games[game_id] = new_game(worker, index % GAMES_PER_WORKER)
+            continue
+        request = game_routes.SubmitMoveRequest(creature_id=game.player_creatures[0].id, move_type="attack")
+        try:
+            await game_routes.play_move(game_id, request)
+        except game_routes.HTTPException:
+            # The player was knocked out; start over
+            games[game_id] = new_game(worker, index % GAMES_PER_WORKER)
+            continue
+        moves += 1
+    return moves
+
+
+def worker_main(worker: int, path: str, seconds: float, start: multiprocessing.Event, results) -> None:
+    """Entry point of one worker process."""
+    repository = SharedSQLiteRepository(path)
+    game_routes.games_db = SharedStore("games", repository)
+    creature_routes.creatures_db = SharedStore("creatures", repository)
+    start.wait()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results.put(asyncio.run(play(worker, seconds)))
+
+
+def run(workers: int, path: str, seconds: float) -> float:
+    """Run a number of workers at once and return the total moves per second."""
+    start = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker_main, args=(worker, path, seconds, start, results))
+        for worker in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    start.set()
+    total = sum(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    return total / seconds
+
+
+def main(max_workers: int = 4, seconds: float = 3.0) -> None:
+    """Measure throughput for 1 to max_workers workers."""
+    print(f"cores available: {os.cpu_count()}")
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        with tempfile.TemporaryDirectory() as directory:
+            rate = run(workers, os.path.join(directory, "bench.db"), seconds)
+        baseline = baseline or rate
+        print(f"{workers} worker(s): {rate:9.0f} moves/s  ({rate / baseline:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 4,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    )
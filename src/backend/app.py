@@ -2,21 +2,160 @@
 Pet Battler - FastAPI Backend Main Application
 """
 
+import os
+from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from .middleware.rate_limit import RateLimitMiddleware
-from .routes import creature_router, game_router
+from .middleware.admission import AdmissionControlMiddleware, create_admission_controller
+from .middleware.metrics import MetricsMiddleware
+from .middleware.profiling import ProfilingMiddleware
+from .middleware.rate_limit import RateLimitMiddleware, create_rate_limiter
+from .observability.log import create_log_pipeline
+from .observability.metrics import CONTENT_TYPE, REGISTRY
+from .observability.profiling import PROFILE_TOKEN_ENV, create_request_profiler
+from .observability.tracing import TRACER, create_span_exporter, trace_sample_rate
+from .routes import admin_router, creature_router, game_router
+from .routes.creature_routes import creatures_db, rebuild_creature_index
+from .routes.game_routes import game_journal, games_db
+from .storage import StorageBusyError, StoreSweeper, create_flusher, restore_snapshot, storage_backend, write_snapshot
+
+# Backend log records, written as JSON lines from a background thread
+log_pipeline = create_log_pipeline()
+
+# Writes tracing spans to a JSONL file (None unless PET_BATTLER_TRACE_FILE is set)
+span_exporter = create_span_exporter()
+
+# Periodically evicts idle games and creatures
+store_sweeper = StoreSweeper(
+    [games_db, creatures_db],
+    interval_seconds=float(os.getenv("PET_BATTLER_SWEEP_INTERVAL_SECONDS", "30"))
+)
+
+# Writes dirty games and creatures to SQLite in batches (None when persistence is off)
+store_flusher = create_flusher([games_db, creatures_db])
+
+# In-memory stores are saved here on shutdown and restored on startup. SQLite
+# backends and the event log already persist everything, so no snapshot is
+# taken for them.
+SNAPSHOT_PATH = os.getenv("PET_BATTLER_SNAPSHOT_PATH")
+snapshot_stores = {"creatures": creatures_db, "games": games_db}
+
+# Per-client request limits, shared between workers on the shared backend
+rate_limiter = create_rate_limiter(
+    requests_per_minute=60,
+    max_clients=int(os.getenv("PET_BATTLER_RATE_LIMIT_MAX_CLIENTS", "100000"))
+)
+
+# Concurrency limit and overload shedding for HTTP requests
+admission_controller = create_admission_controller()
+
+# Profiles single requests on demand (None unless PET_BATTLER_PROFILE_DIR is set)
+request_profiler = create_request_profiler()
+
+# X-Profile-Token value every /admin endpoint requires (None: they all answer 403)
+admin_token = os.getenv(PROFILE_TOKEN_ENV, "").encode() or None
+
+# Values other components already count, read when /metrics is scraped
+REGISTRY.callback(
+    "pet_battler_rate_limit_rejections_total", "Requests rejected with 429 by the rate limiter.", "counter",
+    lambda: [({}, rate_limiter.rejected)]
+)
+REGISTRY.callback(
+    "pet_battler_admission_queue_depth", "Requests waiting for an admission slot, by priority.", "gauge",
+    lambda: [({"priority": name}, depth) for name, depth in admission_controller.queue_depth().items()]
+)
+REGISTRY.callback(
+    "pet_battler_admission_in_flight", "Requests holding an admission slot.", "gauge",
+    lambda: [({}, admission_controller.in_flight)]
+)
+REGISTRY.callback(
+    "pet_battler_admission_shed_total", "Requests shed with 503 by admission control, by reason.", "counter",
+    lambda: [({"reason": reason}, count) for reason, count in admission_controller.shed.items()]
+)
+REGISTRY.callback(
+    "pet_battler_games_active", "Games held in memory (idle games are evicted after their TTL).", "gauge",
+    lambda: [({}, len(games_db))]
+)
+REGISTRY.callback(
+    "pet_battler_creatures_active", "Creatures held in memory.", "gauge",
+    lambda: [({}, len(creatures_db))]
+)
+REGISTRY.callback(
+    "pet_battler_store_evictions_total", "Entries evicted from memory, by store and reason.", "counter",
+    lambda: [({"store": name, "reason": reason}, count)
+             for name, store in snapshot_stores.items() for reason, count in store.evictions.items()]
+)
+REGISTRY.callback(
+    "pet_battler_store_bytes", "Estimated size of the entries held in memory, by store.", "gauge",
+    lambda: [({"store": name}, store.total_bytes) for name, store in snapshot_stores.items()]
+)
+REGISTRY.callback(
+    "pet_battler_store_hits_total", "Lookups answered from memory, by store.", "counter",
+    lambda: [({"store": name}, store.hits) for name, store in snapshot_stores.items()]
+)
+REGISTRY.callback(
+    "pet_battler_store_misses_total", "Lookups not found in memory, by store.", "counter",
+    lambda: [({"store": name}, store.misses) for name, store in snapshot_stores.items()]
+)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Restore state and start background maintenance tasks for the lifetime of the app."""
+    log_pipeline.start()
+    if span_exporter is not None:
+        TRACER.start(span_exporter, sample_rate=trace_sample_rate())
+    snapshots = SNAPSHOT_PATH is not None and storage_backend() == "memory" and game_journal is None
+    if snapshots:
+        # Creatures are decoded up front for the listing index; games on first access
+        restore_snapshot(SNAPSHOT_PATH, snapshot_stores, eager=("creatures",))
+    if game_journal is not None:
+        game_journal.replay(games_db, creatures_db)
+        game_journal.start()
+    rebuild_creature_index()
+    if store_flusher is not None:
+        store_flusher.start()
+    store_sweeper.start()
+    yield
+    await store_sweeper.stop()
+    if store_flusher is not None:
+        await store_flusher.stop()
+    if game_journal is not None:
+        await game_journal.stop()
+    if snapshots:
+        write_snapshot(SNAPSHOT_PATH, snapshot_stores)
+    TRACER.stop()
+    log_pipeline.stop()
+
 
 # Create FastAPI app
 app = FastAPI(
     title="Pet Battler API",
     description="Tournament-style creature battle game API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Profile requests picked by token or sampling; innermost, so time spent
+# queued by admission control is not profiled. Not installed when profiling
+# is off, so it costs nothing then.
+if request_profiler is not None:
+    app.add_middleware(ProfilingMiddleware, profiler=request_profiler)
+
+# Bound concurrent requests, queueing (by priority) or shedding the rest
+app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
+
+# Add rate limiting (inside CORS, so 429 responses carry CORS headers and
+# preflight requests are not counted; outside admission control, so limited
+# clients never take a queue slot)
+app.add_middleware(RateLimitMiddleware, requests_per_minute=60, limiter=rate_limiter)
+
+# Record latency by route for every request, including rejected ones
+app.add_middleware(MetricsMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -26,12 +165,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add rate limiting
-app.add_middleware(RateLimitMiddleware, requests_per_minute=60)
-
 # Include routers
 app.include_router(creature_router)
 app.include_router(game_router)
+app.include_router(admin_router)
 
 # Mount static files and serve frontend
 frontend_path = Path(__file__).parent.parent / "frontend"
@@ -44,12 +181,28 @@ if frontend_path.exists():
         return FileResponse(str(frontend_path / "index.html"))
 
 
+@app.exception_handler(StorageBusyError)
+async def storage_busy(_request: Request, _exc: StorageBusyError):
+    """Another worker held the shared database's write lock too long; the client should retry."""
+    return JSONResponse(
+        {"detail": "Storage is busy. Please try again shortly."},
+        status_code=503,
+        headers={"Retry-After": "1"}
+    )
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "service": "pet-battler-api"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics for this worker."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
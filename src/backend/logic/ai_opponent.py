@@ -7,6 +7,7 @@ import uuid
 from typing import List
 from ..models.creature import Creature, CreatureType
 from ..models.move import MoveType
+from ..observability.tracing import TRACER
 
 class AIOpponentGenerator:
     """Generates AI-controlled opponents and makes decisions for them."""
@@ -118,6 +119,7 @@ class AIOpponentGenerator:
         return f"{random.choice(prefixes)}{number}"
 
     @staticmethod
+    @TRACER.traced("AIOpponentGenerator.decide_move")
     def decide_move(creature: Creature, opponent: Creature, round_num: int) -> MoveType:
         """
         Decide which move the AI should use.
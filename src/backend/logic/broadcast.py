@@ -0,0 +1,89 @@
+"""
+In-process pub/sub hub for fanning out live match updates to spectators.
+"""
+
+import asyncio
+import json
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set
+
+
+class Subscription:
+    """
+    A single subscriber's bounded message queue.
+
+    When the queue is full the oldest message is dropped, so a slow
+    consumer never blocks the publisher.
+    """
+
+    def __init__(self, topic: str, max_queue_size: int):
+        self.topic = topic
+        self.queue: Deque[str] = deque(maxlen=max_queue_size)
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    def push(self, message: str) -> None:
+        """Queue a message, dropping the oldest one if the queue is full."""
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(message)
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Wait for the next message. Returns None if the timeout expires first."""
+        while not self.queue:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.queue.popleft()
+
+
+class BroadcastHub:
+    """Topic-based broadcaster that serializes each event once for all subscribers."""
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._topics: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(self, topic: str) -> Subscription:
+        """Register a new subscriber on a topic."""
+        subscription = Subscription(topic, self.max_queue_size)
+        self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber, dropping the topic once it has no subscribers."""
+        subscribers = self._topics.get(subscription.topic)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._topics[subscription.topic]
+
+    def subscriber_count(self, topic: str) -> int:
+        """Number of active subscribers on a topic."""
+        return len(self._topics.get(topic, ()))
+
+    def publish(self, topic: str, event: str, payload: Any) -> int:
+        """
+        Publish an event to every subscriber of a topic.
+
+        The payload is encoded once as a Server-Sent Events frame and the
+        same string is queued for each subscriber. Returns the number of
+        subscribers the event was delivered to.
+        """
+        subscribers = self._topics.get(topic)
+        if not subscribers:
+            return 0
+
+        message = format_sse(event, payload)
+        for subscription in subscribers:
+            subscription.push(message)
+        return len(subscribers)
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Format a single Server-Sent Events frame with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -6,6 +6,7 @@ import random
 from typing import Tuple
 from ..models.creature import Creature
 from ..models.move import Move, MoveType, MoveResult
+from ..observability.tracing import TRACER
 
 class CombatEngine:
     """Handles combat calculations and move resolution."""
@@ -14,6 +15,7 @@ class CombatEngine:
     BASE_DAMAGE_RANGE = (5, 15)  # Base damage before modifiers
 
     @staticmethod
+    @TRACER.traced("CombatEngine.execute_moves")
     def execute_moves(
         creature1: Creature,
         move1: Move,
@@ -0,0 +1,439 @@
+"""
+Journal of game changes on the append-only event log.
+
+Every change is recorded as a small event rather than a copy of the game:
+creature creation, tournament start, moves, combat results, bracket
+progression, stat allocations and champion selection. Replaying the log at
+startup rebuilds the in-memory stores after a restart or crash. A background
+compactor folds the events of finished games into one summary record each.
+"""
+
+import asyncio
+import logging
+import os
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterable, List, MutableMapping, Optional, Sequence, Tuple
+from ..models.creature import Creature
+from ..models.game_state import GameState, Match
+from ..models.move import Move, MoveResult, MoveType
+from ..storage import EventLog, EventLogError, read_records, storage_backend
+from ..storage.codec import decode, encode
+from .tournament import TournamentManager
+
+logger = logging.getLogger(__name__)
+
+# Directory of the event log; the journal is off when unset
+EVENT_LOG_DIR_ENV = "PET_BATTLER_EVENT_LOG_DIR"
+FSYNC_INTERVAL_ENV = "PET_BATTLER_EVENT_LOG_FSYNC_SECONDS"
+SEGMENT_BYTES_ENV = "PET_BATTLER_EVENT_LOG_SEGMENT_BYTES"
+COMPACT_INTERVAL_ENV = "PET_BATTLER_EVENT_LOG_COMPACT_SECONDS"
+
+Event = Tuple[int, bytes]
+
+
+class EventType(IntEnum):
+    """Kinds of journal records. The values are stored in the log; never renumber them."""
+
+    CREATURE_CREATED = 1
+    GAME_STARTED = 2
+    MOVE_SUBMITTED = 3
+    TURN_RESOLVED = 4
+    ROUND_ADVANCED = 5
+    PLAYER_ELIMINATED = 6
+    CHAMPION_SELECTED = 7
+    STATS_ALLOCATED = 8
+    GAME_SUMMARY = 9
+
+
+# Once one of these is logged for a game, no more moves can follow
+FINISHING_EVENTS = {EventType.PLAYER_ELIMINATED, EventType.CHAMPION_SELECTED, EventType.GAME_SUMMARY}
+
+
+# Event builders. Payloads are encoded tuples whose first field is the game id
+# (the creature id for CREATURE_CREATED); models are nested as encoded bytes so
+# reading the id does not decode the model.
+
+def creature_created(creature: Creature) -> Event:
+    """A creature was created."""
+    return EventType.CREATURE_CREATED, encode((creature.id, encode(creature)))
+
+
+def game_started(game: GameState) -> Event:
+    """A game and its tournament bracket were created."""
+    return EventType.GAME_STARTED, encode((game.game_id, encode(game)))
+
+
+def move_submitted(game_id: str, match: Match, move: Move) -> Event:
+    """A move was queued and waits for the opponent's."""
+    return EventType.MOVE_SUBMITTED, encode((game_id, match.match_id, move.user_id, move.move_type.value))
+
+
+def turn_resolved(game_id: str, match: Match, result1: MoveResult, result2: MoveResult) -> Event:
+    """Combat resolved a turn. Recorded before the bracket advances, with both creatures' resulting state."""
+    return EventType.TURN_RESOLVED, encode((
+        game_id,
+        match.match_id,
+        _result_fields(result1),
+        _result_fields(result2),
+        _creature_fields(match.creature1),
+        _creature_fields(match.creature2),
+    ))
+
+
+def player_eliminated(game_id: str) -> Event:
+    """A player creature lost to an AI, ending the game."""
+    return EventType.PLAYER_ELIMINATED, encode((game_id,))
+
+
+def round_advanced(game_id: str, auto_completed: Sequence[Match], new_matches: Sequence[Match]) -> Event:
+    """AI-only matches were decided and the next bracket round (if any) was created."""
+    return EventType.ROUND_ADVANCED, encode((
+        game_id,
+        [(match.match_id, match.winner_id) for match in auto_completed],
+        [match.match_id for match in new_matches],
+    ))
+
+
+def champion_selected(game_id: str, champion_id: str) -> Event:
+    """The tournament finished with a champion."""
+    return EventType.CHAMPION_SELECTED, encode((game_id, champion_id))
+
+
+def stats_allocated(game_id: Optional[str], creature_id: str, stat_allocations: Dict[str, int]) -> Event:
+    """Stat points were allocated to a player creature."""
+    return EventType.STATS_ALLOCATED, encode((game_id, creature_id, dict(stat_allocations)))
+
+
+def _result_fields(result: MoveResult) -> Tuple[Any, ...]:
+    return (
+        result.move.move_type.value,
+        result.move.user_id,
+        result.success,
+        result.damage_dealt,
+        result.was_critical,
+        result.was_dodged,
+        result.was_defended,
+        result.message,
+    )
+
+
+def _creature_fields(creature: Creature) -> Tuple[int, int, int]:
+    return creature.current_hp, creature.defend_uses_remaining, creature.special_uses_remaining
+
+
+# Replay. Each handler applies one event to the stores and returns False when
+# the game or match it refers to is not there (for example, evicted by a cap).
+
+Games = MutableMapping[str, GameState]
+Creatures = MutableMapping[str, Creature]
+
+
+def _find_match(game: Optional[GameState], match_id: str) -> Optional[Match]:
+    if game is None or game.tournament is None:
+        return None
+    return next((match for match in game.tournament.matches if match.match_id == match_id), None)
+
+
+def _replay_creature_created(fields: Tuple[Any, ...], _games: Games, creatures: Creatures) -> bool:
+    creature_id, data = fields
+    creatures[creature_id] = decode(data)
+    return True
+
+
+def _replay_game_started(fields: Tuple[Any, ...], games: Games, creatures: Creatures) -> bool:
+    game_id, data = fields
+    game = decode(data)
+    games[game_id] = game
+    # As at runtime, the creature store holds the instance the newest game plays with
+    for creature in game.player_creatures:
+        creatures[creature.id] = creature
+    return True
+
+
+def _replay_game_summary(fields: Tuple[Any, ...], games: Games, _creatures: Creatures) -> bool:
+    game_id, data = fields
+    games[game_id] = decode(data)
+    return True
+
+
+def _replay_move_submitted(fields: Tuple[Any, ...], games: Games, _creatures: Creatures) -> bool:
+    game_id, match_id, creature_id, move_type = fields
+    game = games.get(game_id)
+    match = _find_match(game, match_id)
+    if match is None:
+        return False
+    match.add_move(creature_id, Move(move_type=MoveType(move_type), user_id=creature_id))
+    game.bump_version()
+    return True
+
+
+def _replay_turn_resolved(fields: Tuple[Any, ...], games: Games, _creatures: Creatures) -> bool:
+    game_id, match_id, result1, result2, state1, state2 = fields
+    game = games.get(game_id)
+    match = _find_match(game, match_id)
+    if match is None:
+        return False
+
+    for creature, (current_hp, defend_uses, special_uses) in ((match.creature1, state1), (match.creature2, state2)):
+        creature.current_hp = current_hp
+        creature.defend_uses_remaining = defend_uses
+        creature.special_uses_remaining = special_uses
+    for move_type, user_id, success, damage, critical, dodged, defended, message in (result1, result2):
+        match.move_history.append(MoveResult(
+            move=Move(move_type=MoveType(move_type), user_id=user_id),
+            success=success,
+            damage_dealt=damage,
+            was_critical=critical,
+            was_dodged=dodged,
+            was_defended=defended,
+            message=message
+        ))
+    match.clear_pending_moves()
+    match.turn_number += 1
+
+    if not match.creature1.is_alive():
+        match.set_winner(match.creature2.id)
+    elif not match.creature2.is_alive():
+        match.set_winner(match.creature1.id)
+    game.bump_version()
+    return True
+
+
+def _replay_round_advanced(fields: Tuple[Any, ...], games: Games, _creatures: Creatures) -> bool:
+    game_id, auto_completed, new_match_ids = fields
+    game = games.get(game_id)
+    if game is None or game.tournament is None:
+        return False
+
+    completed = [(_find_match(game, match_id), winner_id) for match_id, winner_id in auto_completed]
+    if any(match is None for match, _winner_id in completed):
+        return False
+    for match, winner_id in completed:
+        loser = match.creature2 if winner_id == match.creature1.id else match.creature1
+        loser.current_hp = 0
+        match.set_winner(winner_id)
+
+    # The bracket logic is deterministic apart from the generated match ids
+    first_new = len(game.tournament.matches)
+    TournamentManager.advance_tournament(game.tournament)
+    for match, match_id in zip(game.tournament.matches[first_new:], new_match_ids):
+        match.match_id = match_id
+    return True
+
+
+def _replay_player_eliminated(fields: Tuple[Any, ...], games: Games, _creatures: Creatures) -> bool:
+    game = games.get(fields[0])
+    if game is None:
+        return False
+    game.is_complete = True
+    return True
+
+
+def _replay_champion_selected(fields: Tuple[Any, ...], games: Games, _creatures: Creatures) -> bool:
+    game_id, champion_id = fields
+    game = games.get(game_id)
+    if game is None:
+        return False
+    game.set_champion(champion_id)
+    return True
+
+
+def _replay_stats_allocated(fields: Tuple[Any, ...], games: Games, creatures: Creatures) -> bool:
+    game_id, creature_id, stat_allocations = fields
+    game = games.get(game_id) if game_id is not None else None
+    targets: List[Creature] = []
+    if game is not None:
+        targets.extend(pc for pc in game.player_creatures if pc.id == creature_id)
+    # At runtime the store and the game share one instance; after a restart
+    # they may not, so each copy gets the points once
+    stored = creatures.get(creature_id)
+    if stored is not None and all(stored is not target for target in targets):
+        targets.append(stored)
+    for creature in targets:
+        creature.apply_stat_points(stat_allocations)
+    if game is not None:
+        game.bump_version()
+    return bool(targets)
+
+
+REPLAY_HANDLERS: Dict[int, Callable[[Tuple[Any, ...], Games, Creatures], bool]] = {
+    EventType.CREATURE_CREATED: _replay_creature_created,
+    EventType.GAME_STARTED: _replay_game_started,
+    EventType.MOVE_SUBMITTED: _replay_move_submitted,
+    EventType.TURN_RESOLVED: _replay_turn_resolved,
+    EventType.ROUND_ADVANCED: _replay_round_advanced,
+    EventType.PLAYER_ELIMINATED: _replay_player_eliminated,
+    EventType.CHAMPION_SELECTED: _replay_champion_selected,
+    EventType.STATS_ALLOCATED: _replay_stats_allocated,
+    EventType.GAME_SUMMARY: _replay_game_summary,
+}
+
+
+def apply_event(event_type: int, fields: Tuple[Any, ...], games: Games, creatures: Creatures) -> bool:
+    """Apply one decoded event to the stores. Returns False if it was skipped."""
+    handler = REPLAY_HANDLERS.get(event_type)
+    return handler is not None and handler(fields, games, creatures)
+
+
+class _UnsharedCreatures(dict):
+    """Creature mapping used while folding: finished games keep their own creature copies."""
+
+    def __setitem__(self, key: str, value: Creature) -> None:
+        pass
+
+
+def fold_finished_games(paths: List[str], emit: Callable[[int, bytes], None]) -> Dict[str, int]:
+    """
+    Rewrite log files, folding every finished game's events into one summary.
+
+    The summary holds the game's final state and is written where its last
+    event was. Stat allocations made in a folded game are kept, without the
+    game id, so the creature store still replays them. Every other record is
+    copied unchanged, in order.
+    """
+    finished = set()
+    last_index: Dict[str, int] = {}
+    event_counts: Dict[str, int] = {}
+    for index, (event_type, payload) in enumerate(_records(paths)):
+        if event_type == EventType.CREATURE_CREATED:
+            continue
+        game_id = decode(payload)[0]
+        if game_id is None:
+            continue
+        last_index[game_id] = index
+        event_counts[game_id] = event_counts.get(game_id, 0) + 1
+        if event_type in FINISHING_EVENTS:
+            finished.add(game_id)
+        elif event_type == EventType.GAME_STARTED:
+            finished.discard(game_id)
+    # A game that is already a lone summary is copied as it is
+    folding = {game_id for game_id in finished if event_counts[game_id] > 1}
+
+    games: Dict[str, GameState] = {}
+    creatures = _UnsharedCreatures()
+    records_in = records_out = 0
+    for index, (event_type, payload) in enumerate(_records(paths)):
+        records_in += 1
+        fields = decode(payload) if event_type != EventType.CREATURE_CREATED else None
+        if fields is None or fields[0] not in folding:
+            emit(event_type, payload)
+            records_out += 1
+            continue
+
+        game_id = fields[0]
+        if event_type == EventType.STATS_ALLOCATED:
+            emit(*stats_allocated(None, fields[1], fields[2]))
+            records_out += 1
+        apply_event(event_type, fields, games, creatures)
+        if last_index[game_id] == index:
+            game = games.pop(game_id, None)
+            if game is not None:
+                game.pending_narrations.clear()
+                emit(EventType.GAME_SUMMARY, encode((game_id, encode(game))))
+                records_out += 1
+
+    return {"records_in": records_in, "records_out": records_out, "games_folded": len(folding)}
+
+
+def _records(paths: List[str]) -> Iterable[Tuple[int, bytes]]:
+    for path in paths:
+        yield from read_records(path)
+
+
+class GameJournal:
+    """Records game events to an EventLog, replays them, and compacts the log in the background."""
+
+    def __init__(self, log: EventLog, compact_interval_seconds: float = 300.0):
+        self.log = log
+        self.compact_interval_seconds = compact_interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._compact_lock = asyncio.Lock()
+        self.compactions = 0
+        self.games_folded = 0
+        self.replayed = 0
+        self.replay_skipped = 0
+
+    def record(self, events: Sequence[Event]) -> None:
+        """Append the events of one change in a single write."""
+        if len(events) == 1:
+            self.log.append(*events[0])
+        else:
+            self.log.extend(events)
+
+    def replay(self, games: Games, creatures: Creatures) -> int:
+        """Apply every logged event to the stores (run once at startup). Returns the number applied."""
+        for event_type, payload in self.log.records():
+            if apply_event(event_type, decode(payload), games, creatures):
+                self.replayed += 1
+            else:
+                self.replay_skipped += 1
+        return self.replayed
+
+    async def compact(self) -> Optional[Dict[str, int]]:
+        """
+        Seal the active segment and fold finished games in everything sealed.
+
+        The fsync of the sealed segment and the rewrite run in a worker thread
+        while new events keep going to a fresh segment. Returns the rewrite counts, or None if there was nothing
+        to compact.
+        """
+        async with self._compact_lock:
+            await self.log.rotate_async()
+            if not self.log.sealed_count:
+                return None
+            result = await asyncio.to_thread(self.log.compact, fold_finished_games)
+            self.compactions += 1
+            self.games_folded += result["games_folded"]
+            return result
+
+    def start(self) -> None:
+        """Start batched fsync and periodic compaction on the running event loop."""
+        self.log.start()
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop compacting, then sync and close the log."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.log.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Log counters plus replay and compaction counts."""
+        stats = self.log.stats()
+        stats.update({
+            "replayed": self.replayed,
+            "replay_skipped": self.replay_skipped,
+            "compactions": self.compactions,
+            "games_folded": self.games_folded,
+        })
+        return stats
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.compact_interval_seconds)
+            try:
+                await self.compact()
+            except (OSError, EventLogError) as e:
+                # The old files stay in use, so the next interval retries
+                logger.exception("Event log compaction failed: %s", e)
+
+
+def create_journal() -> Optional[GameJournal]:
+    """Journal on the directory in PET_BATTLER_EVENT_LOG_DIR, or None when it is unset."""
+    directory = os.getenv(EVENT_LOG_DIR_ENV)
+    if not directory:
+        return None
+    if storage_backend() != "memory":
+        raise ValueError(f"{EVENT_LOG_DIR_ENV} requires the in-memory storage backend")
+    log = EventLog(
+        directory,
+        segment_bytes=int(os.getenv(SEGMENT_BYTES_ENV, str(64 * 1024 * 1024))),
+        fsync_interval_seconds=float(os.getenv(FSYNC_INTERVAL_ENV, "0.05"))
+    )
+    return GameJournal(log, compact_interval_seconds=float(os.getenv(COMPACT_INTERVAL_ENV, "300")))
@@ -0,0 +1,37 @@
+"""
+Per-key asyncio locks for serializing changes to a single game.
+"""
+
+import asyncio
+import weakref
+from typing import Hashable
+
+
+class KeyedLocks:
+    """
+    One asyncio.Lock per key, created on first use.
+
+    Locks are held in a WeakValueDictionary: a lock lives only while some
+    request holds or waits on it, so idle games cost nothing and a game's lock
+    disappears with its last request. Different keys never contend.
+    """
+
+    def __init__(self):
+        self._locks: "weakref.WeakValueDictionary[Hashable, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def lock(self, key: Hashable) -> asyncio.Lock:
+        """The lock for key. Use it as `async with locks.lock(key):`."""
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+        return lock
+
+    def locked(self, key: Hashable) -> bool:
+        """Whether a request currently holds the lock for key."""
+        lock = self._locks.get(key)
+        return lock is not None and lock.locked()
+
+    def __len__(self) -> int:
+        """Number of locks currently in use."""
+        return len(self._locks)
@@ -0,0 +1,212 @@
+"""
+PvP matchmaking queue and turn synchronization for two-player games.
+"""
+
+import asyncio
+import bisect
+import itertools
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple
+from ..models.creature import Creature
+
+
+def creature_power(creature: Creature) -> int:
+    """Rating used for matchmaking when the player does not supply one."""
+    stats = creature.base_stats
+    return stats.speed + stats.health + stats.defense + stats.strength + stats.luck
+
+
+class MatchTicket:
+    """A player's place in the matchmaking queue."""
+
+    def __init__(self, creature: Creature, rating: int, sequence: int):
+        self.ticket_id = str(uuid.uuid4())
+        self.creature = creature
+        self.rating = rating
+        self.sequence = sequence
+        self.game_id: Optional[str] = None
+        self.opponent_id: Optional[str] = None
+        self.matched = asyncio.Event()
+        # Set when cancelled; the ticket is dropped from its rating bucket lazily
+        self.cancelled = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public view of the ticket."""
+        return {
+            "ticket_id": self.ticket_id,
+            "creature_id": self.creature.id,
+            "rating": self.rating,
+            "status": "matched" if self.game_id else "waiting",
+            "game_id": self.game_id,
+            "opponent_id": self.opponent_id
+        }
+
+
+class MatchmakingQueue:
+    """
+    Pairs waiting players with the closest rating.
+
+    Waiting tickets are grouped in one FIFO bucket per rating, and the
+    ratings that have a bucket are kept sorted. Finding the best opponent is
+    a binary search over those ratings and a pop from a bucket, so its cost
+    does not grow with the number of players waiting; a bucket is only added
+    to or removed from the sorted ratings when the first player of a rating
+    arrives or the last leaves. Cancelled tickets are marked and dropped when
+    they reach the front of their bucket.
+    """
+
+    def __init__(self, max_rating_gap: Optional[int] = None, max_matched_tickets: int = 10000):
+        self.max_rating_gap = max_rating_gap
+        self.max_matched_tickets = max_matched_tickets
+        self._ratings: List[int] = []
+        self._buckets: Dict[int, Deque[MatchTicket]] = {}
+        self._tickets: Dict[str, MatchTicket] = {}
+        self._matched: "OrderedDict[str, MatchTicket]" = OrderedDict()
+        self._by_creature: Dict[str, str] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def get(self, ticket_id: str) -> Optional[MatchTicket]:
+        """Look up a waiting or recently matched ticket."""
+        return self._tickets.get(ticket_id) or self._matched.get(ticket_id)
+
+    def join(self, creature: Creature, rating: Optional[int] = None) -> Tuple[MatchTicket, Optional[MatchTicket]]:
+        """
+        Add a creature to the queue.
+
+        Returns the new ticket and, if a suitable opponent was waiting, that
+        opponent's ticket (already removed from the queue). The caller creates
+        the game and calls complete() with both tickets.
+        """
+        if creature.id in self._by_creature:
+            raise ValueError(f"Creature {creature.id} is already queued")
+
+        ticket = MatchTicket(creature, creature_power(creature) if rating is None else rating, next(self._sequence))
+        opponent = self._pop_closest(ticket.rating)
+        if opponent is None:
+            bucket = self._buckets.get(ticket.rating)
+            if bucket is None:
+                bucket = self._buckets[ticket.rating] = deque()
+                bisect.insort(self._ratings, ticket.rating)
+            bucket.append(ticket)
+            self._tickets[ticket.ticket_id] = ticket
+            self._by_creature[creature.id] = ticket.ticket_id
+        return ticket, opponent
+
+    def complete(self, ticket: MatchTicket, opponent: MatchTicket, game_id: str) -> None:
+        """Record the game created for a pair and wake anyone waiting on either ticket."""
+        for mine, theirs in ((ticket, opponent), (opponent, ticket)):
+            mine.game_id = game_id
+            mine.opponent_id = theirs.creature.id
+            self._matched[mine.ticket_id] = mine
+            mine.matched.set()
+        while len(self._matched) > self.max_matched_tickets:
+            self._matched.popitem(last=False)
+
+    def cancel(self, ticket_id: str) -> bool:
+        """Remove a waiting ticket. Returns False if it is not waiting."""
+        ticket = self._tickets.pop(ticket_id, None)
+        if ticket is None:
+            return False
+        del self._by_creature[ticket.creature.id]
+        ticket.cancelled = True
+        return True
+
+    async def wait(self, ticket_id: str, timeout: float) -> Optional[MatchTicket]:
+        """Wait until a ticket is matched or the timeout expires."""
+        ticket = self.get(ticket_id)
+        if ticket is None:
+            return None
+        try:
+            await asyncio.wait_for(ticket.matched.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return ticket
+
+    def _pop_closest(self, rating: int) -> Optional[MatchTicket]:
+        """Remove and return the longest-waiting ticket of the rating closest to rating."""
+        best: Optional[MatchTicket] = None
+        while self._ratings:
+            index = bisect.bisect_left(self._ratings, rating)
+            heads = [self._head(i) for i in (index - 1, index) if 0 <= i < len(self._ratings)]
+            if None in heads:
+                # A bucket held only cancelled tickets and was dropped; search again
+                continue
+            best = min(heads, key=lambda ticket: (abs(ticket.rating - rating), ticket.sequence))
+            break
+        if best is None or (self.max_rating_gap is not None and abs(best.rating - rating) > self.max_rating_gap):
+            return None
+
+        bucket = self._buckets[best.rating]
+        bucket.popleft()
+        if not bucket:
+            self._drop_bucket(best.rating)
+        del self._tickets[best.ticket_id]
+        del self._by_creature[best.creature.id]
+        return best
+
+    def _head(self, index: int) -> Optional[MatchTicket]:
+        """First live ticket of the bucket at index, or None after dropping a bucket left empty."""
+        rating = self._ratings[index]
+        bucket = self._buckets[rating]
+        while bucket and bucket[0].cancelled:
+            bucket.popleft()
+        if not bucket:
+            self._drop_bucket(rating)
+            return None
+        return bucket[0]
+
+    def _drop_bucket(self, rating: int) -> None:
+        del self._buckets[rating]
+        del self._ratings[bisect.bisect_left(self._ratings, rating)]
+
+
+class TurnSynchronizer:
+    """
+    Lets the first mover of a PvP turn wait for the turn to be resolved.
+
+    Turns are keyed by (match_id, turn_number). The request that resolves the
+    turn passes its outcome to resolve(), which wakes the waiting request. The
+    outcomes of the last max_outcomes turns anyone waited on are kept, so a
+    first mover whose wait timed out can pick up the result later.
+    """
+
+    def __init__(self, max_outcomes: int = 10000):
+        self.max_outcomes = max_outcomes
+        self._waiters: Dict[Hashable, asyncio.Future] = {}
+        # Turns waited on -> outcome, or None while unresolved; oldest first
+        self._outcomes: "OrderedDict[Hashable, Optional[Any]]" = OrderedDict()
+
+    async def wait(self, key: Hashable, timeout: float) -> Optional[Any]:
+        """Wait for a turn's outcome. Returns None if the timeout expires first."""
+        outcome = self._outcomes.get(key)
+        if outcome is not None:
+            return outcome
+        if key not in self._outcomes:
+            self._outcomes[key] = None
+            while len(self._outcomes) > self.max_outcomes:
+                self._outcomes.popitem(last=False)
+        future = self._waiters.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[key] = future
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            if self._waiters.get(key) is future and not future.done():
+                del self._waiters[key]
+            return None
+
+    def resolve(self, key: Hashable, outcome: Any) -> None:
+        """Deliver a turn's outcome to its waiter, if any, and keep it if the turn was waited on."""
+        if key in self._outcomes:
+            self._outcomes[key] = outcome
+        future = self._waiters.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(outcome)
+
+    def __len__(self) -> int:
+        return len(self._waiters)
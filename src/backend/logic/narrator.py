@@ -1,10 +1,17 @@
+import logging
 import os
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, List
 import openai
 from dotenv import load_dotenv
+from ..observability.metrics import NARRATION_ERRORS
+from ..observability.tracing import CLIENT, TRACER
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+NARRATION_API_ERRORS = NARRATION_ERRORS.labels("error")
+
 class NarratorAgent:
 	"""
 	Creature Battle Narrator using OpenAI GPT
@@ -15,6 +22,7 @@ class NarratorAgent:
 		if not api_key:
 			raise ValueError("OPENAI_API_KEY not found in environment variables.")
 		self.client = openai.OpenAI(api_key=api_key)
+		self.async_client = openai.AsyncOpenAI(api_key=api_key)
 		self.model = model
 
 	def generate_narration(self, event: Dict[str, Any]) -> str:
@@ -22,23 +30,56 @@ class NarratorAgent:
 		Generate a narration for a battle event.
 		event: dict with keys like 'creature1', 'creature2', 'move1', 'move2', 'result', etc.
 		"""
-		prompt = self._format_prompt(event)
+		with TRACER.start_span("NarratorAgent.generate_narration", CLIENT, {"llm.model": self.model}) as span:
+			try:
+				response = self.client.chat.completions.create(
+					model=self.model,
+					messages=self._build_messages(event),
+					max_tokens=100,
+					temperature=0.9
+				)
+				narration = response.choices[0].message.content.strip()
+				return narration
+			except Exception as e:
+				span.record_exception(e)
+				NARRATION_API_ERRORS.inc()
+				logger.exception("Narrator error: %s", e)
+				return "[Narrator unavailable]"
+
+	async def stream_narration(self, event: Dict[str, Any]) -> AsyncIterator[str]:
+		"""
+		Stream a narration for a battle event token by token.
+		Yields text deltas as they arrive from the streaming completion.
+		"""
+		# Not made current: a generator's context can change between yields
+		span = TRACER.start_span("NarratorAgent.stream_narration", CLIENT, {"llm.model": self.model})
 		try:
-			response = self.client.chat.completions.create(
+			stream = await self.async_client.chat.completions.create(
 				model=self.model,
-				messages=[
-					{"role": "system", "content": "You are a lively and dramatic battle narrator for a fantasy creature tournament. Narrate events with excitement and color, but keep it concise (1-2 sentences)."},
-					{"role": "user", "content": prompt}
-				],
+				messages=self._build_messages(event),
 				max_tokens=100,
-				temperature=0.9
+				temperature=0.9,
+				stream=True
 			)
-			narration = response.choices[0].message.content.strip()
-			return narration
+			async for chunk in stream:
+				if not chunk.choices:
+					continue
+				delta = chunk.choices[0].delta.content
+				if delta:
+					yield delta
 		except Exception as e:
-			import logging
-			logging.exception("Narrator error: %s", e)
-			return "[Narrator unavailable]"
+			span.record_exception(e)
+			NARRATION_API_ERRORS.inc()
+			logger.exception("Narrator error: %s", e)
+			yield "[Narrator unavailable]"
+		finally:
+			span.end()
+
+	def _build_messages(self, event: Dict[str, Any]) -> List[Dict[str, str]]:
+		return [
+			{"role": "system", "content": "You are a lively and dramatic battle narrator for a fantasy creature tournament. Narrate events with excitement and color, but keep it concise (1-2 sentences)."},
+			{"role": "user", "content": self._format_prompt(event)}
+		]
 
 	def _format_prompt(self, event: Dict[str, Any]) -> str:
 		# Example: "In round 2, Flareon used Attack and Vaporeon used Defend. Flareon dealt 10 damage. Vaporeon is left with 15 HP."
@@ -6,6 +6,7 @@ import uuid
 from typing import List
 from ..models.creature import Creature
 from ..models.game_state import Match, TournamentBracket
+from ..observability.tracing import TRACER
 from .ai_opponent import AIOpponentGenerator
 
 
@@ -66,6 +67,22 @@ class TournamentManager:
 
         return bracket
 
+    @staticmethod
+    def create_duel(creature1: Creature, creature2: Creature) -> TournamentBracket:
+        """
+        Create a single-match bracket for a PvP game between two player creatures.
+        """
+        for creature in (creature1, creature2):
+            creature.current_hp = creature.max_hp
+            creature.reset_round_resources()
+
+        return TournamentBracket(
+            bracket_id=str(uuid.uuid4()),
+            total_rounds=1,
+            current_round=0,
+            matches=TournamentManager._create_round_matches([creature1, creature2])
+        )
+
     @staticmethod
     def _create_round_matches(creatures: List[Creature]) -> List[Match]:
         """Create matches by pairing creatures sequentially."""
@@ -83,6 +100,7 @@ class TournamentManager:
         return matches
 
     @staticmethod
+    @TRACER.traced("TournamentManager.advance_tournament")
     def advance_tournament(bracket: TournamentBracket) -> bool:
         """
         Advance the tournament to the next round.
@@ -0,0 +1,259 @@
+"""
+Admission control: a concurrency limit with a bounded, prioritized wait queue.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+from starlette.types import ASGIApp, Receive, Scope, Send
+from .route_table import RouteTable
+
+# Priorities, most urgent first
+HIGH, NORMAL, LOW = 0, 1, 2
+PRIORITY_NAMES = ("high", "normal", "low")
+
+# Never queued: health checks, metrics scrapes, static files, and requests that
+# stay open for a long time on purpose (streams and long polls) and would hold
+# a slot throughout
+DEFAULT_EXEMPT_PATHS = ("/health", "/metrics", "/static")
+EXEMPT = -1
+
+# Priority by method and path ({name} matches one path segment). Moves are
+# what players are waiting on; listings can wait, or be shed, first.
+DEFAULT_ROUTE_PRIORITIES = (
+    ("POST", "/game/{game_id}/move", HIGH),
+    ("POST", "/game/{game_id}/moves", HIGH),
+    ("POST", "/game/{game_id}/allocate-stats", HIGH),
+    ("GET", "/creatures", LOW),
+    ("POST", "/creatures/batch-get", LOW),
+    ("GET", "/admin/storage", LOW),
+    ("GET", "/game/{game_id}/narration/stream", EXEMPT),
+    ("GET", "/game/{game_id}/spectate", EXEMPT),
+    ("GET", "/game/matchmaking/{ticket_id}", EXEMPT),
+    # Load metrics stay readable while the server is overloaded
+    ("GET", "/admin/load", EXEMPT),
+)
+
+_OVERLOADED = b'{"detail":"Server is overloaded. Please try again shortly."}'
+
+# Gives back the slot held by the request being handled, at most once
+_release_slot: ContextVar[Optional[Callable[[], None]]] = ContextVar("pet_battler_admission_release", default=None)
+
+
+def release_admission_slot() -> None:
+    """
+    Give back the current request's admission slot before the request finishes.
+
+    For handlers about to wait on something other than the server, such as a
+    PvP first mover waiting for the opponent, so the wait does not hold a
+    slot. Does nothing outside admission control or once released.
+    """
+    release = _release_slot.get()
+    if release is not None:
+        release()
+
+
+class AdmissionController:
+    """
+    Lets at most max_concurrent requests run at once; the rest wait in a queue.
+
+    Waiting requests are admitted by priority, first come first served within
+    a priority. A request that has waited max_queue_seconds is shed rather
+    than admitted late, so queued requests never see more than that much
+    extra latency. The queue holds at most max_queue requests: when it is
+    full, a new request displaces the newest waiter of a lower priority, or
+    is shed itself if there is none.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 64,
+        max_queue: int = 256,
+        max_queue_seconds: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_queue_seconds = max_queue_seconds
+        self._clock = clock
+        self.in_flight = 0
+        self._queues: List[Deque["asyncio.Future[bool]"]] = [deque() for _ in PRIORITY_NAMES]
+        self._queued = 0
+        self.admitted = [0] * len(PRIORITY_NAMES)
+        self.shed: Dict[str, int] = {"queue_full": 0, "timeout": 0, "displaced": 0}
+        self.shed_by_priority = [0] * len(PRIORITY_NAMES)
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+
+    async def acquire(self, priority: int = NORMAL) -> bool:
+        """Wait for a slot. Returns False if the request was shed; otherwise call release() when done."""
+        if self.in_flight < self.max_concurrent and not self._queued:
+            self.in_flight += 1
+            self.admitted[priority] += 1
+            return True
+
+        if self._queued >= self.max_queue and not self._displace(priority):
+            self._count_shed("queue_full", priority)
+            return False
+
+        waiter: "asyncio.Future[bool]" = asyncio.get_running_loop().create_future()
+        queue = self._queues[priority]
+        queue.append(waiter)
+        self._queued += 1
+        self.waits += 1
+        started = self._clock()
+        try:
+            admitted = await asyncio.wait_for(asyncio.shield(waiter), self.max_queue_seconds)
+        except asyncio.TimeoutError:
+            admitted = None
+        except asyncio.CancelledError:
+            # The client went away; pass on a slot it was handed meanwhile
+            if not self._withdraw(queue, waiter) and waiter.result():
+                self.release()
+            raise
+        finally:
+            self.wait_seconds_total += self._clock() - started
+
+        if admitted is None:
+            if self._withdraw(queue, waiter):
+                self._count_shed("timeout", priority)
+                return False
+            # A slot was handed over just as the wait ran out
+            admitted = waiter.result()
+        if admitted:
+            self.admitted[priority] += 1
+        return admitted
+
+    def release(self) -> None:
+        """Give a slot back, handing it straight to the most urgent waiter if there is one."""
+        for queue in self._queues:
+            if queue:
+                waiter = queue.popleft()
+                self._queued -= 1
+                waiter.set_result(True)
+                return
+        self.in_flight -= 1
+
+    def _withdraw(self, queue: Deque["asyncio.Future[bool]"], waiter: "asyncio.Future[bool]") -> bool:
+        """Remove a waiter that is still queued. Returns False if it was already resolved."""
+        if waiter.done():
+            return False
+        queue.remove(waiter)
+        self._queued -= 1
+        waiter.cancel()
+        return True
+
+    def _displace(self, priority: int) -> bool:
+        """Shed the newest waiter less urgent than priority to make room. Returns False if there is none."""
+        for lower in range(len(self._queues) - 1, priority, -1):
+            queue = self._queues[lower]
+            if queue:
+                waiter = queue.pop()
+                self._queued -= 1
+                waiter.set_result(False)
+                self._count_shed("displaced", lower)
+                return True
+        return False
+
+    def _count_shed(self, reason: str, priority: int) -> None:
+        self.shed[reason] += 1
+        self.shed_by_priority[priority] += 1
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Requests waiting, by priority name."""
+        return {name: len(queue) for name, queue in zip(PRIORITY_NAMES, self._queues)}
+
+    def stats(self) -> Dict[str, Any]:
+        """Limits, current load, and admitted and shed counts."""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "max_queue_seconds": self.max_queue_seconds,
+            "in_flight": self.in_flight,
+            "queued": self.queue_depth(),
+            "admitted": dict(zip(PRIORITY_NAMES, self.admitted)),
+            "shed": dict(self.shed),
+            "shed_by_priority": dict(zip(PRIORITY_NAMES, self.shed_by_priority)),
+            "queued_total": self.waits,
+            "average_wait_seconds": self.wait_seconds_total / self.waits if self.waits else 0.0,
+        }
+
+
+def create_admission_controller() -> AdmissionController:
+    """Admission controller with limits from the environment."""
+    return AdmissionController(
+        max_concurrent=int(os.getenv("PET_BATTLER_MAX_CONCURRENT_REQUESTS", "64")),
+        max_queue=int(os.getenv("PET_BATTLER_MAX_QUEUED_REQUESTS", "256")),
+        max_queue_seconds=float(os.getenv("PET_BATTLER_MAX_QUEUE_SECONDS", "2.0"))
+    )
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that runs HTTP requests through an AdmissionController.
+
+    Each request's priority comes from route_priorities (default NORMAL);
+    routes marked EXEMPT, paths in exempt_paths and everything below them, and
+    WebSocket connections bypass the controller. Shed requests get 503 with a
+    Retry-After header and never reach the app.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        route_priorities: Sequence[Tuple[str, str, int]] = DEFAULT_ROUTE_PRIORITIES,
+        exempt_paths: Iterable[str] = DEFAULT_EXEMPT_PATHS,
+    ):
+        self.app = app
+        self.controller = controller
+        self.priorities = RouteTable(route_priorities, NORMAL)
+        self.exempt_exact = frozenset(exempt_paths)
+        self.exempt_prefixes = tuple(path.rstrip("/") + "/" for path in exempt_paths)
+        self._retry_after = str(max(1, math.ceil(controller.max_queue_seconds))).encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path in self.exempt_exact or path.startswith(self.exempt_prefixes):
+            await self.app(scope, receive, send)
+            return
+        priority = self.priorities.lookup(scope["method"], path)
+        if priority == EXEMPT:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.controller.acquire(priority):
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(_OVERLOADED)).encode()),
+                    (b"retry-after", self._retry_after),
+                ],
+            })
+            await send({"type": "http.response.body", "body": _OVERLOADED})
+            return
+
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.controller.release()
+
+        token = _release_slot.set(release)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _release_slot.reset(token)
+            release()
@@ -0,0 +1,45 @@
+"""
+Request metrics middleware.
+"""
+
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..observability.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording HTTP latency by method, route template and status.
+
+    The route is the template FastAPI matched (e.g. /game/{game_id}/move), read
+    from the scope after the app ran, so the number of series stays bounded;
+    requests that matched no route, or were answered by middleware further in
+    (429, 503), are labelled "unmatched".
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.labels(scope["method"], template, str(status)).observe(elapsed)
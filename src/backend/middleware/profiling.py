@@ -0,0 +1,76 @@
+"""
+Request profiling middleware.
+"""
+
+import asyncio
+import cProfile
+import logging
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..observability.profiling import RequestProfiler
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that runs cProfile around the requests a RequestProfiler picks.
+
+    A profiled response carries an X-Profile-Id header naming the stored
+    profile. Other requests pay for the profiler's trigger check only. The
+    profile covers everything the event loop ran while the request was in
+    progress, which includes other requests' work whenever it awaited.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profiler = self.profiler
+        trigger = profiler.trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+        if profiler.active:
+            profiler.busy += 1
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = profiler.store.new_id()
+        status = 500
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": [*message.get("headers", ()), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        profile = cProfile.Profile()
+        profiler.active = True
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            profiler.active = False
+            profiler.taken[trigger] += 1
+            info = {
+                "time": time.time(),
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(scope.get("route"), "path", None),
+                "status": status,
+                "duration_seconds": round(elapsed, 6),
+                "trigger": trigger,
+            }
+            try:
+                await asyncio.to_thread(profiler.store.save, profile_id, profile, info)
+            except OSError:
+                logger.exception("Could not save profile %s", profile_id)
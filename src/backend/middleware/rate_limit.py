@@ -2,48 +2,347 @@
 Rate limiting middleware for API protection.
 """
 
-from time import time
-from typing import Dict
-from collections import defaultdict
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple, Union
+from starlette.types import ASGIApp, Receive, Scope, Send
+from ..storage.backends import DB_PATH_ENV, storage_backend
+from ..storage.shared_store import SharedSQLiteRepository, StorageBusyError
+from .route_table import RouteTable
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+# Tokens a worker takes from a shared bucket at once (shared storage backend only)
+LEASE_TOKENS_ENV = "PET_BATTLER_RATE_LIMIT_LEASE_TOKENS"
+# How long the limiter waits for the shared database's write lock before
+# deciding locally instead (shared storage backend only)
+RATE_LIMIT_BUSY_TIMEOUT_MS = 2
+
+# Never rate limited, along with everything below them
+DEFAULT_EXEMPT_PATHS = ("/health", "/metrics", "/static")
+
+# Tokens spent per request, by method and path ({name} matches one path segment).
+# Routes that resolve combat or create many objects cost more than reads.
+DEFAULT_ROUTE_COSTS = (
+    ("POST", "/game/{game_id}/move", 2.0),
+    ("POST", "/game/{game_id}/moves", 5.0),
+    ("POST", "/game/start", 3.0),
+    ("POST", "/game/matchmaking", 3.0),
+    ("POST", "/creatures/bulk", 5.0),
+    ("GET", "/creatures/types", 0.5),
+)
+
+_TOO_MANY_REQUESTS = b'{"detail":"Too many requests. Please try again later."}'
+
+
+class TokenBucketLimiter:
     """
-    Simple rate limiting middleware.
-    Limits requests per IP address.
+    Token bucket per client: O(1) time and memory per request.
+
+    Each client holds at most `capacity` tokens, refilled continuously at
+    `rate_per_second`; a request spends `cost` tokens. A bucket is just its
+    token count and the time it was last refilled, so the check never looks
+    at past requests.
+
+    Clients are kept in least recently used order. Past `max_clients` the
+    least recently seen client is dropped, and every `sweep_interval_seconds`
+    clients idle long enough to have refilled completely are dropped too. A
+    full bucket is what a new client starts with, so forgetting one never
+    changes a decision.
     """
 
-    def __init__(self, app, requests_per_minute: int = 60):
-        super().__init__(app)
-        self.requests_per_minute = requests_per_minute
-        self.request_counts: Dict[str, list] = defaultdict(list)
+    def __init__(
+        self,
+        capacity: float,
+        rate_per_second: float,
+        max_clients: int = 100_000,
+        sweep_interval_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.capacity = capacity
+        self.rate_per_second = rate_per_second
+        self.max_clients = max_clients
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._clock = clock
+        # Seconds for an empty bucket to refill; idle that long means full
+        self.refill_seconds = capacity / rate_per_second if rate_per_second > 0 else math.inf
+        # client -> [tokens, last refill time]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._next_sweep = clock() + sweep_interval_seconds
+        self.rejected = 0
+        self.evicted = 0
+
+    def acquire(self, client: str, cost: float = 1.0) -> float:
+        """
+        Spend cost tokens for client.
+
+        Returns 0.0 when the request is allowed, otherwise the number of
+        seconds until enough tokens will have refilled (math.inf if never).
+        """
+        now = self._clock()
+        if now >= self._next_sweep:
+            self.evict_idle(now)
+
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = [self.capacity, now]
+            self._buckets[client] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._buckets.move_to_end(client)
+            tokens = bucket[0] + (now - bucket[1]) * self.rate_per_second
+            bucket[0] = tokens if tokens < self.capacity else self.capacity
+            bucket[1] = now
+
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return 0.0
+        self.rejected += 1
+        if self.rate_per_second <= 0 or cost > self.capacity:
+            return math.inf
+        return (cost - bucket[0]) / self.rate_per_second
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop clients whose buckets have refilled completely. Returns how many were dropped."""
+        if now is None:
+            now = self._clock()
+        self._next_sweep = now + self.sweep_interval_seconds
+        idle_before = now - self.refill_seconds
+        evicted = 0
+        # Least recently seen first: stop at the first client seen since idle_before
+        while self._buckets:
+            _client, bucket = next(iter(self._buckets.items()))
+            if bucket[1] > idle_before:
+                break
+            self._buckets.popitem(last=False)
+            evicted += 1
+        self.evicted += evicted
+        return evicted
+
+    def __len__(self) -> int:
+        """Number of clients currently tracked."""
+        return len(self._buckets)
+
+
+class SharedTokenBucketLimiter:
+    """
+    Token buckets shared by every worker through the shared SQLite database.
+
+    All workers spend from the same bucket per client, so running N workers
+    keeps the limit instead of multiplying it by N. To avoid a database round
+    trip on every request, a worker takes up to `lease_tokens` at once and
+    spends them locally until they run out. Tokens leased by one worker are
+    not available to the others, so a client's admitted cost can differ from
+    a single bucket's by at most `lease_tokens` per worker; lease_tokens=0
+    goes to the database on every allowed request and is exact. After a
+    rejection the worker rejects that client locally until the shared bucket
+    could have refilled, so a flood of denied requests stays off the database.
+
+    Leases are kept in least recently used order, capped at `max_clients`,
+    and dropped with the shared rows of clients idle long enough to have
+    refilled completely.
+
+    The limiter runs on the event loop, so it must never wait long for the
+    database: give it a repository of its own with a busy timeout of a few
+    milliseconds. When the write lock cannot be taken in time, the request is
+    decided by an in-process token bucket with the same limits instead
+    (counted in `fallbacks`), which holds each worker to the single-worker
+    limit while the database is contended.
+    """
 
-    async def dispatch(self, request: Request, call_next):
-        """Process the request with rate limiting."""
+    def __init__(
+        self,
+        repository: SharedSQLiteRepository,
+        capacity: float,
+        rate_per_second: float,
+        lease_tokens: float = 5.0,
+        max_clients: int = 100_000,
+        sweep_interval_seconds: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.repository = repository
+        self.capacity = capacity
+        self.rate_per_second = rate_per_second
+        self.lease_tokens = lease_tokens
+        self.max_clients = max_clients
+        self.sweep_interval_seconds = sweep_interval_seconds
+        # Wall clock time: the shared buckets are compared across processes
+        self._clock = clock
+        self.refill_seconds = capacity / rate_per_second if rate_per_second > 0 else math.inf
+        # client -> [leased tokens left, last used, rejected until]
+        self._leases: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._next_sweep = clock() + sweep_interval_seconds
+        self._fallback = TokenBucketLimiter(capacity, rate_per_second, max_clients=max_clients, clock=clock)
+        self.rejected = 0
+        self.evicted = 0
+        self.round_trips = 0
+        self.fallbacks = 0
 
-        # Get client IP
-        client_ip = request.client.host if request.client else "unknown"
+    def acquire(self, client: str, cost: float = 1.0) -> float:
+        """
+        Spend cost tokens for client, from this worker's lease when it covers them.
 
-        current_time = time()
-        minute_ago = current_time - 60
+        Returns 0.0 when the request is allowed, otherwise the number of
+        seconds until the shared bucket will hold enough tokens.
+        """
+        now = self._clock()
+        if now >= self._next_sweep:
+            self.evict_idle(now)
 
-        # Clean old requests
-        self.request_counts[client_ip] = [
-            req_time for req_time in self.request_counts[client_ip]
-            if req_time > minute_ago
-        ]
+        lease = self._leases.get(client)
+        if lease is None:
+            lease = [0.0, now, 0.0]
+            self._leases[client] = lease
+            if len(self._leases) > self.max_clients:
+                self._leases.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._leases.move_to_end(client)
+            lease[1] = now
+            if lease[0] >= cost:
+                lease[0] -= cost
+                return 0.0
+            if now < lease[2]:
+                # The shared bucket cannot have refilled yet, whatever other workers do
+                self.rejected += 1
+                return lease[2] - now
 
-        # Check rate limit
-        if len(self.request_counts[client_ip]) >= self.requests_per_minute:
-            raise HTTPException(
-                status_code=429,
-                detail="Too many requests. Please try again later."
+        need = cost - lease[0]
+        self.round_trips += 1
+        try:
+            taken, retry_after = self.repository.take_tokens(
+                client, need, max(need, self.lease_tokens), self.capacity, self.rate_per_second, now
             )
+        except StorageBusyError:
+            self.fallbacks += 1
+            retry_after = self._fallback.acquire(client, cost)
+            if retry_after:
+                self.rejected += 1
+            return retry_after
+        if retry_after:
+            lease[2] = now + retry_after
+            self.rejected += 1
+            return retry_after
+        lease[0] += taken - cost
+        return 0.0
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop leases, and shared buckets, idle long enough to have refilled. Returns how many leases were dropped."""
+        if now is None:
+            now = self._clock()
+        self._next_sweep = now + self.sweep_interval_seconds
+        idle_before = now - self.refill_seconds
+        evicted = 0
+        while self._leases:
+            _client, lease = next(iter(self._leases.items()))
+            if lease[1] > idle_before:
+                break
+            self._leases.popitem(last=False)
+            evicted += 1
+        self.evicted += evicted
+        if idle_before > -math.inf:
+            try:
+                self.repository.forget_full_buckets(idle_before)
+            except StorageBusyError:
+                pass  # Try again at the next sweep
+        return evicted
+
+    def __len__(self) -> int:
+        """Number of clients this worker holds a lease for."""
+        return len(self._leases)
+
+
+Limiter = Union[TokenBucketLimiter, SharedTokenBucketLimiter]
+
+
+def create_rate_limiter(requests_per_minute: int, max_clients: int = 100_000) -> Limiter:
+    """
+    Rate limiter for the configured storage backend.
+
+    With the "shared" backend the buckets live in the shared SQLite database,
+    so every worker enforces one limit; otherwise they are kept in process.
+    """
+    rate = requests_per_minute / 60.0
+    if storage_backend() == "shared":
+        return SharedTokenBucketLimiter(
+            SharedSQLiteRepository(os.environ[DB_PATH_ENV], busy_timeout_ms=RATE_LIMIT_BUSY_TIMEOUT_MS),
+            capacity=requests_per_minute,
+            rate_per_second=rate,
+            lease_tokens=float(os.getenv(LEASE_TOKENS_ENV, "5")),
+            max_clients=max_clients
+        )
+    return TokenBucketLimiter(capacity=requests_per_minute, rate_per_second=rate, max_clients=max_clients)
+
+
+class RateLimitMiddleware:
+    """
+    Rate limiting ASGI middleware.
+
+    Limits HTTP requests per IP address with a token bucket that allows bursts
+    of up to requests_per_minute tokens and refills at the same rate (or with
+    the given limiter, e.g. one shared between workers). Each
+    request spends its route's cost (route_costs, matched in order, default
+    default_cost). Paths in exempt_paths, and everything below them, are never
+    limited. Rejected requests get 429 with a Retry-After header and never
+    reach the app.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        requests_per_minute: int = 60,
+        max_clients: int = 100_000,
+        exempt_paths: Iterable[str] = DEFAULT_EXEMPT_PATHS,
+        route_costs: Sequence[Tuple[str, str, float]] = DEFAULT_ROUTE_COSTS,
+        default_cost: float = 1.0,
+        limiter: Optional[Limiter] = None,
+    ):
+        self.app = app
+        self.requests_per_minute = requests_per_minute
+        self.limiter = limiter if limiter is not None else TokenBucketLimiter(
+            capacity=requests_per_minute,
+            rate_per_second=requests_per_minute / 60.0,
+            max_clients=max_clients
+        )
+        self.exempt_exact = frozenset(exempt_paths)
+        self.exempt_prefixes = tuple(path.rstrip("/") + "/" for path in exempt_paths)
+        self.route_costs = RouteTable(route_costs, default_cost)
+
+    def cost(self, method: str, path: str) -> float:
+        """Tokens a request to method and path spends."""
+        return self.route_costs.lookup(method, path)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path in self.exempt_exact or path.startswith(self.exempt_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        client_ip = (client[0] if client else None) or "unknown"
+        retry_after = self.limiter.acquire(client_ip, self.cost(scope["method"], path))
+        if retry_after:
+            await self._reject(send, retry_after)
+            return
 
-        # Add current request
-        self.request_counts[client_ip].append(current_time)
+        await self.app(scope, receive, send)
 
-        # Process request
-        response = await call_next(request)
-        return response
+    @staticmethod
+    async def _reject(send: Send, retry_after: float) -> None:
+        seconds = max(1, math.ceil(retry_after)) if retry_after != math.inf else 60
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(_TOO_MANY_REQUESTS)).encode()),
+                (b"retry-after", str(seconds).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": _TOO_MANY_REQUESTS})
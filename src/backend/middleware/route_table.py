@@ -0,0 +1,44 @@
+"""
+Matching request paths to per-route settings in ASGI middleware.
+"""
+
+import re
+from typing import Generic, Optional, Sequence, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+def _path_pattern(path: str) -> str:
+    """Regex for a route path, with each {name} segment matching any one segment."""
+    return "/".join(
+        "[^/]+" if segment.startswith("{") and segment.endswith("}") else re.escape(segment)
+        for segment in path.split("/")
+    )
+
+
+class RouteTable(Generic[V]):
+    """
+    Values for routes given as (method, path, value), e.g. ("POST", "/game/{game_id}/move", 2.0).
+
+    Middleware runs before the router, so it only sees the raw path. The routes
+    are compiled into one alternation over "METHOD /path" patterns, so a lookup
+    is a single regex match whichever route it hits; the first route listed
+    wins when several match.
+    """
+
+    def __init__(self, routes: Sequence[Tuple[str, str, V]], default: V):
+        self.default = default
+        self._values = [value for _method, _path, value in routes]
+        # The group that matched names the route
+        self._pattern: Optional[re.Pattern] = re.compile("|".join(
+            f"(?P<r{index}>{re.escape(method)} {_path_pattern(path)})"
+            for index, (method, path, _value) in enumerate(routes)
+        )) if routes else None
+
+    def lookup(self, method: str, path: str) -> V:
+        """The value for a request, or the default when no route matches."""
+        if self._pattern is not None:
+            match = self._pattern.fullmatch(f"{method} {path}")
+            if match is not None:
+                return self._values[int(match.lastgroup[1:])]
+        return self.default
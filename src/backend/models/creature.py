@@ -120,6 +120,14 @@ class Creature(BaseModel):
             is_ai=is_ai
         )
 
+    def apply_stat_points(self, stat_allocations: Dict[str, int]) -> None:
+        """Raise base stats by validated point allocations; health points also raise max and current HP."""
+        for stat, points in stat_allocations.items():
+            setattr(self.base_stats, stat, getattr(self.base_stats, stat) + points)
+            if stat == "health":
+                self.max_hp += points
+                self.current_hp += points
+
     def reset_round_resources(self):
         """Reset round-specific resources (defend and special uses)."""
         self.defend_uses_remaining = 3
@@ -2,12 +2,19 @@
 Game state models for managing tournament and match state.
 """
 
+import logging
+from collections import deque
 from datetime import datetime
-from typing import List, Optional, Dict, cast
-from pydantic import BaseModel, Field
+from typing import Any, Deque, List, Optional, Dict, cast
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
 from .creature import Creature
 from .move import Move, MoveResult
 
+logger = logging.getLogger(__name__)
+
+# Narrations kept for a game nobody is streaming; older ones are dropped
+MAX_PENDING_NARRATIONS = 32
+
 class Match(BaseModel):
     """Represents a single battle match between two creatures."""
     match_id: str
@@ -21,6 +28,8 @@ class Match(BaseModel):
     move_history: List[MoveResult] = Field(default_factory=list)
     winner_id: Optional[str] = None
     is_complete: bool = False
+    # Serialized fields that never change during the match (ids, names, types), cached on first use
+    _static_state: Optional[Dict[str, Any]] = PrivateAttr(default=None)
 
     class Config:
         arbitrary_types_allowed = True
@@ -73,6 +82,28 @@ class GameState(BaseModel):
     created_at: datetime = Field(default_factory=datetime.now)
     is_complete: bool = False
     champion_id: Optional[str] = None
+    # Narration events for resolved turns, read by the narration streams past their own cursor
+    pending_narrations: Deque[Dict[str, Any]] = Field(
+        default_factory=lambda: deque(maxlen=MAX_PENDING_NARRATIONS)
+    )
+    # Narration events ever queued; each event's "seq" is the count after it was added
+    narration_count: int = 0
+    # Incremented on every change to the game; clients use it to request deltas
+    version: int = 0
+    # Recent serialized snapshots keyed by version, attached by the state routes
+    _state_history: Any = PrivateAttr(default=None)
+
+    @field_validator("pending_narrations")
+    @classmethod
+    def bound_pending_narrations(cls, v):
+        """Keep only the most recent narrations, however the game was built."""
+        return deque(v, maxlen=MAX_PENDING_NARRATIONS)
+
+    def __getstate__(self) -> Dict[Any, Any]:
+        # Snapshot history is a cache of serialized responses; don't persist it
+        state = super().__getstate__()
+        state["__pydantic_private__"] = {**(state.get("__pydantic_private__") or {}), "_state_history": None}
+        return state
 
     def get_current_match(self) -> Optional[Match]:
         """Get the current active match involving a player."""
@@ -81,24 +112,33 @@ class GameState(BaseModel):
 
         player_creatures = cast(List[Creature], self.player_creatures)
         player_ids = {pc.id for pc in player_creatures}
-        print(f"[GameState] Player creature IDs: {list(player_ids)}")
+        # Checked once: this runs on every request, and the loop below logs per match
+        debug = logger.isEnabledFor(logging.DEBUG)
 
         # 1. Return the first incomplete match that involves a player creature
         tournament_matches = cast(List[Match], self.tournament.matches)
         for match in tournament_matches:
             if not match.is_complete:
-                print(f"[GameState] Inspecting match {match.match_id}: {match.creature1.name} ({match.creature1.id}) vs {match.creature2.name} ({match.creature2.id})")
+                if debug:
+                    logger.debug(
+                        "Inspecting match %s: %s (%s) vs %s (%s)",
+                        match.match_id, match.creature1.name, match.creature1.id,
+                        match.creature2.name, match.creature2.id,
+                        extra={"game_id": self.game_id}
+                    )
                 if match.creature1.id in player_ids or match.creature2.id in player_ids:
-                    print(f"[GameState] -> Returning player-involved match {match.match_id}")
                     return match
 
         # 2. Fallback: return first incomplete AI-only match (needed for auto-resolution)
         for match in tournament_matches:
             if not match.is_complete:
-                print(f"[GameState] -> No player match; returning AI-only match {match.match_id}")
+                if debug:
+                    logger.debug("No player match; returning AI-only match %s", match.match_id,
+                                 extra={"game_id": self.game_id})
                 return match
 
-        print("[GameState] -> No incomplete matches remain")
+        if debug:
+            logger.debug("No incomplete matches remain", extra={"game_id": self.game_id})
         return None
 
     def is_tournament_complete(self) -> bool:
@@ -108,6 +148,11 @@ class GameState(BaseModel):
         tournament_matches = cast(List[Match], self.tournament.matches)
         return all(match.is_complete for match in tournament_matches)
 
+    def bump_version(self) -> int:
+        """Record that the game changed. Returns the new version."""
+        self.version += 1
+        return self.version
+
     def set_champion(self, creature_id: str):
         """Set the tournament champion."""
         self.champion_id = creature_id
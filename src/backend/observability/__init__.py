@@ -0,0 +1,14 @@
+"""
+Metrics, logs, traces, profiles and other operational signals for the Pet Battler backend.
+"""
+
+from .log import JsonFormatter, LogPipeline, SamplingFilter, create_log_pipeline
+from .metrics import CONTENT_TYPE, REGISTRY, Counter, Gauge, Histogram, Registry
+from .profiling import ProfileStore, RequestProfiler, create_request_profiler
+from .tracing import TRACER, BatchSpanExporter, InMemorySpanCollector, JsonlSpanSink, Span, Tracer, create_span_exporter
+
+__all__ = [
+    "BatchSpanExporter", "CONTENT_TYPE", "Counter", "Gauge", "Histogram", "InMemorySpanCollector", "JsonFormatter",
+    "JsonlSpanSink", "LogPipeline", "ProfileStore", "REGISTRY", "Registry", "RequestProfiler", "SamplingFilter",
+    "Span", "TRACER", "Tracer", "create_log_pipeline", "create_request_profiler", "create_span_exporter"
+]
@@ -0,0 +1,23 @@
+"""
+JSON encoding shared by the API responses and the log, span and profile writers.
+"""
+
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def dumps(content: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Encode plain JSON data (dicts, lists, strings, numbers) to UTF-8 bytes.
+
+    Uses orjson when installed. default converts any other value to something
+    encodable, as in json.dumps.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=default)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=default).encode("utf-8")
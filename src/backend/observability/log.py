@@ -0,0 +1,163 @@
+"""
+Structured logging for the backend, written from a background thread.
+"""
+
+import logging
+import os
+import queue
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, Optional, TextIO
+from .encoding import dumps
+
+LOG_LEVEL_ENV = "PET_BATTLER_LOG_LEVEL"
+# Per-module overrides, e.g. "src.backend.models.game_state=DEBUG,src.backend.storage=WARNING"
+LOG_LEVELS_ENV = "PET_BATTLER_LOG_LEVELS"
+# Fraction of DEBUG records kept, between 0 and 1
+LOG_SAMPLE_RATE_ENV = "PET_BATTLER_LOG_SAMPLE_RATE"
+# "json" (one object per line) or "text"
+LOG_FORMAT_ENV = "PET_BATTLER_LOG_FORMAT"
+
+# Every backend module logs under this name (module loggers use __name__)
+PACKAGE_LOGGER = __name__.rsplit(".observability", 1)[0]
+
+# Attributes every LogRecord has; anything else was passed in extra= and is a structured field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """Parse "logger=LEVEL,logger=LEVEL" into logger names and level numbers."""
+    levels = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, separator, level = entry.partition("=")
+        number = logging.getLevelName(level.strip().upper())
+        if not separator or not isinstance(number, int):
+            raise ValueError(f"{LOG_LEVELS_ENV} entries must look like module=LEVEL, not {entry!r}")
+        levels[name.strip()] = number
+    return levels
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, and any extra= fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return dumps(entry, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a random fraction of records at or below max_level; more severe records always pass."""
+
+    def __init__(self, rate: float, max_level: int = logging.DEBUG, sample: Callable[[], float] = random.random):
+        super().__init__()
+        self.rate = rate
+        self.max_level = max_level
+        self._sample = sample
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > self.max_level or self.rate >= 1.0 or self._sample() < self.rate
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Puts records on the queue as they are, for the listener thread to format.
+
+    QueueHandler normally merges the message and arguments in the caller so
+    records can cross process boundaries. This queue stays in process, so
+    that work is left to the listener too: logging from the event loop costs
+    a level check, a record and a queue put. Log arguments should be values
+    that are not changed afterwards (ids, names, numbers).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class LogPipeline:
+    """
+    Routes backend log records through a queue to a stream written by a background thread.
+
+    start() attaches a queue handler to the backend's package logger and sets
+    its level and per-module levels; stop() flushes the queue and detaches it.
+    """
+
+    def __init__(
+        self,
+        level: int = logging.INFO,
+        levels: Optional[Dict[str, int]] = None,
+        sample_rate: float = 1.0,
+        json_format: bool = True,
+        stream: Optional[TextIO] = None,
+    ):
+        self.level = level
+        self.levels = levels or {}
+        self.sample_rate = sample_rate
+        self.json_format = json_format
+        self.stream = stream
+        self._handler: Optional[QueueHandler] = None
+        self._listener: Optional[QueueListener] = None
+
+    def start(self) -> None:
+        """Start the writer thread and attach the queue handler."""
+        if self._listener is not None:
+            return
+        output = logging.StreamHandler(self.stream if self.stream is not None else sys.stderr)
+        if self.json_format:
+            output.setFormatter(JsonFormatter())
+        else:
+            formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+            formatter.converter = time.gmtime
+            output.setFormatter(formatter)
+
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self._handler = DeferredQueueHandler(records)
+        if self.sample_rate < 1.0:
+            self._handler.addFilter(SamplingFilter(self.sample_rate))
+        self._listener = QueueListener(records, output, respect_handler_level=True)
+        self._listener.start()
+
+        package = logging.getLogger(PACKAGE_LOGGER)
+        package.setLevel(self.level)
+        package.addHandler(self._handler)
+        package.propagate = False
+        for name, level in self.levels.items():
+            logging.getLogger(name).setLevel(level)
+
+    def stop(self) -> None:
+        """Write out queued records, stop the writer thread and detach the handler."""
+        if self._listener is None:
+            return
+        package = logging.getLogger(PACKAGE_LOGGER)
+        package.removeHandler(self._handler)
+        package.propagate = True
+        self._listener.stop()
+        self._listener = None
+        self._handler = None
+
+
+def create_log_pipeline() -> LogPipeline:
+    """Log pipeline configured from the environment."""
+    level = logging.getLevelName(os.getenv(LOG_LEVEL_ENV, "INFO").upper())
+    if not isinstance(level, int):
+        raise ValueError(f"{LOG_LEVEL_ENV} must be a logging level name such as INFO or DEBUG")
+    log_format = os.getenv(LOG_FORMAT_ENV, "json")
+    if log_format not in ("json", "text"):
+        raise ValueError(f"{LOG_FORMAT_ENV} must be json or text, not {log_format!r}")
+    return LogPipeline(
+        level=level,
+        levels=parse_levels(os.getenv(LOG_LEVELS_ENV, "")),
+        sample_rate=float(os.getenv(LOG_SAMPLE_RATE_ENV, "1.0")),
+        json_format=log_format == "json"
+    )
@@ -0,0 +1,179 @@
+"""
+On-demand request profiling: which requests to profile, and a bounded on-disk ring of profiles.
+"""
+
+import cProfile
+import hmac
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from starlette.types import Scope
+from .encoding import dumps
+
+logger = logging.getLogger(__name__)
+
+# Directory the profiles are written to; profiling is off when unset
+PROFILE_DIR_ENV = "PET_BATTLER_PROFILE_DIR"
+# Requests carrying this value in the X-Profile-Token header are profiled
+PROFILE_TOKEN_ENV = "PET_BATTLER_PROFILE_TOKEN"
+# Fraction of other requests profiled, between 0 and 1
+PROFILE_SAMPLE_RATE_ENV = "PET_BATTLER_PROFILE_SAMPLE_RATE"
+PROFILE_MAX_PROFILES_ENV = "PET_BATTLER_PROFILE_MAX_PROFILES"
+
+PROFILE_HEADER = b"x-profile-token"
+
+# The admin endpoints, which need the token too; requests to them are never profiled
+ADMIN_PATH = "/admin"
+
+# Never picked by sampling (an explicit token still profiles them)
+DEFAULT_UNSAMPLED_PATHS = ("/health", "/metrics", "/static")
+
+
+class ProfileStore:
+    """
+    The most recent max_profiles profiles, as files in a directory.
+
+    Each profile is a pstats file (<id>.prof, readable with pstats or
+    snakeviz) with a <id>.json file describing the request. Ids sort in the
+    order the profiles were taken; saving one past the limit deletes the
+    oldest. Profiles already in the directory are picked up on startup.
+    save() writes files, so call it off the event loop.
+    """
+
+    def __init__(self, directory: str, max_profiles: int = 50):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        for info_path in sorted(self.directory.glob("*.json")):
+            try:
+                self._entries[info_path.stem] = json.loads(info_path.read_bytes())
+            except (OSError, ValueError):
+                logger.warning("Skipping unreadable profile %s", info_path.name)
+        with self._lock:
+            self._trim()
+
+    def new_id(self) -> str:
+        """An id for a profile about to be taken."""
+        return f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{os.getpid()}-{next(self._sequence):06d}"
+
+    def save(self, profile_id: str, profile: cProfile.Profile, info: Dict[str, Any]) -> None:
+        """Write a finished profile and its description, dropping the oldest beyond max_profiles."""
+        stats_path = self.directory / f"{profile_id}.prof"
+        partial = stats_path.with_suffix(".prof.tmp")
+        profile.dump_stats(partial)
+        os.replace(partial, stats_path)
+        (self.directory / f"{profile_id}.json").write_bytes(dumps(info))
+        with self._lock:
+            self._entries[profile_id] = info
+            self._trim()
+
+    def _trim(self) -> None:
+        while len(self._entries) > self.max_profiles:
+            oldest, _info = self._entries.popitem(last=False)
+            for suffix in (".prof", ".json"):
+                try:
+                    (self.directory / f"{oldest}{suffix}").unlink()
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Descriptions of the stored profiles, newest first."""
+        with self._lock:
+            return [{"id": profile_id, **info} for profile_id, info in reversed(self._entries.items())]
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        """The pstats file of a stored profile, or None if there is no such profile."""
+        with self._lock:
+            if profile_id not in self._entries:
+                return None
+        return self.directory / f"{profile_id}.prof"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RequestProfiler:
+    """
+    Decides which requests to profile, and stores their profiles.
+
+    A request is profiled when its X-Profile-Token header matches token, or
+    at random with probability sample_rate unless its path is under one of
+    unsampled_paths. cProfile observes the whole event loop thread, so only
+    one request is profiled at a time; requests that would be profiled while
+    another profile runs are not (counted in busy).
+    """
+
+    def __init__(
+        self,
+        store: ProfileStore,
+        token: Optional[str] = None,
+        sample_rate: float = 0.0,
+        unsampled_paths: Iterable[str] = DEFAULT_UNSAMPLED_PATHS,
+        sample: Callable[[], float] = random.random,
+    ):
+        self.store = store
+        self.token = token.encode() if token else None
+        self.sample_rate = sample_rate
+        unsampled_paths = tuple(unsampled_paths)
+        self.unsampled_exact = frozenset(unsampled_paths)
+        self.unsampled_prefixes = tuple(path.rstrip("/") + "/" for path in unsampled_paths)
+        self._sample = sample
+        self.active = False
+        self.taken = {"token": 0, "sampled": 0}
+        self.busy = 0
+
+    def trigger(self, scope: Scope) -> Optional[str]:
+        """Why this request should be profiled ("token" or "sampled"), or None."""
+        path = scope["path"]
+        if path == ADMIN_PATH or path.startswith(ADMIN_PATH + "/"):
+            return None
+        if self.token is not None:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    if self.token_matches(value):
+                        return "token"
+                    break
+        if self.sample_rate > 0.0 and self._sample() < self.sample_rate:
+            if path not in self.unsampled_exact and not path.startswith(self.unsampled_prefixes):
+                return "sampled"
+        return None
+
+    def token_matches(self, value: Optional[bytes]) -> bool:
+        """Whether value is the configured token; always False when there is none."""
+        return self.token is not None and value is not None and hmac.compare_digest(value, self.token)
+
+    def stats(self) -> Dict[str, Any]:
+        """Settings and counts of profiles taken and skipped."""
+        return {
+            "sample_rate": self.sample_rate,
+            "token_enabled": self.token is not None,
+            "max_profiles": self.store.max_profiles,
+            "stored": len(self.store),
+            "taken": dict(self.taken),
+            "busy": self.busy,
+        }
+
+
+def create_request_profiler() -> Optional[RequestProfiler]:
+    """Profiler writing to PET_BATTLER_PROFILE_DIR, or None when it is unset."""
+    directory = os.getenv(PROFILE_DIR_ENV)
+    if not directory:
+        return None
+    sample_rate = float(os.getenv(PROFILE_SAMPLE_RATE_ENV, "0"))
+    if not 0.0 <= sample_rate <= 1.0:
+        raise ValueError(f"{PROFILE_SAMPLE_RATE_ENV} must be between 0 and 1")
+    return RequestProfiler(
+        ProfileStore(directory, max_profiles=int(os.getenv(PROFILE_MAX_PROFILES_ENV, "50"))),
+        token=os.getenv(PROFILE_TOKEN_ENV) or None,
+        sample_rate=sample_rate
+    )
@@ -0,0 +1,335 @@
+"""
+Tracing spans with OpenTelemetry field names, exported in batches from a background thread.
+"""
+
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar
+from .encoding import dumps
+
+logger = logging.getLogger(__name__)
+
+# JSONL file spans are appended to; tracing is off when unset
+TRACE_FILE_ENV = "PET_BATTLER_TRACE_FILE"
+# Fraction of traces recorded, decided when the root span starts
+TRACE_SAMPLE_RATE_ENV = "PET_BATTLER_TRACE_SAMPLE_RATE"
+
+SERVICE_NAME = "pet-battler"
+
+# OpenTelemetry span kinds and status codes, as spelled in OTLP JSON
+INTERNAL = "SPAN_KIND_INTERNAL"
+SERVER = "SPAN_KIND_SERVER"
+CLIENT = "SPAN_KIND_CLIENT"
+STATUS_UNSET = "STATUS_CODE_UNSET"
+STATUS_ERROR = "STATUS_CODE_ERROR"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class NoopSpan:
+    """Stands in for a span that is not recorded: tracing is off, or the trace was not sampled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class UnsampledSpan(NoopSpan):
+    """A root span that lost the sampling draw. While active, its children are not recorded either."""
+
+    __slots__ = ("_token",)
+
+    def __enter__(self) -> "UnsampledSpan":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        _current_span.reset(self._token)
+        return False
+
+
+class Span:
+    """
+    One timed operation in a trace.
+
+    Used as a context manager, the span is the parent of spans started inside
+    it (including in awaited coroutines) and ends on exit; an exception
+    leaving the block marks it as an error. Used without a with block (in a
+    generator, say), it is not made current and is finished with end().
+    """
+
+    __slots__ = (
+        "_tracer", "name", "kind", "trace_id", "span_id", "parent_span_id",
+        "start_ns", "end_ns", "attributes", "status_code", "status_message", "_token",
+    )
+
+    def __init__(self, tracer: "Tracer", name: str, kind: str, trace_id: str,
+                 parent_span_id: Optional[str], attributes: Optional[Dict[str, Any]]):
+        self._tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.attributes = attributes if attributes is not None else {}
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+        self.end_ns: Optional[int] = None
+        self.start_ns = time.time_ns()
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.record_exception(exc)
+        self.end()
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach a value, e.g. a game id, to the span."""
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        """Mark the span as failed with this exception."""
+        self.status_code = STATUS_ERROR
+        self.status_message = str(exc)
+        self.attributes["exception.type"] = type(exc).__name__
+
+    def end(self) -> None:
+        """Finish the span and hand it to the exporter. Later calls do nothing."""
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            exporter = self._tracer.exporter
+            if exporter is not None:
+                exporter.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The span with OpenTelemetry (OTLP JSON) field names."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id or "",
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": self.status_code, "message": self.status_message},
+        }
+
+
+_current_span: ContextVar[Optional[Any]] = ContextVar("pet_battler_current_span", default=None)
+
+
+class Tracer:
+    """
+    Starts spans, or hands out NOOP_SPAN while tracing is off.
+
+    Use start_span() as a context manager so the span becomes current for
+    its block, or call end() on it where a block does not fit (generators).
+
+    The instrumented code uses the module's TRACER throughout; the app calls
+    start() with an exporter when tracing is configured. Sampling is decided
+    once per trace, when its root span starts, so a trace is recorded whole
+    or not at all.
+    """
+
+    def __init__(self, sample: Callable[[], float] = random.random):
+        self.exporter: Optional["BatchSpanExporter"] = None
+        self.sample_rate = 1.0
+        self._sample = sample
+
+    def start(self, exporter: "BatchSpanExporter", sample_rate: float = 1.0) -> None:
+        """Start recording spans to exporter."""
+        exporter.start()
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+
+    def stop(self) -> None:
+        """Stop recording spans, then export those still queued."""
+        exporter, self.exporter = self.exporter, None
+        if exporter is not None:
+            exporter.stop()
+
+    def start_span(self, name: str, kind: str = INTERNAL, attributes: Optional[Dict[str, Any]] = None) -> Any:
+        """A span that is a child of the current span, or the root of a new trace."""
+        if self.exporter is None:
+            return NOOP_SPAN
+        parent = _current_span.get()
+        if parent is None:
+            if self.sample_rate < 1.0 and self._sample() >= self.sample_rate:
+                return UnsampledSpan()
+            return Span(self, name, kind, f"{random.getrandbits(128):032x}", None, attributes)
+        if isinstance(parent, NoopSpan):
+            return NOOP_SPAN
+        return Span(self, name, kind, parent.trace_id, parent.span_id, attributes)
+
+    def traced(self, name: str, kind: str = INTERNAL) -> Callable[[F], F]:
+        """Decorator running each call of a function in a span."""
+        def decorate(function: F) -> F:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if self.exporter is None:
+                    return function(*args, **kwargs)
+                with self.start_span(name, kind):
+                    return function(*args, **kwargs)
+            return wrapper  # type: ignore[return-value]
+        return decorate
+
+
+class InMemorySpanCollector:
+    """Keeps exported spans in a list, for tests."""
+
+    def __init__(self):
+        self.spans: List[Dict[str, Any]] = []
+
+    def write(self, spans: List[Dict[str, Any]]) -> None:
+        self.spans.extend(spans)
+
+    def close(self) -> None:
+        pass
+
+    def named(self, name: str) -> List[Dict[str, Any]]:
+        """Collected spans with this name, in the order they ended."""
+        return [span for span in self.spans if span["name"] == name]
+
+
+class JsonlSpanSink:
+    """Appends spans to a file, one JSON object per line, each tagged with the service name."""
+
+    def __init__(self, path: str, resource: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.resource = resource if resource is not None else {"service.name": SERVICE_NAME}
+        self._file = open(path, "ab")
+
+    def write(self, spans: List[Dict[str, Any]]) -> None:
+        self._file.write(b"".join(
+            dumps({"resource": self.resource, **span}, default=str) + b"\n" for span in spans
+        ))
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class BatchSpanExporter:
+    """
+    Queues finished spans and writes them to a sink in batches from a background thread.
+
+    export() is an append to a deque, so ending a span never waits on I/O;
+    spans are converted to dicts and written by the thread every
+    interval_seconds, or sooner once max_batch_size are waiting. When
+    max_queue_size spans are waiting, new ones are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        sink: Any,
+        max_batch_size: int = 512,
+        interval_seconds: float = 1.0,
+        max_queue_size: int = 8192,
+    ):
+        self.sink = sink
+        self.max_batch_size = max_batch_size
+        self.interval_seconds = interval_seconds
+        self.max_queue_size = max_queue_size
+        self._spans: Deque[Span] = deque()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.exported = 0
+        self.dropped = 0
+
+    def export(self, span: Span) -> None:
+        """Queue a finished span."""
+        if len(self._spans) >= self.max_queue_size:
+            self.dropped += 1
+            return
+        self._spans.append(span)
+        if len(self._spans) >= self.max_batch_size:
+            self._wake.set()
+
+    def flush(self) -> None:
+        """Write every queued span now."""
+        with self._write_lock:
+            while self._spans:
+                batch = [self._spans.popleft() for _ in range(min(len(self._spans), self.max_batch_size))]
+                try:
+                    self.sink.write([span.to_dict() for span in batch])
+                except OSError:
+                    logger.exception("Could not write %d spans", len(batch))
+                    self.dropped += len(batch)
+                    continue
+                self.exported += len(batch)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the writer thread, write what is left and close the sink."""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        self.sink.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Spans exported, dropped and waiting."""
+        return {"exported": self.exported, "dropped": self.dropped, "queued": len(self._spans)}
+
+
+TRACER = Tracer()
+
+
+def create_span_exporter() -> Optional[BatchSpanExporter]:
+    """Exporter appending to PET_BATTLER_TRACE_FILE, or None when it is unset."""
+    path = os.getenv(TRACE_FILE_ENV)
+    if not path:
+        return None
+    return BatchSpanExporter(JsonlSpanSink(path))
+
+
+def trace_sample_rate() -> float:
+    """Fraction of traces to record, from PET_BATTLER_TRACE_SAMPLE_RATE."""
+    rate = float(os.getenv(TRACE_SAMPLE_RATE_ENV, "1.0"))
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError(f"{TRACE_SAMPLE_RATE_ENV} must be between 0 and 1")
+    return rate
@@ -2,7 +2,8 @@
 API routes for the Pet Battler game.
 """
 
+from .admin_routes import router as admin_router
 from .creature_routes import router as creature_router
 from .game_routes import router as game_router
 
-__all__ = ["creature_router", "game_router"]
+__all__ = ["admin_router", "creature_router", "game_router"]
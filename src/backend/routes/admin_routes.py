@@ -0,0 +1,76 @@
+"""
+API routes for operational introspection.
+"""
+
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import FileResponse
+from .serializers import FastJSONResponse
+
+router = APIRouter(prefix="/admin", tags=["admin"], default_response_class=FastJSONResponse)
+
+
+def _require_admin_token(token: Optional[str]) -> None:
+    """Reject the request unless token is the configured X-Profile-Token."""
+    from ..app import admin_token
+
+    if admin_token is None or token is None or not hmac.compare_digest(token.encode("latin-1"), admin_token):
+        raise HTTPException(status_code=403, detail="A valid X-Profile-Token header is required")
+
+
+@router.get("/storage")
+async def storage_stats(x_profile_token: Optional[str] = Header(default=None)):
+    """Entry counts, estimated footprint and eviction counts for the in-memory stores, and event log counters."""
+    _require_admin_token(x_profile_token)
+    from .creature_routes import creatures_db
+    from .game_routes import game_journal, games_db
+
+    return FastJSONResponse({
+        "games": games_db.stats(),
+        "creatures": creatures_db.stats(),
+        "event_log": game_journal.stats() if game_journal is not None else None
+    })
+
+
+@router.get("/load")
+async def load_stats(x_profile_token: Optional[str] = Header(default=None)):
+    """Admission control queue depth and shed counts, and rate limiter counters."""
+    _require_admin_token(x_profile_token)
+    from ..app import admission_controller, rate_limiter
+
+    return FastJSONResponse({
+        "admission": admission_controller.stats(),
+        "rate_limit": {
+            "clients": len(rate_limiter),
+            "rejected": rate_limiter.rejected,
+            "evicted": rate_limiter.evicted
+        }
+    })
+
+
+def _request_profiler(token: Optional[str]):
+    """The request profiler, if profiling is on and token is its X-Profile-Token."""
+    from ..app import request_profiler
+
+    if request_profiler is None:
+        raise HTTPException(status_code=404, detail="Request profiling is not enabled")
+    if not request_profiler.token_matches(token.encode("latin-1") if token is not None else None):
+        raise HTTPException(status_code=403, detail="A valid X-Profile-Token header is required")
+    return request_profiler
+
+
+@router.get("/profiles")
+async def list_profiles(x_profile_token: Optional[str] = Header(default=None)):
+    """Stored request profiles, newest first, and profiling settings and counters."""
+    profiler = _request_profiler(x_profile_token)
+    return FastJSONResponse({"profiles": profiler.store.list(), "profiling": profiler.stats()})
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str, x_profile_token: Optional[str] = Header(default=None)):
+    """A stored profile as a pstats file."""
+    path = _request_profiler(x_profile_token).store.path(profile_id)
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
@@ -2,12 +2,26 @@
 API routes for creature management.
 """
 
-from typing import List, Dict, Optional
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
+import os
+import uuid
+from typing import Any, List, Dict, Literal, Optional
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import Response
+from pydantic import BaseModel, Field, ValidationError
+from ..logic import journal
 from ..models.creature import Creature, CreatureType, CREATURE_STAT_BIASES
+from ..storage import CreatureIndex, MemoryStore, PersistentStore, create_store, estimate_creature_bytes
+from .http_cache import (
+    REVALIDATE_CACHE_CONTROL,
+    STATIC_CACHE_CONTROL,
+    creature_etag,
+    etag_for_bytes,
+    etag_matches,
+    not_modified,
+)
+from .serializers import FastJSONResponse, dumps, serialize_creature
 
-router = APIRouter(prefix="/creatures", tags=["creatures"])
+router = APIRouter(prefix="/creatures", tags=["creatures"], default_response_class=FastJSONResponse)
 
 class CreateCreatureRequest(BaseModel):
     """Request model for creating a new creature."""
@@ -15,6 +29,17 @@ class CreateCreatureRequest(BaseModel):
     creature_type: CreatureType
     stat_allocations: Optional[Dict[str, int]] = None
 
+class BulkCreateCreaturesRequest(BaseModel):
+    """Request model for creating many creatures at once.
+
+    Items are validated individually so one bad item does not reject the batch.
+    """
+    creatures: List[Any] = Field(min_length=1, max_length=500)
+
+class BatchGetCreaturesRequest(BaseModel):
+    """Request model for fetching many creatures at once."""
+    ids: List[str] = Field(min_length=1, max_length=500)
+
 class CreatureResponse(BaseModel):
     """Response model for creature data."""
     id: str
@@ -32,131 +57,256 @@ class CreatureTypeInfo(BaseModel):
     stat_biases: Dict[str, int]
     description: str
 
-# In-memory storage (replace with database in production)
-creatures_db: Dict[str, Creature] = {}
+# Secondary indexes for GET /creatures; kept in sync on create, stat allocation and eviction
+creature_index = CreatureIndex()
+
+# Creatures idle for CREATURE_TTL_SECONDS leave memory, and the least recently
+# used are evicted past CREATURES_MAX_ENTRIES. Games keep their own references
+# to player creatures. With a SQLite backend (see storage.create_store), the
+# store is a cache and evicted creatures reload on demand.
+CREATURE_TTL_SECONDS = float(os.getenv("PET_BATTLER_CREATURE_TTL_SECONDS", "86400"))
+CREATURES_MAX_ENTRIES = int(os.getenv("PET_BATTLER_CREATURES_MAX_ENTRIES", "200000"))
+
+
+def _on_creature_evicted(creature_id: str, creature: Creature, reason: str) -> None:
+    # Persisted creatures stay listed; in-memory ones are gone for good
+    if not creatures_db.persistent:
+        creature_index.remove(creature_id)
+
+
+creatures_db: MemoryStore[Creature] = create_store(
+    "creatures",
+    ttl_seconds=CREATURE_TTL_SECONDS,
+    max_entries=CREATURES_MAX_ENTRIES,
+    size_of=estimate_creature_bytes,
+    on_evict=_on_creature_evicted
+)
+
+
+def rebuild_creature_index() -> int:
+    """Index every stored creature (run at startup). Returns the number indexed."""
+    if isinstance(creatures_db, PersistentStore):
+        creatures = creatures_db.load_all()
+    else:
+        creatures = creatures_db.values()
+    for creature in creatures:
+        creature_index.add(creature)
+    return len(creature_index)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+CREATURE_TYPE_DESCRIPTIONS: Dict[CreatureType, str] = {
+    CreatureType.DRAGON: "High health and strength, but slower. Breathes fire!",
+    CreatureType.OWLBEAR: "Strong and defensive, balanced fighter.",
+    CreatureType.GNOME: "Lucky and fast, but physically weak.",
+    CreatureType.KRAKEN: "High health and strength, controls the seas.",
+    CreatureType.CTHULU: "Extremely lucky with cosmic powers.",
+    CreatureType.MINOTAUR: "Pure strength, charges into battle.",
+    CreatureType.CERBERUS: "Fast with good defense, triple threat.",
+    CreatureType.MEDUSA: "Lucky with stone gaze, moderate stats.",
+    CreatureType.ROBOT: "Heavily armored but predictable.",
+    CreatureType.PYTHON: "Fast and lucky, constricts enemies.",
+    CreatureType.JACOB: "Mysterious and balanced.",
+    CreatureType.BEYBLADE: "Extremely fast but fragile, let it rip!",
+}
+
+# Creature types never change at runtime, so the payload is encoded once at import
+CREATURE_TYPES_BODY = dumps([
+    CreatureTypeInfo(
+        type=creature_type,
+        stat_biases=CREATURE_STAT_BIASES.get(creature_type, {}),
+        description=CREATURE_TYPE_DESCRIPTIONS.get(creature_type, "A mysterious creature.")
+    ).model_dump(mode="json")
+    for creature_type in CreatureType
+])
+CREATURE_TYPES_ETAG = etag_for_bytes(CREATURE_TYPES_BODY)
 
 @router.get("/types", response_model=List[CreatureTypeInfo])
-async def get_creature_types():
+async def get_creature_types(if_none_match: Optional[str] = Header(default=None)):
     """Get all available creature types with their stat biases."""
 
-    descriptions = {
-        CreatureType.DRAGON: "High health and strength, but slower. Breathes fire!",
-        CreatureType.OWLBEAR: "Strong and defensive, balanced fighter.",
-        CreatureType.GNOME: "Lucky and fast, but physically weak.",
-        CreatureType.KRAKEN: "High health and strength, controls the seas.",
-        CreatureType.CTHULU: "Extremely lucky with cosmic powers.",
-        CreatureType.MINOTAUR: "Pure strength, charges into battle.",
-        CreatureType.CERBERUS: "Fast with good defense, triple threat.",
-        CreatureType.MEDUSA: "Lucky with stone gaze, moderate stats.",
-        CreatureType.ROBOT: "Heavily armored but predictable.",
-        CreatureType.PYTHON: "Fast and lucky, constricts enemies.",
-        CreatureType.JACOB: "Mysterious and balanced.",
-        CreatureType.BEYBLADE: "Extremely fast but fragile, let it rip!",
-    }
+    if etag_matches(if_none_match, CREATURE_TYPES_ETAG):
+        return not_modified(CREATURE_TYPES_ETAG, STATIC_CACHE_CONTROL)
 
-    return [
-        CreatureTypeInfo(
-            type=creature_type,
-            stat_biases=CREATURE_STAT_BIASES.get(creature_type, {}),
-            description=descriptions.get(creature_type, "A mysterious creature.")
-        )
-        for creature_type in CreatureType
-    ]
+    return Response(
+        content=CREATURE_TYPES_BODY,
+        media_type="application/json",
+        headers={"ETag": CREATURE_TYPES_ETAG, "Cache-Control": STATIC_CACHE_CONTROL}
+    )
+
+def build_creature(request: CreateCreatureRequest) -> Creature:
+    """Validate a creation request and build the creature. Raises ValueError if invalid."""
+
+    # Validate stat allocations
+    if request.stat_allocations:
+        total_points = sum(request.stat_allocations.values())
+        if total_points > 6:
+            raise ValueError(f"Cannot allocate more than 6 stat points (you used {total_points})")
+
+    creature = Creature.create_with_biases(
+        name=request.name,
+        creature_type=request.creature_type,
+        stat_allocations=request.stat_allocations,
+        is_ai=False
+    )
+    creature.id = str(uuid.uuid4())
+    return creature
+
+def store_creature(creature: Creature) -> None:
+    """Insert a creature into the store, its listing indexes and the game journal."""
+    from .game_routes import game_journal
+    creatures_db[creature.id] = creature
+    creature_index.add(creature)
+    if game_journal is not None:
+        game_journal.record([journal.creature_created(creature)])
 
 @router.post("", response_model=CreatureResponse, status_code=201)
 async def create_creature(request: CreateCreatureRequest):
     """Create a new creature with custom stats."""
 
     try:
-        # Validate stat allocations
-        if request.stat_allocations:
-            total_points = sum(request.stat_allocations.values())
-            if total_points > 6:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Cannot allocate more than 6 stat points (you used {total_points})"
-                )
-
-        # Create creature
-        creature = Creature.create_with_biases(
-            name=request.name,
-            creature_type=request.creature_type,
-            stat_allocations=request.stat_allocations,
-            is_ai=False
-        )
-
-        # Generate ID and store
-        import uuid
-        creature.id = str(uuid.uuid4())
-        creatures_db[creature.id] = creature
-
-        return CreatureResponse(
-            id=creature.id,
-            name=creature.name,
-            creature_type=creature.creature_type,
-            stats={
-                "speed": creature.base_stats.speed,
-                "health": creature.base_stats.health,
-                "defense": creature.base_stats.defense,
-                "strength": creature.base_stats.strength,
-                "luck": creature.base_stats.luck,
-            },
-            current_hp=creature.current_hp,
-            max_hp=creature.max_hp,
-            defend_uses=creature.defend_uses_remaining,
-            special_uses=creature.special_uses_remaining,
-        )
-
+        creature = build_creature(request)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    store_creature(creature)
+    return FastJSONResponse(serialize_creature(creature), status_code=201)
+
+@router.post("/bulk")
+async def bulk_create_creatures(request: BulkCreateCreaturesRequest):
+    """
+    Create many creatures in one request.
+
+    Each item is validated on its own; the result for every item carries its
+    index and either the created creature (status 201) or an error (400 or 422).
+    """
+
+    results = []
+    created = 0
+    for index, item in enumerate(request.creatures):
+        try:
+            creature = build_creature(CreateCreatureRequest.model_validate(item))
+        except ValidationError as e:
+            results.append({"index": index, "status": 422, "error": _validation_message(e)})
+            continue
+        except ValueError as e:
+            results.append({"index": index, "status": 400, "error": str(e)})
+            continue
+
+        store_creature(creature)
+        created += 1
+        results.append({"index": index, "status": 201, "creature": serialize_creature(creature)})
+
+    return FastJSONResponse({
+        "created": created,
+        "failed": len(results) - created,
+        "results": results
+    })
+
+@router.post("/batch-get")
+async def batch_get_creatures(request: BatchGetCreaturesRequest):
+    """Fetch many creatures by ID. Unknown IDs are reported per item with status 404."""
+
+    results = []
+    found = 0
+    for creature_id in request.ids:
+        creature = creatures_db.get(creature_id)
+        if creature is None:
+            results.append({"id": creature_id, "status": 404, "error": "Creature not found"})
+            continue
+        found += 1
+        results.append({"id": creature_id, "status": 200, "creature": serialize_creature(creature)})
+
+    return FastJSONResponse({
+        "found": found,
+        "missing": len(results) - found,
+        "results": results
+    })
+
+def _validation_message(error: ValidationError) -> str:
+    """Compact one-line summary of a pydantic validation error."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'body'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
 
 @router.get("/{creature_id}", response_model=CreatureResponse)
-async def get_creature(creature_id: str):
+async def get_creature(creature_id: str, if_none_match: Optional[str] = Header(default=None)):
     """Get a specific creature by ID."""
 
     if creature_id not in creatures_db:
         raise HTTPException(status_code=404, detail="Creature not found")
 
     creature = creatures_db[creature_id]
+    etag = creature_etag(creature)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, REVALIDATE_CACHE_CONTROL)
 
-    return CreatureResponse(
-        id=creature.id,
-        name=creature.name,
-        creature_type=creature.creature_type,
-        stats={
-            "speed": creature.base_stats.speed,
-            "health": creature.base_stats.health,
-            "defense": creature.base_stats.defense,
-            "strength": creature.base_stats.strength,
-            "luck": creature.base_stats.luck,
-        },
-        current_hp=creature.current_hp,
-        max_hp=creature.max_hp,
-        defend_uses=creature.defend_uses_remaining,
-        special_uses=creature.special_uses_remaining,
+    return FastJSONResponse(
+        serialize_creature(creature),
+        headers={"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
     )
 
 @router.get("", response_model=List[CreatureResponse])
-async def list_creatures():
-    """List all created creatures."""
-
-    return [
-        CreatureResponse(
-            id=creature.id,
-            name=creature.name,
-            creature_type=creature.creature_type,
-            stats={
-                "speed": creature.base_stats.speed,
-                "health": creature.base_stats.health,
-                "defense": creature.base_stats.defense,
-                "strength": creature.base_stats.strength,
-                "luck": creature.base_stats.luck,
-            },
-            current_hp=creature.current_hp,
-            max_hp=creature.max_hp,
-            defend_uses=creature.defend_uses_remaining,
-            special_uses=creature.special_uses_remaining,
+async def list_creatures(
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    creature_type: Optional[CreatureType] = None,
+    is_ai: Optional[bool] = None,
+    sort: Literal["created", "speed", "health", "defense", "strength", "luck"] = "created",
+    order: Literal["asc", "desc"] = "asc",
+    min_speed: Optional[int] = None,
+    max_speed: Optional[int] = None,
+    min_health: Optional[int] = None,
+    max_health: Optional[int] = None,
+    min_defense: Optional[int] = None,
+    max_defense: Optional[int] = None,
+    min_strength: Optional[int] = None,
+    max_strength: Optional[int] = None,
+    min_luck: Optional[int] = None,
+    max_luck: Optional[int] = None,
+):
+    """
+    List created creatures one page at a time.
+
+    The cursor for the next page is returned in the X-Next-Cursor header, which
+    is absent on the last page.
+    """
+
+    # Pick up creatures created or changed by other workers (shared storage only)
+    for creature in creatures_db.poll_changes():
+        creature_index.add(creature)
+
+    ranges = {
+        "speed": (min_speed, max_speed),
+        "health": (min_health, max_health),
+        "defense": (min_defense, max_defense),
+        "strength": (min_strength, max_strength),
+        "luck": (min_luck, max_luck),
+    }
+    try:
+        creature_ids, next_cursor = creature_index.query(
+            creature_type=creature_type,
+            is_ai=is_ai,
+            sort=sort,
+            descending=order == "desc",
+            ranges=ranges,
+            limit=limit,
+            cursor=cursor
         )
-        for creature in creatures_db.values()
-    ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    page = []
+    for creature_id in creature_ids:
+        creature = creatures_db.peek(creature_id)
+        if creature is None:
+            # Deleted by another worker, or otherwise gone from storage
+            creature_index.remove(creature_id)
+            continue
+        page.append(serialize_creature(creature))
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return FastJSONResponse(page, headers=headers)
@@ -2,19 +2,124 @@
 API routes for game flow and tournament management.
 """
 
-from typing import List
-from fastapi import APIRouter, HTTPException
+import logging
+import math
+import os
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
 from ..logic.narrator import NarratorAgent
-from pydantic import BaseModel
-from ..models.game_state import GameState, TournamentBracket
+from pydantic import BaseModel, Field, ValidationError
+from ..models.game_state import GameState, Match, TournamentBracket
 from ..models.move import Move, MoveType
 from ..logic.tournament import TournamentManager
 from ..logic.combat import CombatEngine
 from ..logic.ai_opponent import AIOpponentGenerator
-
-router = APIRouter(prefix="/game", tags=["game"])
-
-games_db = {}
+from ..logic import journal
+from ..logic.journal import GameJournal, create_journal
+from ..logic.locks import KeyedLocks
+from ..logic.broadcast import BroadcastHub, Subscription, format_sse
+from ..logic.matchmaking import MatchmakingQueue, TurnSynchronizer
+from ..middleware.admission import release_admission_slot
+from ..middleware.rate_limit import DEFAULT_ROUTE_COSTS
+from ..middleware.route_table import RouteTable
+from ..observability.metrics import (
+    COMBAT_TURNS,
+    NARRATION_ERRORS,
+    NARRATION_FIRST_TOKEN_SECONDS,
+    NARRATION_SECONDS,
+)
+from ..observability.tracing import SERVER, TRACER
+from ..storage import MemoryStore, create_store, estimate_game_bytes
+from .http_cache import REVALIDATE_CACHE_CONTROL, etag_matches, game_etag, not_modified
+from .idempotency import IdempotencyCache, provisional
+from .serializers import (
+    FastJSONResponse,
+    champion_name,
+    diff_game_state,
+    serialize_match,
+    serialize_stats,
+    state_history,
+)
+
+router = APIRouter(prefix="/game", tags=["game"], default_response_class=FastJSONResponse)
+
+logger = logging.getLogger(__name__)
+
+# Idle games leave memory after GAME_TTL_SECONDS; the least recently used games
+# are evicted once the estimated footprint passes GAMES_MAX_BYTES. With a SQLite
+# backend (see storage.create_store), evicted games reload on demand.
+GAME_TTL_SECONDS = float(os.getenv("PET_BATTLER_GAME_TTL_SECONDS", "3600"))
+GAMES_MAX_BYTES = int(os.getenv("PET_BATTLER_GAMES_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def _link_loaded_game(game: GameState) -> GameState:
+    """Make a game loaded from storage or a snapshot share its player creatures with the creature store."""
+    from .creature_routes import creatures_db
+    for creature in game.player_creatures:
+        creatures_db.cache(creature.id, creature)
+    return game
+
+
+games_db: MemoryStore[GameState] = create_store(
+    "games",
+    after_load=_link_loaded_game,
+    ttl_seconds=GAME_TTL_SECONDS,
+    max_bytes=GAMES_MAX_BYTES,
+    size_of=estimate_game_bytes
+)
+
+# Append-only journal of every game change, replayed at startup (None when off)
+game_journal: Optional[GameJournal] = create_journal()
+
+# Serializes changes to each game; different games proceed independently
+game_locks = KeyedLocks()
+
+# Responses to recent requests that carried an Idempotency-Key, replayed on retry
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("PET_BATTLER_IDEMPOTENCY_TTL_SECONDS", "3600"))
+IDEMPOTENCY_KEYS_PER_GAME = int(os.getenv("PET_BATTLER_IDEMPOTENCY_KEYS_PER_GAME", "64"))
+idempotency_cache = IdempotencyCache(
+    ttl_seconds=IDEMPOTENCY_TTL_SECONDS,
+    max_keys_per_game=IDEMPOTENCY_KEYS_PER_GAME
+)
+
+# Fans out live match updates to spectators, one topic per game
+spectator_hub = BroadcastHub(max_queue_size=100)
+SPECTATOR_KEEPALIVE_SECONDS = 15.0
+
+# PvP: queued players waiting for an opponent, and first movers waiting on a turn
+matchmaking_queue = MatchmakingQueue()
+pvp_turns = TurnSynchronizer()
+OPPONENT_WAIT_SECONDS = 25.0
+
+# A move sent over the battle WebSocket spends the same rate-limit tokens as
+# POST /game/{game_id}/move (the HTTP rate limiter never sees WebSocket frames)
+WS_MOVE_COST = RouteTable(DEFAULT_ROUTE_COSTS, 1.0).lookup("POST", "/game/{game_id}/move")
+
+# Upper bound on turns resolved by a single batch request
+MAX_BATCH_TURNS = 100
+
+NO_ACTIVE_MATCH_DETAIL = (
+    "No active match - ensure you've started a NEW game "
+    "after finishing a tournament."
+)
+MATCHMAKING_MAX_WAIT_SECONDS = 30.0
+
+NARRATOR_MODEL = "gpt-4-1106-preview"
+_narrator: Optional[NarratorAgent] = None
+
+
+def get_narrator() -> Optional[NarratorAgent]:
+    """Return the shared narrator, or None if no OpenAI API key is configured."""
+    global _narrator  # pylint: disable=global-statement
+    if _narrator is None:
+        try:
+            _narrator = NarratorAgent(model=NARRATOR_MODEL)
+        except ValueError:
+            return None
+    return _narrator
 
 
 class StartGameRequest(BaseModel):
@@ -32,6 +137,38 @@ class SubmitMoveRequest(BaseModel):
     move_type: str
 
 
+class BatchMovesRequest(BaseModel):
+    """
+    Request model for resolving several turns at once.
+
+    Provide either an explicit move sequence or policy="auto" to let the AI
+    pick the player's moves. Play stops when the current match ends.
+    """
+
+    creature_id: str
+    moves: Optional[List[str]] = Field(default=None, min_length=1, max_length=MAX_BATCH_TURNS)
+    policy: Optional[str] = None  # "auto"
+    max_turns: int = Field(default=MAX_BATCH_TURNS, ge=1, le=MAX_BATCH_TURNS)
+    narrate: bool = False
+
+
+class JoinMatchmakingRequest(BaseModel):
+    """Request model for queueing a creature for a PvP match."""
+
+    creature_id: str
+    rating: Optional[int] = None  # Defaults to the creature's total stats
+
+
+class TurnOutcome(BaseModel):
+    """Result of applying a move, shared with a PvP opponent waiting on the turn."""
+
+    latest_results: List[str] = []
+    completed_match_winner: Optional[str] = None
+    narration_pending: bool = False
+    narration_after: Optional[int] = None  # Narration cursor just before this request's turns
+    waiting_key: Optional[Tuple[str, int]] = None  # Set while waiting for a PvP opponent
+
+
 class AllocateStatsRequest(BaseModel):
     """Request model for allocating stat points after winning a match."""
 
@@ -39,8 +176,8 @@ class AllocateStatsRequest(BaseModel):
     stat_allocations: dict  # e.g., {"speed": 1, "strength": 2}
 
 
-def auto_complete_ai_matches(tournament: TournamentBracket, current_round: int):
-    """Auto-complete all AI-only matches in the current round."""
+def auto_complete_ai_matches(tournament: TournamentBracket, current_round: int) -> List[Match]:
+    """Auto-complete all AI-only matches in the current round. Returns the completed matches."""
     ai_matches = [
         m for m in tournament.matches
         if not m.is_complete
@@ -60,6 +197,8 @@ def auto_complete_ai_matches(tournament: TournamentBracket, current_round: int):
         if winner.id:
             match.set_winner(winner.id)
 
+    return ai_matches
+
 
 @router.post("/start")
 async def start_game(request: StartGameRequest):
@@ -77,7 +216,6 @@ async def start_game(request: StartGameRequest):
             tournament_size=request.tournament_size
         )
 
-        import uuid
         game = GameState(
             game_id=str(uuid.uuid4()),
             num_players=request.num_players,
@@ -86,40 +224,231 @@ async def start_game(request: StartGameRequest):
         )
 
         games_db[game.game_id] = game
+        if game_journal is not None:
+            game_journal.record([journal.game_started(game)])
         current_match = game.get_current_match()
-        match_state = None
-
-        if current_match:
-            match_state = {
-                "match_id": current_match.match_id,
-                "creature1_id": current_match.creature1.id,
-                "creature1_name": current_match.creature1.name,
-                "creature1_type": current_match.creature1.creature_type.value,
-                "creature1_hp": current_match.creature1.current_hp,
-                "creature1_max_hp": current_match.creature1.max_hp,
-                "creature2_id": current_match.creature2.id,
-                "creature2_name": current_match.creature2.name,
-                "creature2_type": current_match.creature2.creature_type.value,
-                "creature2_hp": current_match.creature2.current_hp,
-                "creature2_max_hp": current_match.creature2.max_hp,
-                "turn_number": current_match.turn_number,
-                "bracket_round": current_match.bracket_round,
-                "current_round": current_match.bracket_round,
-                "is_complete": current_match.is_complete
-            }
-
-        return {
+
+        return FastJSONResponse({
             "game_id": game.game_id,
-            "current_match": match_state,
+            "current_match": serialize_match(current_match) if current_match else None,
             "tournament_complete": False
-        }
+        })
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
+@router.post("/matchmaking")
+async def join_matchmaking(request: JoinMatchmakingRequest):
+    """Queue a creature for a PvP match, pairing it with the closest-rated waiting player."""
+    from .creature_routes import creatures_db
+
+    if request.creature_id not in creatures_db:
+        raise HTTPException(status_code=404, detail=f"Creature {request.creature_id} not found")
+
+    creature = creatures_db[request.creature_id]
+    try:
+        ticket, opponent = matchmaking_queue.join(creature, rating=request.rating)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+
+    if opponent is not None:
+        # The earlier arrival takes the creature1 slot
+        game = GameState(
+            game_id=str(uuid.uuid4()),
+            num_players=2,
+            player_creatures=[opponent.creature, creature],
+            tournament=TournamentManager.create_duel(opponent.creature, creature)
+        )
+        games_db[game.game_id] = game
+        if game_journal is not None:
+            game_journal.record([journal.game_started(game)])
+        matchmaking_queue.complete(ticket, opponent, game.game_id)
+
+    return FastJSONResponse(ticket.to_dict())
+
+
+@router.get("/matchmaking/{ticket_id}")
+async def wait_for_match(
+    ticket_id: str,
+    timeout: float = Query(default=25.0, ge=0, le=MATCHMAKING_MAX_WAIT_SECONDS)
+):
+    """Long-poll a matchmaking ticket until it is matched or the timeout expires."""
+    ticket = await matchmaking_queue.wait(ticket_id, timeout)
+    if ticket is None:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return FastJSONResponse(ticket.to_dict())
+
+
+@router.delete("/matchmaking/{ticket_id}")
+async def leave_matchmaking(ticket_id: str):
+    """Remove a waiting ticket from the matchmaking queue."""
+    if not matchmaking_queue.cancel(ticket_id):
+        raise HTTPException(status_code=404, detail="Ticket not waiting")
+    return FastJSONResponse({"success": True, "ticket_id": ticket_id})
+
+
 @router.post("/{game_id}/move")
-async def submit_move(game_id: str, request: SubmitMoveRequest):
-    narrator = NarratorAgent(model="gpt-4-1106-preview")
-    """Submit a move for a creature in the current match."""
+async def submit_move(
+    game_id: str,
+    request: SubmitMoveRequest,
+    idempotency_key: Optional[str] = Header(default=None)
+):
+    """
+    Submit a move for a creature in the current match.
+
+    With an Idempotency-Key header, a retry of the same move replays the first
+    response instead of playing the move again. If that response was still
+    waiting for the PvP opponent, the retry returns the resolved turn, or
+    waits for it again.
+    """
+    async def respond() -> Response:
+        game, outcome = await apply_move_locked(game_id, request)
+        return await respond_to_turn(game, outcome)
+
+    async def respond_to_turn(game: GameState, outcome: TurnOutcome) -> Response:
+        body = await turn_response(game, request.creature_id, outcome)
+        with TRACER.start_span("serialize_response"):
+            response = FastJSONResponse(body)
+        if body["waiting_for_opponent"]:
+            # A retry with the same key picks up the resolved turn instead of this
+            return provisional(response, lambda: respond_to_turn(games_db.peek(game_id) or game, outcome))
+        return response
+
+    attributes = {"http.route": "/game/{game_id}/move", "game.id": game_id, "move.type": request.move_type}
+    with TRACER.start_span("submit_move", SERVER, attributes):
+        if idempotency_key is None:
+            return await respond()
+        fingerprint = ("move", request.model_dump_json())
+        return await idempotency_cache.respond(game_id, idempotency_key, fingerprint, respond)
+
+
+async def play_move(game_id: str, request: SubmitMoveRequest) -> Dict[str, Any]:
+    """
+    Apply a move and build the response for the submitting creature.
+
+    Shared by the HTTP and WebSocket move handlers. In a PvP match the first
+    mover waits for the opponent; see turn_response().
+    """
+    game, outcome = await apply_move_locked(game_id, request)
+    return await turn_response(game, request.creature_id, outcome)
+
+
+async def apply_move_locked(game_id: str, request: SubmitMoveRequest) -> Tuple[GameState, TurnOutcome]:
+    """apply_move() under the game's lock, in a storage transaction."""
+    # The lock is released before a PvP first mover waits, so the opponent can move
+    async with game_locks.lock(game_id):
+        with games_db.transaction():
+            return apply_move(game_id, request)
+
+
+async def turn_response(game: GameState, creature_id: str, outcome: TurnOutcome) -> Dict[str, Any]:
+    """
+    Build the move response for a turn outcome.
+
+    A PvP first mover waits here (without polling) until the opponent's move
+    resolves the turn, or until OPPONENT_WAIT_SECONDS pass with the move left
+    pending (waiting_for_opponent is then true). It gives back its admission
+    slot first, since it waits on the opponent rather than on the server.
+    """
+    if outcome.waiting_key is not None:
+        release_admission_slot()
+        resolved = await pvp_turns.wait(outcome.waiting_key, OPPONENT_WAIT_SECONDS)
+        if resolved is None:
+            response = build_move_response(game, creature_id, outcome)
+            response["waiting_for_opponent"] = True
+            return response
+        outcome = resolved
+
+    return build_move_response(game, creature_id, outcome)
+
+
+@router.post("/{game_id}/moves")
+async def submit_moves(game_id: str, request: BatchMovesRequest):
+    """Resolve up to max_turns turns, or the rest of the current match, in one request."""
+
+    if game_id not in games_db:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    if (request.moves is None) == (request.policy is None):
+        raise HTTPException(status_code=400, detail="Provide either moves or policy")
+    if request.policy is not None and request.policy != "auto":
+        raise HTTPException(status_code=400, detail=f"Invalid policy: {request.policy}")
+    for move_type in request.moves or []:
+        if move_type.lower() not in ("attack", "defend", "special"):
+            raise HTTPException(status_code=400, detail=f"Invalid move type: {move_type}")
+
+    async with game_locks.lock(game_id):
+        with games_db.transaction():
+            game = games_db[game_id]
+            if game.get_current_match() is None:
+                raise HTTPException(status_code=400, detail=NO_ACTIVE_MATCH_DETAIL)
+
+            turn_limit = len(request.moves) if request.moves is not None else request.max_turns
+            turns = []
+            outcome = None
+            narration_after = game.narration_count
+
+            for index in range(turn_limit):
+                current_match = game.get_current_match()
+                if not current_match.creature2.is_ai:
+                    raise HTTPException(status_code=400, detail="Batch moves require an AI opponent")
+
+                if request.moves is not None:
+                    move_type = request.moves[index]
+                else:
+                    player, opponent = current_match.creature1, current_match.creature2
+                    if player.id != request.creature_id:
+                        player, opponent = opponent, player
+                    move_type = AIOpponentGenerator.decide_move(player, opponent, current_match.turn_number).value
+
+                _, outcome = apply_move(
+                    game_id,
+                    SubmitMoveRequest(creature_id=request.creature_id, move_type=move_type),
+                    narrate=request.narrate
+                )
+                turns.append(_summarize_turn(current_match, request.creature_id, outcome))
+
+                if outcome.completed_match_winner or game.is_complete:
+                    break
+
+    # The final stream URL covers every turn narrated by this batch
+    outcome = outcome.model_copy(update={"narration_after": narration_after})
+    return FastJSONResponse({
+        "game_id": game_id,
+        "turns_played": len(turns),
+        "turns": turns,
+        "final": build_move_response(game, request.creature_id, outcome)
+    })
+
+
+def _summarize_turn(match: Match, creature_id: str, outcome: TurnOutcome) -> Dict[str, Any]:
+    """Compact per-turn summary from the player's point of view."""
+    player_is_first = match.creature1.id == creature_id
+    player, opponent = (match.creature1, match.creature2) if player_is_first else (match.creature2, match.creature1)
+    first_result, second_result = match.move_history[-2:]
+    player_result, opponent_result = (
+        (first_result, second_result) if player_is_first else (second_result, first_result)
+    )
+    return {
+        "turn": match.turn_number,
+        "player_move": player_result.move.move_type.value,
+        "opponent_move": opponent_result.move.move_type.value,
+        "player_hp": player.current_hp,
+        "opponent_hp": opponent.current_hp,
+        "results": outcome.latest_results
+    }
+
+
+@TRACER.traced("apply_move")
+def apply_move(
+    game_id: str,
+    request: SubmitMoveRequest,
+    narrate: bool = True
+) -> Tuple[GameState, TurnOutcome]:
+    """
+    Validate and apply a move, resolving combat once both moves are in.
+    Raises HTTPException for invalid requests. Pass narrate=False to skip
+    queueing narration for the resolved turn.
+    """
 
     if game_id not in games_db:
         raise HTTPException(status_code=404, detail="Game not found")
@@ -128,29 +457,20 @@ async def submit_move(game_id: str, request: SubmitMoveRequest):
     current_match = game.get_current_match()
 
     if not current_match:
-        # Added diagnostic detail to help trace post-tournament / new game issues
-        print(
-            f"[Move] No active match for game {game_id}. "
-            f"is_complete={game.is_complete}. "
-            f"Tournament present={game.tournament is not None}"
-        )
-        if game.tournament:
-            incomplete = [
-                m.match_id for m in game.tournament.matches
-                if not m.is_complete
-            ]
-            print(f"[Move] Incomplete match IDs: {incomplete}")
-            if not incomplete:
-                msg = (
-                    "[Move] All matches complete - client may be using "
-                    "an old game_id after tournament end."
-                )
-                print(msg)
-        detail_msg = (
-            "No active match - ensure you've started a NEW game "
-            "after finishing a tournament."
-        )
-        raise HTTPException(status_code=400, detail=detail_msg)
+        # Diagnostic detail to help trace post-tournament / new game issues
+        if logger.isEnabledFor(logging.DEBUG):
+            incomplete = [m.match_id for m in game.tournament.matches if not m.is_complete] if game.tournament else []
+            logger.debug(
+                "No active match for game %s%s", game_id,
+                " (all matches complete; client may be using an old game_id)" if game.tournament and not incomplete else "",
+                extra={
+                    "game_id": game_id,
+                    "is_complete": game.is_complete,
+                    "has_tournament": game.tournament is not None,
+                    "incomplete_matches": incomplete
+                }
+            )
+        raise HTTPException(status_code=400, detail=NO_ACTIVE_MATCH_DETAIL)
 
     if current_match.is_complete:
         raise HTTPException(status_code=400, detail="Current match is complete")
@@ -184,7 +504,11 @@ async def submit_move(game_id: str, request: SubmitMoveRequest):
     current_match.add_move(request.creature_id, move)
 
     latest_results = []
+    journal_events = []  # Recorded together once the move is applied
     completed_match_winner = None  # Track winner before tournament advances
+    narration_pending = False
+    narration_after = None
+    turn_key = (current_match.match_id, current_match.turn_number)
 
     # If opponent is AI, make its move automatically
     if current_match.creature2.is_ai and current_match.creature2.id not in current_match.pending_moves:
@@ -206,7 +530,9 @@ async def submit_move(game_id: str, request: SubmitMoveRequest):
 
         # Execute combat
         result1, result2 = CombatEngine.execute_moves(creature1, move1, creature2, move2)
-
+        COMBAT_TURNS.inc()
+        if game_journal is not None:
+            journal_events.append(journal.turn_resolved(game_id, current_match, result1, result2))
 
         # Store results
         current_match.move_history.append(result1)
@@ -214,6 +540,8 @@ async def submit_move(game_id: str, request: SubmitMoveRequest):
         latest_results = [result1.message, result2.message]
 
         # --- Narration Integration ---
+        # Narration is streamed separately via /narration/stream so the combat
+        # result is returned without waiting on the LLM.
         narration_event = {
             "round": current_match.turn_number + 1,  # since we increment after
             "creature1": creature1.name,
@@ -224,7 +552,12 @@ async def submit_move(game_id: str, request: SubmitMoveRequest):
             "creature1_hp": creature1.current_hp,
             "creature2_hp": creature2.current_hp
         }
-        narration = narrator.generate_narration(narration_event)
+        if narrate:
+            narration_after = game.narration_count
+            game.narration_count += 1
+            narration_event["seq"] = game.narration_count
+            game.pending_narrations.append(narration_event)
+            narration_pending = True
         # --- End Narration Integration ---
 
         # Clear pending moves
@@ -243,44 +576,93 @@ async def submit_move(game_id: str, request: SubmitMoveRequest):
 
         # If match is complete, check tournament progression
         if current_match.is_complete:
-            # Check if the player lost (their creature died)
-            player_lost = False
-            for player_creature in game.player_creatures:
-                if player_creature.id == creature1.id and not creature1.is_alive():
-                    player_lost = True
-                    break
+            # The player is eliminated when a player creature loses to an AI.
+            # In a PvP duel both creatures are players, so the bracket decides.
+            player_ids = {pc.id for pc in game.player_creatures}
+            loser_id = creature1.id if completed_match_winner == creature2.id else creature2.id
+            player_lost = loser_id in player_ids and completed_match_winner not in player_ids
 
             if player_lost:
                 # Player lost - they're out of the tournament
                 game.is_complete = True
                 latest_results.append("Game Over - You have been eliminated from the tournament!")
+                if game_journal is not None:
+                    journal_events.append(journal.player_eliminated(game_id))
             else:
                 # Player won - auto-complete other AI-only matches in this round
                 current_round = game.tournament.current_round
-                print(f"Auto-completing AI matches for bracket round {current_round}")
-                auto_complete_ai_matches(game.tournament, current_round)
-
-                # Check how many matches are still incomplete
-                incomplete = [m for m in game.tournament.matches if not m.is_complete and m.bracket_round == current_round]
-                print(f"Incomplete matches after auto-complete: {len(incomplete)}")
-                for m in incomplete:
-                    print(f"  - {m.creature1.name} vs {m.creature2.name}, AI1: {m.creature1.is_ai}, AI2: {m.creature2.is_ai}")
+                auto_completed = auto_complete_ai_matches(game.tournament, current_round)
+                debug = logger.isEnabledFor(logging.DEBUG)
+                if debug:
+                    incomplete = [
+                        f"{m.creature1.name} vs {m.creature2.name}"
+                        for m in game.tournament.matches if not m.is_complete and m.bracket_round == current_round
+                    ]
+                    logger.debug(
+                        "Auto-completed %d AI matches in bracket round %d", len(auto_completed), current_round,
+                        extra={"game_id": game_id, "incomplete_matches": incomplete}
+                    )
 
                 # Player won this match - check if tournament continues
+                first_new_match = len(game.tournament.matches)
                 tournament_continues = TournamentManager.advance_tournament(game.tournament)
-                print(f"Tournament continues: {tournament_continues}, New bracket round: {game.tournament.current_round}")
-                # Bracket diagnostic summary
-                print("[Bracket Summary]")
-                for m in game.tournament.matches:
-                    print(f"  Round {m.bracket_round} | Match {m.match_id[:8]} | {m.creature1.name} vs {m.creature2.name} | complete={m.is_complete} | winner={m.winner_id}")
+                if game_journal is not None:
+                    journal_events.append(journal.round_advanced(
+                        game_id, auto_completed, game.tournament.matches[first_new_match:]
+                    ))
+                if debug:
+                    # Bracket diagnostic summary, built only when it will be written
+                    bracket = [
+                        f"round {m.bracket_round} | match {m.match_id[:8]} | {m.creature1.name} vs {m.creature2.name}"
+                        f" | complete={m.is_complete} | winner={m.winner_id}"
+                        for m in game.tournament.matches
+                    ]
+                    logger.debug(
+                        "Bracket advanced to round %d (tournament continues: %s)",
+                        game.tournament.current_round, tournament_continues,
+                        extra={"game_id": game_id, "bracket": bracket}
+                    )
 
                 if not tournament_continues:
                     # Tournament complete!
                     champion = TournamentManager.get_tournament_winner(game.tournament)
                     game.set_champion(champion.id)
+                    if game_journal is not None:
+                        journal_events.append(journal.champion_selected(game_id, champion.id))
                     latest_results.append(f"🏆 {champion.name} is the tournament champion! 🏆")
 
-    # Build response
+    elif not current_match.creature2.is_ai:
+        # PvP: the first mover waits for the opponent's move
+        if game_journal is not None:
+            game_journal.record([journal.move_submitted(game_id, current_match, move)])
+        _commit_game(game)
+        return game, TurnOutcome(waiting_key=turn_key)
+
+    if journal_events:
+        game_journal.record(journal_events)
+    _commit_game(game)
+    outcome = TurnOutcome(
+        latest_results=latest_results,
+        completed_match_winner=completed_match_winner,
+        narration_pending=narration_pending,
+        narration_after=narration_after
+    )
+    pvp_turns.resolve(turn_key, outcome)
+
+    # Building the state is a full serialization; skip it when nobody is watching
+    if spectator_hub.subscriber_count(game_id):
+        state = build_game_state(game)
+        if state["current_match"]:
+            state["current_match"] = {**state["current_match"], "latest_results": latest_results}
+        spectator_hub.publish(game_id, "match_update", state)
+
+    return game, outcome
+
+
+@TRACER.traced("build_move_response")
+def build_move_response(game: GameState, creature_id: str, outcome: TurnOutcome) -> Dict[str, Any]:
+    """Build the move response for the creature that submitted the move."""
+    game_id = game.game_id
     current_match = game.get_current_match()
     match_state = None
 
@@ -290,172 +672,360 @@ async def submit_move(game_id: str, request: SubmitMoveRequest):
     match_just_completed = False
     current_stats = None
 
-    if completed_match_winner:
+    if outcome.completed_match_winner:
         match_just_completed = True
-        # Check if player's creature won the just-completed match
+        # Check if the submitting player's creature won the just-completed match
         for player_creature in game.player_creatures:
-            if player_creature.id == completed_match_winner:
+            if player_creature.id == outcome.completed_match_winner == creature_id:
                 player_won_match = True
                 # Only award points if tournament is still ongoing
                 if not game.is_complete:
                     stat_points_available = 3
                     # Include current stats for display
-                    current_stats = {
-                        "speed": player_creature.base_stats.speed,
-                        "health": player_creature.base_stats.health,
-                        "defense": player_creature.base_stats.defense,
-                        "strength": player_creature.base_stats.strength,
-                        "luck": player_creature.base_stats.luck
-                    }
+                    current_stats = serialize_stats(player_creature)
                 break
 
     if current_match:
-        winner_name = None
-        if current_match.is_complete:
-            winner_name = (current_match.creature1.name
-                          if current_match.winner_id == current_match.creature1.id
-                          else current_match.creature2.name)
-
-        match_state = {
-            "match_id": current_match.match_id,
-            "creature1_id": current_match.creature1.id,
-            "creature1_name": current_match.creature1.name,
-            "creature1_type": current_match.creature1.creature_type.value,
-            "creature1_hp": current_match.creature1.current_hp,
-            "creature1_max_hp": current_match.creature1.max_hp,
-            "creature2_id": current_match.creature2.id,
-            "creature2_name": current_match.creature2.name,
-            "creature2_type": current_match.creature2.creature_type.value,
-            "creature2_hp": current_match.creature2.current_hp,
-            "creature2_max_hp": current_match.creature2.max_hp,
-            "turn_number": current_match.turn_number,
-            "bracket_round": current_match.bracket_round,
-            "current_round": current_match.turn_number,
-            "is_complete": current_match.is_complete,
-            "winner_name": winner_name,
-            "latest_results": latest_results
-        }
-
-    champion_name = None
-    if game.is_complete and game.champion_id:
-        for creature in [c for match in game.tournament.matches for c in [match.creature1, match.creature2]]:
-            if creature.id == game.champion_id:
-                champion_name = creature.name
-                break
+        match_state = serialize_match(current_match, latest_results=outcome.latest_results)
 
+    narration_pending = outcome.narration_pending
     return {
         "game_id": game.game_id,
         "current_match": match_state,
         "tournament_complete": game.is_complete,
-        "champion_name": champion_name,
+        "champion_name": champion_name(game),
         "player_won_match": player_won_match,
         "stat_points_available": stat_points_available,
         "match_just_completed": match_just_completed,
         "current_stats": current_stats,
-        "narration": narration if 'narration' in locals() else None
+        "waiting_for_opponent": False,
+        "narration": None,
+        "narration_pending": narration_pending,
+        "narration_stream_url": (
+            f"/game/{game_id}/narration/stream?after={outcome.narration_after}" if narration_pending else None
+        )
     }
 
 
-@router.get("/{game_id}/state")
-async def get_game_state(game_id: str):
-    """Get the current state of a game."""
+NARRATION_UNAVAILABLE = NARRATION_ERRORS.labels("unavailable")
+
+
+async def _unavailable_narration() -> AsyncIterator[str]:
+    """Fallback token stream used when no narrator is configured."""
+    yield "[Narrator unavailable]"
+
+
+async def _narration_frames(
+    game_id: str,
+    events: List[Dict[str, Any]]
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (event name, payload) pairs narrating each pending event, token by token.
+    The completed narration is also published to the game's spectators.
+    """
+    narrator = get_narrator()
+    for event in events:
+        if narrator is None:
+            NARRATION_UNAVAILABLE.inc()
+        tokens = narrator.stream_narration(event) if narrator else _unavailable_narration()
+        parts = []
+        started = time.perf_counter()
+        async for token in tokens:
+            if not parts:
+                NARRATION_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started)
+            parts.append(token)
+            yield "token", {"round": event["round"], "text": token}
+        NARRATION_SECONDS.observe(time.perf_counter() - started)
+        narration = {"round": event["round"], "text": "".join(parts).strip()}
+        spectator_hub.publish(game_id, "narration", narration)
+        yield "narration", narration
+
+
+def _narrations_after(game: GameState, after: int) -> List[Dict[str, Any]]:
+    """
+    A game's queued narration events past a reader's cursor. The queue is
+    shared by every stream, so it is never drained; older events fall off it.
+    """
+    return [event for event in game.pending_narrations if event.get("seq", 0) > after]
+
+
+async def _narration_event_stream(game_id: str, events: List[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Stream narration tokens for each pending event as SSE, then an end marker."""
+    async for name, data in _narration_frames(game_id, events):
+        yield format_sse(name, data)
+    yield format_sse("end", {})
+
+
+@router.get("/{game_id}/narration/stream")
+async def stream_narration(game_id: str, after: int = 0):
+    """Stream narration for turns resolved after the given narration cursor as Server-Sent Events."""
 
     if game_id not in games_db:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    game = games_db[game_id]
-    current_match = game.get_current_match()
+    return StreamingResponse(
+        _narration_event_stream(game_id, _narrations_after(games_db[game_id], after)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-    match_state = None
-    if current_match:
-        winner_name = None
-        if current_match.is_complete:
-            winner_name = (current_match.creature1.name
-                          if current_match.winner_id == current_match.creature1.id
-                          else current_match.creature2.name)
-
-        match_state = {
-            "match_id": current_match.match_id,
-            "creature1_id": current_match.creature1.id,
-            "creature1_name": current_match.creature1.name,
-            "creature1_type": current_match.creature1.creature_type.value,
-            "creature1_hp": current_match.creature1.current_hp,
-            "creature1_max_hp": current_match.creature1.max_hp,
-            "creature2_id": current_match.creature2.id,
-            "creature2_name": current_match.creature2.name,
-            "creature2_type": current_match.creature2.creature_type.value,
-            "creature2_hp": current_match.creature2.current_hp,
-            "creature2_max_hp": current_match.creature2.max_hp,
-            "turn_number": current_match.turn_number,
-            "bracket_round": current_match.bracket_round,
-            "current_round": current_match.turn_number,
-            "is_complete": current_match.is_complete,
-            "winner_name": winner_name
-        }
 
-    champion_name = None
-    if game.is_complete and game.champion_id:
-        for creature in [c for match in game.tournament.matches for c in [match.creature1, match.creature2]]:
-            if creature.id == game.champion_id:
-                champion_name = creature.name
-                break
+async def _spectator_stream(
+    request: Request,
+    game: GameState,
+    subscription: Subscription
+) -> AsyncIterator[str]:
+    """Send the current state, then relay hub messages until the client disconnects."""
+    try:
+        yield format_sse("state", build_game_state(game))
+        while not await request.is_disconnected():
+            message = await subscription.get(timeout=SPECTATOR_KEEPALIVE_SECONDS)
+            yield message if message is not None else ": keepalive\n\n"
+    finally:
+        spectator_hub.unsubscribe(subscription)
 
-    return {
-        "game_id": game_id,
-        "current_match": match_state,
-        "tournament_complete": game.is_complete,
-        "champion_name": champion_name
-    }
 
+@router.get("/{game_id}/spectate")
+async def spectate_game(game_id: str, request: Request):
+    """Follow a game's match updates and narration live as Server-Sent Events."""
 
-@router.post("/{game_id}/allocate-stats")
-async def allocate_stats(game_id: str, request: AllocateStatsRequest):
-    """Allocate stat points to a creature after winning a match."""
-    from .creature_routes import creatures_db
+    if game_id not in games_db:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    subscription = spectator_hub.subscribe(game_id)
+    return StreamingResponse(
+        _spectator_stream(request, games_db[game_id], subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/{game_id}/state")
+async def get_game_state(
+    game_id: str,
+    since: Optional[int] = Query(default=None, ge=0),
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """
+    Get the current state of a game.
+
+    With ?since=<version>, returns only the fields changed since that version,
+    an empty 304 if nothing changed, or a full snapshot if the version is no
+    longer retained. Full snapshots carry an ETag for If-None-Match requests.
+    """
 
     if game_id not in games_db:
         raise HTTPException(status_code=404, detail="Game not found")
 
     game = games_db[game_id]
+    etag = game_etag(game)
+    if since is None and etag_matches(if_none_match, etag):
+        return not_modified(etag, REVALIDATE_CACHE_CONTROL)
+
+    history = state_history(game)
+    snapshot = history.snapshot(game)
+    headers = {"X-State-Version": str(game.version), "Cache-Control": REVALIDATE_CACHE_CONTROL}
+
+    if since is not None:
+        if since == game.version:
+            return Response(status_code=304, headers=headers)
+        previous = history.get(since) if since < game.version else None
+        if previous is not None:
+            return FastJSONResponse({
+                "game_id": game_id,
+                "version": game.version,
+                "since": since,
+                "delta": True,
+                "changes": diff_game_state(previous, snapshot)
+            }, headers=headers)
+
+    if since is None:
+        headers["ETag"] = etag
+    return FastJSONResponse({**snapshot, "version": game.version, "delta": False}, headers=headers)
+
+
+def _commit_game(game: GameState) -> None:
+    """
+    Record an in-place change to a game: bump its version and tell the stores.
+
+    With a persistent creature store, the player creatures are written back too
+    (combat changes their HP), in the same transaction as the game, so creature
+    reads from other workers or after a restart match the game.
+    """
+    from .creature_routes import creatures_db
 
-    if request.creature_id not in creatures_db:
-        raise HTTPException(status_code=404, detail="Creature not found")
+    game.bump_version()
+    games_db.mark_dirty(game.game_id)
+    if not creatures_db.persistent:
+        return
+    for creature in game.player_creatures:
+        if creatures_db.peek(creature.id) is creature:
+            creatures_db.mark_dirty(creature.id)
+        else:
+            creatures_db[creature.id] = creature
 
-    creature = creatures_db[request.creature_id]
 
-    # Verify this is a player's creature
-    is_player_creature = any(pc.id == request.creature_id for pc in game.player_creatures)
-    if not is_player_creature:
-        raise HTTPException(status_code=400, detail="Can only allocate stats to player creatures")
+def build_game_state(game: GameState) -> Dict[str, Any]:
+    """Build the public state payload for a game, including its version."""
+    return {**state_history(game).snapshot(game), "version": game.version}
 
-    # Validate stat allocations (should total to 3 points)
-    total_points = sum(request.stat_allocations.values())
-    if total_points != 3:
-        raise HTTPException(status_code=400, detail="Must allocate exactly 3 stat points")
 
-    # Apply stat increases
-    for stat, points in request.stat_allocations.items():
-        if stat not in ["speed", "health", "defense", "strength", "luck"]:
-            raise HTTPException(status_code=400, detail=f"Invalid stat: {stat}")
-        if points < 0:
-            raise HTTPException(status_code=400, detail="Cannot decrease stats")
+@router.post("/{game_id}/allocate-stats")
+async def allocate_stats(
+    game_id: str,
+    request: AllocateStatsRequest,
+    idempotency_key: Optional[str] = Header(default=None)
+):
+    """
+    Allocate stat points to a creature after winning a match.
+
+    With an Idempotency-Key header, a retry replays the first response instead
+    of spending the points twice.
+    """
+    async def respond() -> Response:
+        return await apply_stat_allocation(game_id, request)
+
+    if idempotency_key is None:
+        return await respond()
+    fingerprint = ("allocate-stats", request.model_dump_json())
+    return await idempotency_cache.respond(game_id, idempotency_key, fingerprint, respond)
+
+
+async def apply_stat_allocation(game_id: str, request: AllocateStatsRequest) -> Response:
+    """Validate and apply a stat allocation, returning the response."""
+    from .creature_routes import creature_index, creatures_db
 
-        current_value = getattr(creature.base_stats, stat)
-        setattr(creature.base_stats, stat, current_value + points)
+    if game_id not in games_db:
+        raise HTTPException(status_code=404, detail="Game not found")
 
-        # Update max HP if health was increased
-        if stat == "health":
-            creature.max_hp += points
-            creature.current_hp += points  # Also restore the HP gained
+    async with game_locks.lock(game_id):
+        with games_db.transaction():
+            game = games_db[game_id]
+
+            if request.creature_id not in creatures_db:
+                raise HTTPException(status_code=404, detail="Creature not found")
+
+            # Verify this is a player's creature. The game's instance is the one its
+            # matches fight with, so that is the one updated.
+            creature = next((pc for pc in game.player_creatures if pc.id == request.creature_id), None)
+            if creature is None:
+                raise HTTPException(status_code=400, detail="Can only allocate stats to player creatures")
+
+            # Validate stat allocations (should total to 3 points)
+            total_points = sum(request.stat_allocations.values())
+            if total_points != 3:
+                raise HTTPException(status_code=400, detail="Must allocate exactly 3 stat points")
+
+            # Validate everything before mutating, so a bad request never leaves the
+            # creature (and its index entries) half-updated
+            for stat, points in request.stat_allocations.items():
+                if stat not in ["speed", "health", "defense", "strength", "luck"]:
+                    raise HTTPException(status_code=400, detail=f"Invalid stat: {stat}")
+                if points < 0:
+                    raise HTTPException(status_code=400, detail="Cannot decrease stats")
+
+            # Apply stat increases (health also raises max and current HP)
+            creature.apply_stat_points(request.stat_allocations)
+            if game_journal is not None:
+                game_journal.record([journal.stats_allocated(game_id, creature.id, request.stat_allocations)])
+
+            creature_index.update(creature)
+            # _commit_game writes the creature back to a persistent store
+            if not creatures_db.persistent:
+                if creatures_db.peek(creature.id) is creature:
+                    creatures_db.mark_dirty(creature.id)
+                else:
+                    creatures_db[creature.id] = creature
+            _commit_game(game)
+
+    updated_stats = serialize_stats(creature)
+    spectator_hub.publish(game_id, "stats_allocated", {
+        "creature_id": creature.id,
+        "updated_stats": updated_stats
+    })
 
-    return {
+    return FastJSONResponse({
         "success": True,
         "creature_id": creature.id,
-        "updated_stats": {
-            "speed": creature.base_stats.speed,
-            "health": creature.base_stats.health,
-            "defense": creature.base_stats.defense,
-            "strength": creature.base_stats.strength,
-            "luck": creature.base_stats.luck
-        }
-    }
+        "updated_stats": updated_stats
+    })
+
+
+async def _send_narration(websocket: WebSocket, game: GameState, after: int) -> None:
+    """Push a game's narration past the cursor after over a WebSocket, token by token."""
+    async for name, data in _narration_frames(game.game_id, _narrations_after(game, after)):
+        message_type = "narration_token" if name == "token" else "narration"
+        await websocket.send_json({"type": message_type, **data})
+
+
+@router.websocket("/{game_id}/ws")
+async def battle_socket(websocket: WebSocket, game_id: str):
+    """
+    Long-lived battle channel for a single player.
+
+    Accepts {"type": "move", "creature_id": ..., "move_type": ...} and
+    {"type": "state"} messages, and pushes "state", "move_result",
+    "narration_token", "narration" and "error" messages back. Each move
+    spends the client's rate-limit tokens like an HTTP move; a limited move
+    gets an error with status_code 429 instead of being played.
+    """
+    if game_id not in games_db:
+        await websocket.close(code=4404, reason="Game not found")
+        return
+
+    from ..app import rate_limiter
+
+    client_ip = (websocket.client.host if websocket.client else None) or "unknown"
+    await websocket.accept()
+    await websocket.send_json({"type": "state", **build_game_state(games_db[game_id])})
+    # Narration this connection has already been sent
+    narration_cursor = games_db[game_id].narration_count
+
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except (ValueError, KeyError):
+                # Not JSON, or a binary frame
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON text frames"})
+                continue
+            message_type = message.get("type") if isinstance(message, dict) else None
+
+            if message_type == "state":
+                await websocket.send_json({"type": "state", **build_game_state(games_db[game_id])})
+                continue
+
+            if message_type != "move":
+                await websocket.send_json({"type": "error", "detail": f"Unknown message type: {message_type}"})
+                continue
+
+            retry_after = rate_limiter.acquire(client_ip, WS_MOVE_COST)
+            if retry_after:
+                await websocket.send_json({
+                    "type": "error",
+                    "status_code": 429,
+                    "detail": "Too many requests. Please try again later.",
+                    "retry_after": max(1, math.ceil(retry_after)) if retry_after != math.inf else 60
+                })
+                continue
+
+            try:
+                request = SubmitMoveRequest(
+                    creature_id=message.get("creature_id"),
+                    move_type=message.get("move_type")
+                )
+                result = await play_move(game_id, request)
+            except ValidationError:
+                await websocket.send_json({"type": "error", "detail": "Move requires creature_id and move_type"})
+                continue
+            except HTTPException as e:
+                await websocket.send_json({"type": "error", "status_code": e.status_code, "detail": e.detail})
+                continue
+
+            await websocket.send_json({"type": "move_result", **result})
+            if result["narration_pending"]:
+                game = games_db[game_id]
+                after, narration_cursor = narration_cursor, game.narration_count
+                await _send_narration(websocket, game, after)
+    except WebSocketDisconnect:
+        return
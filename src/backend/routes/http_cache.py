@@ -0,0 +1,56 @@
+"""
+Helpers for ETag and conditional request handling.
+"""
+
+import hashlib
+from typing import Optional
+from fastapi.responses import Response
+from ..models.creature import Creature
+from ..models.game_state import GameState
+
+# Public, immutable-at-runtime payloads such as the creature types list
+STATIC_CACHE_CONTROL = "public, max-age=86400"
+# Mutable resources: clients may cache but must revalidate with If-None-Match
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def etag_for_bytes(body: bytes) -> str:
+    """Strong ETag derived from a response body."""
+    return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def game_etag(game: GameState) -> str:
+    """Strong ETag for a game's full state, which changes whenever its version does."""
+    return f'"game-{game.game_id}-v{game.version}"'
+
+
+def creature_etag(creature: Creature) -> str:
+    """
+    Strong ETag for a creature.
+
+    Creatures are mutated in place by combat and stat allocation, so the tag is
+    derived from every mutable field in the response rather than stored.
+    """
+    stats = creature.base_stats
+    fingerprint = (
+        f"{creature.current_hp}:{creature.max_hp}:{stats.speed}:{stats.health}:"
+        f"{stats.defense}:{stats.strength}:{stats.luck}:"
+        f"{creature.defend_uses_remaining}:{creature.special_uses_remaining}"
+    )
+    digest = hashlib.blake2b(fingerprint.encode(), digest_size=8).hexdigest()
+    return f'"creature-{creature.id}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison, per RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Empty 304 response carrying the validators."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
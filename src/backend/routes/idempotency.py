@@ -0,0 +1,180 @@
+"""
+Idempotency-Key handling for requests that change a game.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+MAX_KEY_LENGTH = 255
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+Handler = Callable[[], Awaitable[Response]]
+# Stored result of a request: status, body, media type, and how to resume it if it was provisional
+_Result = Tuple[int, bytes, str, Optional[Handler]]
+
+
+def provisional(response: Response, resume: Handler) -> Response:
+    """
+    Mark a response as not final, such as a move still waiting for the opponent.
+
+    It is sent as usual, but a retry with the same key runs resume() for an
+    up-to-date response instead of replaying this one.
+    """
+    response.idempotency_resume = resume  # type: ignore[attr-defined]
+    return response
+
+
+class _Entry:
+    """A request seen under one key: in flight until its future resolves, then a stored response."""
+
+    __slots__ = ("fingerprint", "future", "expires_at")
+
+    def __init__(self, fingerprint: Hashable, expires_at: float):
+        self.fingerprint = fingerprint
+        self.future: "asyncio.Future[_Result]" = asyncio.get_running_loop().create_future()
+        self.expires_at = expires_at
+
+
+class IdempotencyCache:
+    """
+    Recent successful responses per game, keyed by the client's Idempotency-Key.
+
+    A retry with the same key replays the stored status and body without
+    running the handler again; a duplicate that arrives while the first request
+    is still running waits for it. Failed requests are not stored (they fail
+    before changing the game), so a retry of one runs again. A retry of a
+    provisional() response runs its resume handler instead. Each game keeps
+    at most max_keys_per_game keys for ttl_seconds, and games whose keys have
+    all expired, or the least recently used past max_games, are dropped.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 3600.0,
+        max_keys_per_game: int = 64,
+        max_games: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_keys_per_game = max_keys_per_game
+        self.max_games = max_games
+        self._clock = clock
+        self._games: "OrderedDict[str, OrderedDict[str, _Entry]]" = OrderedDict()
+        self.replays = 0
+
+    async def respond(
+        self,
+        game_id: str,
+        key: str,
+        fingerprint: Hashable,
+        handler: Handler,
+    ) -> Response:
+        """
+        Run handler once per (game, key) and replay its response for repeats.
+
+        fingerprint identifies the request (route and body); reusing a key for
+        a different request is rejected with 422.
+        """
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+
+        while True:
+            now = self._clock()
+            keys = self._keys_for(game_id, now)
+            entry = keys.get(key)
+            if entry is not None and entry.expires_at <= now and entry.future.done():
+                del keys[key]
+                entry = None
+            if entry is None:
+                return await self._run(keys, key, fingerprint, handler, now)
+
+            if entry.fingerprint != fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used for a different request"
+                )
+            try:
+                status_code, body, media_type, resume = await asyncio.shield(entry.future)
+            except asyncio.CancelledError:
+                if entry.future.cancelled():
+                    # The first request was abandoned before it finished; try to run it again
+                    continue
+                raise
+            if resume is not None:
+                if keys.get(key) is entry:
+                    del keys[key]
+                    return await self._run(keys, key, fingerprint, resume, self._clock())
+                # Another duplicate is already resuming it; wait for that
+                continue
+            self.replays += 1
+            return Response(
+                content=body,
+                status_code=status_code,
+                media_type=media_type,
+                headers={REPLAYED_HEADER: "true"}
+            )
+
+    async def _run(
+        self,
+        keys: "OrderedDict[str, _Entry]",
+        key: str,
+        fingerprint: Hashable,
+        handler: Handler,
+        now: float,
+    ) -> Response:
+        entry = _Entry(fingerprint, now + self.ttl_seconds)
+        keys[key] = entry
+        while len(keys) > self.max_keys_per_game:
+            keys.popitem(last=False)
+
+        try:
+            response = await handler()
+        except asyncio.CancelledError:
+            self._forget(keys, key, entry)
+            entry.future.cancel()
+            raise
+        except BaseException as e:
+            # Waiting duplicates get the same error; later retries run again
+            self._forget(keys, key, entry)
+            entry.future.set_exception(e)
+            entry.future.exception()  # Mark retrieved when nobody was waiting
+            raise
+
+        resume = getattr(response, "idempotency_resume", None)
+        entry.future.set_result((response.status_code, bytes(response.body), response.media_type, resume))
+        return response
+
+    @staticmethod
+    def _forget(keys: "OrderedDict[str, _Entry]", key: str, entry: _Entry) -> None:
+        if keys.get(key) is entry:
+            del keys[key]
+
+    def _keys_for(self, game_id: str, now: float) -> "OrderedDict[str, _Entry]":
+        """The key table for a game, dropping games whose keys have all expired."""
+        keys = self._games.pop(game_id, None)
+        if keys is None:
+            keys = OrderedDict()
+
+        # Games are in least recently used order, and a game's newest key expires last
+        while self._games:
+            oldest = next(iter(self._games.values()))
+            newest = next(reversed(oldest.values()), None)
+            expired = newest is None or (newest.expires_at <= now and newest.future.done())
+            if not expired and len(self._games) < self.max_games:
+                break
+            self._games.popitem(last=False)
+
+        self._games[game_id] = keys
+        return keys
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of games and keys held, and responses replayed."""
+        return {
+            "games": len(self._games),
+            "keys": sum(len(keys) for keys in self._games.values()),
+            "replays": self.replays,
+        }
@@ -0,0 +1,166 @@
+"""
+Shared serializers for match, game and creature state, and a fast JSON response class.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from fastapi.responses import JSONResponse
+from ..models.creature import Creature
+from ..models.game_state import GameState, Match
+from ..observability.encoding import dumps, orjson
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response that encodes with orjson when installed.
+
+    Handlers return it directly with already-serialized plain data, which skips
+    FastAPI's jsonable_encoder pass over the payload.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _match_static_state(match: Match) -> Dict[str, Any]:
+    """Fields that never change during a match, computed once per match."""
+    static = match._static_state  # pylint: disable=protected-access
+    if static is None:
+        creature1, creature2 = match.creature1, match.creature2
+        static = {
+            "match_id": match.match_id,
+            "creature1_id": creature1.id,
+            "creature1_name": creature1.name,
+            "creature1_type": creature1.creature_type.value,
+            "creature2_id": creature2.id,
+            "creature2_name": creature2.name,
+            "creature2_type": creature2.creature_type.value,
+            "bracket_round": match.bracket_round,
+        }
+        match._static_state = static  # pylint: disable=protected-access
+    return static
+
+
+def serialize_match(match: Match, latest_results: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Serialize a match's state. latest_results is included when given."""
+    creature1, creature2 = match.creature1, match.creature2
+    winner_name = None
+    if match.is_complete:
+        winner_name = creature1.name if match.winner_id == creature1.id else creature2.name
+
+    state = dict(_match_static_state(match))
+    state["creature1_hp"] = creature1.current_hp
+    state["creature1_max_hp"] = creature1.max_hp
+    state["creature2_hp"] = creature2.current_hp
+    state["creature2_max_hp"] = creature2.max_hp
+    state["turn_number"] = match.turn_number
+    state["current_round"] = match.turn_number
+    state["is_complete"] = match.is_complete
+    state["winner_name"] = winner_name
+    if latest_results is not None:
+        state["latest_results"] = latest_results
+    return state
+
+
+def champion_name(game: GameState) -> Optional[str]:
+    """Name of the game's champion, if the tournament has one."""
+    if not (game.is_complete and game.champion_id and game.tournament):
+        return None
+    for match in game.tournament.matches:
+        for creature in (match.creature1, match.creature2):
+            if creature.id == game.champion_id:
+                return creature.name
+    return None
+
+
+def serialize_game_state(game: GameState) -> Dict[str, Any]:
+    """Serialize the public state of a game."""
+    current_match = game.get_current_match()
+    return {
+        "game_id": game.game_id,
+        "current_match": serialize_match(current_match) if current_match else None,
+        "tournament_complete": game.is_complete,
+        "champion_name": champion_name(game)
+    }
+
+
+class GameStateHistory:
+    """
+    Recent serialized snapshots of one game, keyed by version.
+
+    The snapshot for the current version is serialized once and reused by
+    every poll until the game changes again.
+    """
+
+    def __init__(self, max_versions: int = 16):
+        self.max_versions = max_versions
+        self._snapshots: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+
+    def snapshot(self, game: GameState) -> Dict[str, Any]:
+        """Serialized state of the game at its current version."""
+        snapshot = self._snapshots.get(game.version)
+        if snapshot is None:
+            snapshot = serialize_game_state(game)
+            self._snapshots[game.version] = snapshot
+            while len(self._snapshots) > self.max_versions:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+    def get(self, version: int) -> Optional[Dict[str, Any]]:
+        """Snapshot recorded for an earlier version, if still retained."""
+        return self._snapshots.get(version)
+
+
+def state_history(game: GameState) -> GameStateHistory:
+    """The snapshot history attached to a game, created on first use."""
+    history = game._state_history  # pylint: disable=protected-access
+    if history is None:
+        history = GameStateHistory()
+        game._state_history = history  # pylint: disable=protected-access
+    return history
+
+
+def diff_game_state(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fields of new that differ from old.
+
+    When both snapshots are on the same match, only the changed match fields
+    are included under "current_match".
+    """
+    changes = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if (key == "current_match" and previous and value
+                and previous["match_id"] == value["match_id"]):
+            match_changes = {k: v for k, v in value.items() if previous.get(k) != v}
+            if match_changes:
+                changes[key] = match_changes
+        elif previous != value:
+            changes[key] = value
+    return changes
+
+
+def serialize_stats(creature: Creature) -> Dict[str, int]:
+    """Serialize a creature's base stats."""
+    stats = creature.base_stats
+    return {
+        "speed": stats.speed,
+        "health": stats.health,
+        "defense": stats.defense,
+        "strength": stats.strength,
+        "luck": stats.luck,
+    }
+
+
+def serialize_creature(creature: Creature) -> Dict[str, Any]:
+    """Serialize a creature in the CreatureResponse shape."""
+    return {
+        "id": creature.id,
+        "name": creature.name,
+        "creature_type": creature.creature_type.value,
+        "stats": serialize_stats(creature),
+        "current_hp": creature.current_hp,
+        "max_hp": creature.max_hp,
+        "defend_uses": creature.defend_uses_remaining,
+        "special_uses": creature.special_uses_remaining,
+    }
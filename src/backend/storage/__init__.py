@@ -0,0 +1,35 @@
+"""
+Storage and indexing for game and creature data.
+"""
+
+from .backends import create_flusher, create_store, storage_backend
+from .creature_index import CreatureIndex
+from .event_log import EventLog, EventLogError, read_records
+from .memory_store import MemoryStore, StoreSweeper, estimate_creature_bytes, estimate_game_bytes
+from .shared_store import SharedSQLiteRepository, SharedStore, StorageBusyError
+from .snapshot import Snapshot, SnapshotError, restore_snapshot, write_snapshot
+from .sqlite_store import PersistentStore, SQLiteRepository, WriteBehindFlusher
+
+__all__ = [
+    "CreatureIndex",
+    "EventLog",
+    "EventLogError",
+    "MemoryStore",
+    "PersistentStore",
+    "SQLiteRepository",
+    "SharedSQLiteRepository",
+    "SharedStore",
+    "Snapshot",
+    "SnapshotError",
+    "StorageBusyError",
+    "StoreSweeper",
+    "WriteBehindFlusher",
+    "create_flusher",
+    "create_store",
+    "estimate_creature_bytes",
+    "estimate_game_bytes",
+    "read_records",
+    "restore_snapshot",
+    "storage_backend",
+    "write_snapshot",
+]
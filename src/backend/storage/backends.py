@@ -0,0 +1,52 @@
+"""
+Selects the storage backend for the games and creatures stores.
+"""
+
+import os
+from typing import Any, Callable, List, Optional
+from .memory_store import MemoryStore
+from .shared_store import SharedStore, open_shared_repository
+from .sqlite_store import PersistentStore, WriteBehindFlusher, open_repository
+
+# Path of the SQLite database; persistence is off when unset
+DB_PATH_ENV = "PET_BATTLER_DB_PATH"
+FLUSH_INTERVAL_ENV = "PET_BATTLER_FLUSH_INTERVAL_SECONDS"
+# "memory", "sqlite" (write-behind, one worker) or "shared" (write-through, many workers)
+BACKEND_ENV = "PET_BATTLER_STORAGE"
+BACKENDS = ("memory", "sqlite", "shared")
+
+
+def storage_backend() -> str:
+    """Configured backend name. Defaults to "sqlite" when a database path is set, else "memory"."""
+    backend = os.getenv(BACKEND_ENV) or ("sqlite" if os.getenv(DB_PATH_ENV) else "memory")
+    if backend not in BACKENDS:
+        raise ValueError(f"{BACKEND_ENV} must be one of {', '.join(BACKENDS)}, not {backend!r}")
+    if backend != "memory" and not os.getenv(DB_PATH_ENV):
+        raise ValueError(f"{BACKEND_ENV}={backend} requires {DB_PATH_ENV}")
+    return backend
+
+
+def create_store(name: str, after_load: Optional[Callable[[Any], Any]] = None, **kwargs: Any) -> MemoryStore:
+    """
+    Create the store for a table on the configured backend.
+
+    "memory" keeps everything in process. "sqlite" is a write-behind cache over
+    a SQLite file owned by a single worker. "shared" writes through to a SQLite
+    file in WAL mode that every worker opens, so the app can run with
+    --workers N. kwargs are the MemoryStore cache limits.
+    """
+    backend = storage_backend()
+    if backend == "memory":
+        return MemoryStore(name, after_load=after_load, **kwargs)
+    path = os.environ[DB_PATH_ENV]
+    if backend == "shared":
+        return SharedStore(name, open_shared_repository(path), after_load=after_load, **kwargs)
+    return PersistentStore(name, open_repository(path), after_load=after_load, **kwargs)
+
+
+def create_flusher(stores: List[MemoryStore]) -> Optional[WriteBehindFlusher]:
+    """Write-behind flusher for the persistent stores among stores, if any."""
+    persistent = [store for store in stores if isinstance(store, PersistentStore)]
+    if not persistent:
+        return None
+    return WriteBehindFlusher(persistent, interval_seconds=float(os.getenv(FLUSH_INTERVAL_ENV, "0.5")))
@@ -0,0 +1,23 @@
+"""
+Encoding of stored games and creatures.
+"""
+
+import pickle
+from typing import Any
+
+
+def encode(value: Any) -> bytes:
+    """
+    Encode a model for storage.
+
+    Pickle keeps shared references inside a game (a player creature appears in
+    several matches) and skips re-validation, which would reject stats raised
+    past their creation limits by stat allocation. Only trusted, local data is
+    ever decoded.
+    """
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def decode(data: bytes) -> Any:
+    """Inverse of encode."""
+    return pickle.loads(data)
@@ -0,0 +1,191 @@
+"""
+Secondary indexes for filtered, sorted and paginated creature listings.
+"""
+
+import base64
+import bisect
+import itertools
+from typing import Dict, List, Optional, Tuple
+from ..models.creature import Creature, CreatureType
+
+STAT_FIELDS = ("speed", "health", "defense", "strength", "luck")
+SORT_FIELDS = ("created",) + STAT_FIELDS
+
+# ("all",), ("type", type), ("ai", is_ai) or ("type_ai", type, is_ai)
+Partition = Tuple
+
+StatRanges = Dict[str, Tuple[Optional[int], Optional[int]]]
+
+
+def _partitions(creature_type: CreatureType, is_ai: bool) -> Tuple[Partition, ...]:
+    return (
+        ("all",),
+        ("type", creature_type),
+        ("ai", is_ai),
+        ("type_ai", creature_type, is_ai),
+    )
+
+
+class CreatureIndex:
+    """
+    Sorted secondary indexes over creatures.
+
+    For each partition (all, by type, by is_ai, by type and is_ai) and each sort
+    field, the index keeps a list of (value, sequence) pairs sorted with bisect.
+    A page is read by binary-searching to the cursor (and to the sort field's
+    range bounds), then walking forward, so it never scans the whole store.
+    Range filters on stats other than the sort field are checked during the walk.
+    """
+
+    def __init__(self):
+        self._lists: Dict[Tuple[Partition, str], List[Tuple[int, int]]] = {}
+        self._ids: Dict[int, str] = {}
+        self._entries: Dict[str, Tuple[int, Dict[str, int], Tuple[Partition, ...]]] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, creature_id: str) -> bool:
+        return creature_id in self._entries
+
+    def add(self, creature: Creature) -> None:
+        """Index a new creature (or re-index an existing one)."""
+        if creature.id in self._entries:
+            self.update(creature)
+            return
+
+        sequence = next(self._sequence)
+        values = self._values(creature, sequence)
+        partitions = _partitions(creature.creature_type, creature.is_ai)
+        for partition in partitions:
+            for field, value in values.items():
+                bisect.insort(self._lists.setdefault((partition, field), []), (value, sequence))
+        self._ids[sequence] = creature.id
+        self._entries[creature.id] = (sequence, values, partitions)
+
+    def update(self, creature: Creature) -> None:
+        """Re-index the stats of a creature after they change."""
+        entry = self._entries.get(creature.id)
+        if entry is None:
+            self.add(creature)
+            return
+
+        sequence, old_values, partitions = entry
+        new_values = self._values(creature, sequence)
+        for field, value in new_values.items():
+            old_value = old_values[field]
+            if value == old_value:
+                continue
+            for partition in partitions:
+                entries = self._lists[(partition, field)]
+                del entries[bisect.bisect_left(entries, (old_value, sequence))]
+                bisect.insort(entries, (value, sequence))
+        self._entries[creature.id] = (sequence, new_values, partitions)
+
+    def remove(self, creature_id: str) -> None:
+        """Drop a creature from every index."""
+        entry = self._entries.pop(creature_id, None)
+        if entry is None:
+            return
+
+        sequence, values, partitions = entry
+        for partition in partitions:
+            for field, value in values.items():
+                entries = self._lists[(partition, field)]
+                del entries[bisect.bisect_left(entries, (value, sequence))]
+        del self._ids[sequence]
+
+    def query(
+        self,
+        creature_type: Optional[CreatureType] = None,
+        is_ai: Optional[bool] = None,
+        sort: str = "created",
+        descending: bool = False,
+        ranges: Optional[StatRanges] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[str], Optional[str]]:
+        """
+        Return one page of creature IDs and the cursor for the next page.
+
+        ranges maps stat names to inclusive (min, max) bounds; either bound may be None.
+        Raises ValueError for an unknown sort field or a malformed cursor.
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {sort}")
+
+        ranges = {field: bounds for field, bounds in (ranges or {}).items() if bounds != (None, None)}
+        entries = self._lists.get((self._partition(creature_type, is_ai), sort), [])
+
+        low, high = ranges.pop(sort, (None, None))
+        start = 0 if low is None else bisect.bisect_left(entries, (low, -1))
+        stop = len(entries) if high is None else bisect.bisect_left(entries, (high + 1, -1))
+
+        if cursor is not None:
+            position = self.decode_cursor(cursor)
+            if descending:
+                stop = min(stop, bisect.bisect_left(entries, position))
+            else:
+                start = max(start, bisect.bisect_right(entries, position))
+
+        positions = range(stop - 1, start - 1, -1) if descending else range(start, stop)
+        page: List[str] = []
+        last = None
+        for index in positions:
+            value, sequence = entries[index]
+            creature_id = self._ids[sequence]
+            if ranges and not self._in_ranges(creature_id, ranges):
+                continue
+            page.append(creature_id)
+            last = (value, sequence)
+            if len(page) == limit:
+                break
+
+        has_more = last is not None and len(page) == limit and index != positions[-1]
+        return page, self.encode_cursor(last) if has_more else None
+
+    def _in_ranges(self, creature_id: str, ranges: StatRanges) -> bool:
+        values = self._entries[creature_id][1]
+        for field, (low, high) in ranges.items():
+            value = values[field]
+            if (low is not None and value < low) or (high is not None and value > high):
+                return False
+        return True
+
+    @staticmethod
+    def _partition(creature_type: Optional[CreatureType], is_ai: Optional[bool]) -> Partition:
+        if creature_type is not None and is_ai is not None:
+            return ("type_ai", creature_type, is_ai)
+        if creature_type is not None:
+            return ("type", creature_type)
+        if is_ai is not None:
+            return ("ai", is_ai)
+        return ("all",)
+
+    @staticmethod
+    def _values(creature: Creature, sequence: int) -> Dict[str, int]:
+        stats = creature.base_stats
+        return {
+            "created": sequence,
+            "speed": stats.speed,
+            "health": stats.health,
+            "defense": stats.defense,
+            "strength": stats.strength,
+            "luck": stats.luck,
+        }
+
+    @staticmethod
+    def encode_cursor(position: Tuple[int, int]) -> str:
+        """Opaque cursor for a (value, sequence) index position."""
+        return base64.urlsafe_b64encode(f"{position[0]}.{position[1]}".encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[int, int]:
+        """Inverse of encode_cursor. Raises ValueError for malformed cursors."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            value, sequence = base64.urlsafe_b64decode(padded.encode()).decode().split(".")
+            return int(value), int(sequence)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError("Invalid cursor") from e
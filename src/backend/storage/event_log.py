@@ -0,0 +1,325 @@
+"""
+Append-only, length-prefixed event log split into segment files.
+
+Layout of every segment (little-endian):
+
+    record:  event type (u8, never 0) | payload length (u32) | payload CRC-32 (u32) | payload
+
+Appends go to the active segment, which is rotated once it passes a size limit.
+Writes reach the OS immediately; a background task fsyncs them in batches, so
+a process crash loses nothing and a machine crash loses at most one fsync
+interval. A torn record at the end of the last segment is truncated on open.
+
+Compaction rewrites every sealed segment into one compacted file named after
+the last segment it covers; segments up to that number are then ignored and
+deleted, so a crash at any point leaves either the old or the new files in use.
+"""
+
+import asyncio
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+RECORD = struct.Struct("<BII")
+
+SEGMENT_PATTERN = re.compile(r"^(segment|compacted)-(\d{8})\.log$")
+
+
+class EventLogError(ValueError):
+    """Raised when a sealed event log file is corrupt."""
+
+
+def _file_name(kind: str, number: int) -> str:
+    return f"{kind}-{number:08d}.log"
+
+
+def pack_record(event_type: int, payload: bytes) -> bytes:
+    """Header and payload of one record."""
+    return RECORD.pack(event_type, len(payload), zlib.crc32(payload)) + payload
+
+
+def read_records(path: str, strict: bool = True) -> Iterator[Tuple[int, bytes]]:
+    """
+    Iterate over the (event type, payload) records of one file.
+
+    A torn or corrupt tail raises EventLogError when strict; otherwise
+    iteration stops at the last intact record.
+    """
+    with open(path, "rb") as file:
+        if not os.fstat(file.fileno()).st_size:
+            return
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        offset = 0
+        size = len(data)
+        while offset < size:
+            end = _record_end(data, offset)
+            if end is None:
+                if strict:
+                    raise EventLogError(f"{path} is corrupt at offset {offset}")
+                return
+            yield data[offset], data[offset + RECORD.size:end]
+            offset = end
+    finally:
+        data.close()
+
+
+def _record_end(data: Any, offset: int) -> Optional[int]:
+    """End offset of the record starting at offset, or None if it is torn or corrupt."""
+    if offset + RECORD.size > len(data):
+        return None
+    event_type, length, checksum = RECORD.unpack_from(data, offset)
+    start = offset + RECORD.size
+    end = start + length
+    if event_type == 0 or end > len(data) or zlib.crc32(data[start:end]) != checksum:
+        return None
+    return end
+
+
+def _intact_length(path: str) -> int:
+    """Length of the prefix of a file made of intact records."""
+    with open(path, "rb") as file:
+        data = file.read()
+    offset = 0
+    while offset < len(data):
+        end = _record_end(data, offset)
+        if end is None:
+            break
+        offset = end
+    return offset
+
+
+def _sync_and_close(fd: int) -> None:
+    os.fsync(fd)
+    os.close(fd)
+
+
+class EventLog:
+    """
+    Append-only log of (event type, payload) records in a directory of segments.
+
+    Appends and rotation happen on the event loop thread; fsync runs in a
+    worker thread, and compaction reads sealed segments from one.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 64 * 1024 * 1024,
+        fsync_interval_seconds: float = 0.05,
+    ):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync_interval_seconds = fsync_interval_seconds
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._unsynced = False
+        self.appends = 0
+        self.bytes_appended = 0
+        self.fsyncs = 0
+        self.truncated_bytes = 0
+
+        self._compacted, self._sealed = self._recover()
+        last = self._sealed[-1] if self._sealed else (self._compacted or 0)
+        self._active = last + 1
+        self._active_bytes = 0
+        self._fd = self._open(self._active)
+
+    def _path(self, kind: str, number: int) -> str:
+        return os.path.join(self.directory, _file_name(kind, number))
+
+    def _open(self, number: int) -> int:
+        return os.open(self._path("segment", number), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def _recover(self) -> Tuple[Optional[int], List[int]]:
+        """
+        Find the files in use, delete the ones a finished compaction replaced,
+        and truncate a torn record at the end of the newest segment.
+        """
+        compacted: List[int] = []
+        segments: List[int] = []
+        for name in os.listdir(self.directory):
+            found = SEGMENT_PATTERN.match(name)
+            if found:
+                (compacted if found.group(1) == "compacted" else segments).append(int(found.group(2)))
+            elif name.endswith(".tmp"):
+                # An unfinished compaction
+                os.remove(os.path.join(self.directory, name))
+
+        base = max(compacted) if compacted else None
+        for number in compacted:
+            if number != base:
+                os.remove(self._path("compacted", number))
+        if segments:
+            newest = self._path("segment", max(segments))
+            intact = _intact_length(newest)
+            self.truncated_bytes = os.path.getsize(newest) - intact
+            if self.truncated_bytes:
+                os.truncate(newest, intact)
+
+        sealed = []
+        for number in sorted(segments):
+            path = self._path("segment", number)
+            # Empty segments are left behind by restarts without appends
+            if (base is not None and number <= base) or not os.path.getsize(path):
+                os.remove(path)
+            else:
+                sealed.append(number)
+        return base, sealed
+
+    def append(self, event_type: int, payload: bytes) -> None:
+        """Append one record with a single write."""
+        self._write(pack_record(event_type, payload))
+
+    def extend(self, events: Iterable[Tuple[int, bytes]]) -> None:
+        """Append several records with a single write."""
+        self._write(b"".join(pack_record(event_type, payload) for event_type, payload in events))
+
+    def _write(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+        self._unsynced = True
+        self.appends += 1
+        self.bytes_appended += len(data)
+        self._active_bytes += len(data)
+        if self._active_bytes >= self.segment_bytes:
+            self.rotate()
+
+    def rotate(self) -> Optional[int]:
+        """Seal the active segment and start a new one. Returns the sealed number, or None if it was empty."""
+        switched = self._switch_segment()
+        if switched is None:
+            return None
+        sealed, sealed_fd = switched
+        _sync_and_close(sealed_fd)
+        return sealed
+
+    async def rotate_async(self) -> Optional[int]:
+        """rotate(), with the fsync of the sealed segment run in a worker thread."""
+        switched = self._switch_segment()
+        if switched is None:
+            return None
+        sealed, sealed_fd = switched
+        await asyncio.to_thread(_sync_and_close, sealed_fd)
+        return sealed
+
+    def _switch_segment(self) -> Optional[Tuple[int, int]]:
+        """Send appends to a new segment. Returns the sealed number and its still open descriptor."""
+        if not self._active_bytes:
+            return None
+        with self._lock:
+            sealed, sealed_fd = self._active, self._fd
+            self._sealed.append(sealed)
+            self._active += 1
+            self._active_bytes = 0
+            self._fd = self._open(self._active)
+        return sealed, sealed_fd
+
+    def sync(self) -> None:
+        """fsync the active segment."""
+        with self._lock:
+            self._unsynced = False
+            os.fsync(self._fd)
+            self.fsyncs += 1
+
+    def records(self) -> Iterator[Tuple[int, bytes]]:
+        """Every record in the log, oldest first (used to replay it at startup)."""
+        for path in self.files():
+            yield from read_records(path)
+        yield from read_records(self._path("segment", self._active), strict=False)
+
+    def files(self) -> List[str]:
+        """Paths of the compacted file and sealed segments, oldest first."""
+        paths = [self._path("compacted", self._compacted)] if self._compacted is not None else []
+        return paths + [self._path("segment", number) for number in self._sealed]
+
+    @property
+    def sealed_count(self) -> int:
+        """Number of sealed segments not yet folded into the compacted file."""
+        return len(self._sealed)
+
+    def compact(self, rewrite: Callable[[List[str], Callable[[int, bytes], None]], Any]) -> Any:
+        """
+        Replace the compacted file and sealed segments with a rewritten copy.
+
+        rewrite(paths, emit) reads the files and calls emit(event_type, payload)
+        for each record to keep. It may run in a worker thread: appends go to
+        the active segment, which is never part of a compaction. Returns what
+        rewrite returned.
+        """
+        with self._lock:
+            through = self._sealed[-1]
+            inputs = self.files()
+        final = self._path("compacted", through)
+        temporary = f"{final}.tmp"
+        with open(temporary, "wb", buffering=1 << 20) as file:
+            result = rewrite(inputs, lambda event_type, payload: file.write(pack_record(event_type, payload)))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, final)
+        self._fsync_directory()
+
+        # Segments sealed while rewriting are kept; everything the new file covers goes
+        with self._lock:
+            self._compacted = through
+            self._sealed = [number for number in self._sealed if number > through]
+        for path in inputs:
+            os.remove(path)
+        return result
+
+    def _fsync_directory(self) -> None:
+        descriptor = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    def start(self) -> None:
+        """Start fsyncing appended records in batches on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the fsync task, then sync and close the active segment."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.close()
+
+    def close(self) -> None:
+        """Sync and close the active segment."""
+        if self._fd >= 0:
+            self.sync()
+            os.close(self._fd)
+            self._fd = -1
+
+    def stats(self) -> Dict[str, Any]:
+        """Append, fsync and segment counters."""
+        return {
+            "directory": self.directory,
+            "appends": self.appends,
+            "bytes_appended": self.bytes_appended,
+            "fsyncs": self.fsyncs,
+            "active_segment": self._active,
+            "active_bytes": self._active_bytes,
+            "sealed_segments": len(self._sealed),
+            "compacted_through": self._compacted,
+            "truncated_bytes": self.truncated_bytes,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.fsync_interval_seconds)
+            if self._unsynced:
+                await asyncio.to_thread(self.sync)
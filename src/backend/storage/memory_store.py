@@ -0,0 +1,308 @@
+"""
+Bounded in-memory stores with idle TTLs, LRU eviction and a background sweeper.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections import OrderedDict
+from typing import Any, Callable, ContextManager, Dict, Generic, Iterable, Iterator, List, MutableMapping, Optional, Tuple, TypeVar
+from ..models.creature import Creature
+from ..models.game_state import GameState
+from .codec import decode, encode
+
+V = TypeVar("V")
+
+EvictionCallback = Callable[[str, Any, str], None]
+
+# An undecoded snapshot record: (source with read(offset, length), offset, length, last access)
+LazyRecord = Tuple[Any, int, int, float]
+
+# Rough per-object costs used to estimate a store's footprint without walking
+# object graphs on every write
+CREATURE_BYTES = 1200
+MATCH_BYTES = 900
+MOVE_RECORD_BYTES = 350
+GAME_BYTES = 1500
+
+
+def estimate_creature_bytes(creature: Creature) -> int:
+    """Approximate memory held by a creature."""
+    return CREATURE_BYTES
+
+
+def estimate_game_bytes(game: GameState) -> int:
+    """
+    Approximate memory held by a game.
+
+    Finished tournaments are dominated by Match.move_history, so the estimate
+    grows with the number of recorded turns.
+    """
+    size = GAME_BYTES + CREATURE_BYTES * len(game.player_creatures)
+    if game.tournament:
+        for match in game.tournament.matches:
+            size += MATCH_BYTES + MOVE_RECORD_BYTES * len(match.move_history)
+    return size
+
+
+class MemoryStore(MutableMapping[str, V], Generic[V]):
+    """
+    Dict-like store that bounds its own size.
+
+    Entries are kept in an OrderedDict in least-recently-used order. Reads and
+    writes move an entry to the back; entries idle for longer than ttl_seconds
+    expire, and the least recently used entries are evicted once max_entries
+    or max_bytes is exceeded. Because the order is by last access, expired
+    entries are always at the front and sweep() stops at the first live one.
+
+    Objects are mutated in place by the routes, so callers report changes with
+    mark_dirty() to keep the footprint estimate current.
+
+    Entries restored from a snapshot can be registered undecoded with
+    restore_lazy(); each is decoded (and passed through after_load) the first
+    time it is accessed.
+    """
+
+    # Whether evicted entries can be loaded again from a backing store
+    persistent = False
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        size_of: Optional[Callable[[V], int]] = None,
+        on_evict: Optional[EvictionCallback] = None,
+        after_load: Optional[Callable[[V], V]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_of = size_of or (lambda value: 0)
+        self.on_evict = on_evict
+        self.after_load = after_load
+        self.clock = clock
+        # key -> (value, last access time, estimated bytes)
+        self._entries: "OrderedDict[str, Tuple[V, float, int]]" = OrderedDict()
+        self._lazy: Dict[str, LazyRecord] = {}
+        self.total_bytes = 0
+        self.evictions: Dict[str, int] = {"ttl": 0, "capacity": 0}
+        self.hits = 0
+        self.misses = 0
+
+    def __getitem__(self, key: str) -> V:
+        entry = self._live_entry(key)
+        if entry is None:
+            self.misses += 1
+            raise KeyError(key)
+        self.hits += 1
+        value, _, size = entry
+        self._entries[key] = (value, self.clock(), size)
+        self._entries.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: str, value: V) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.total_bytes -= old[2]
+        size = self.size_of(value)
+        self._entries[key] = (value, self.clock(), size)
+        self.total_bytes += size
+        self._enforce_limits()
+
+    def __delitem__(self, key: str) -> None:
+        if self._lazy.pop(key, None) is not None:
+            return
+        _, _, size = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def __contains__(self, key: object) -> bool:
+        return self._live_entry(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries) + list(self._lazy))
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._lazy)
+
+    def values(self) -> List[V]:  # type: ignore[override]
+        """Snapshot of the stored values, without refreshing recency."""
+        return [value for value, _, _ in self._entries.values()]
+
+    def items(self) -> List[Tuple[str, V]]:  # type: ignore[override]
+        """Snapshot of the stored items, without refreshing recency."""
+        return [(key, entry[0]) for key, entry in self._entries.items()]
+
+    def peek(self, key: str) -> Optional[V]:
+        """Return an entry without refreshing its recency, or None."""
+        entry = self._entries.get(key)
+        if entry is None and key in self._lazy:
+            entry = self._live_entry(key)
+        return entry[0] if entry is not None else None
+
+    def cache(self, key: str, value: V) -> None:
+        """Insert a value that does not need to be written anywhere."""
+        MemoryStore.__setitem__(self, key, value)
+
+    def restore_lazy(self, source: Any, records: Iterable[Tuple[str, int, int, float]]) -> int:
+        """
+        Register snapshot records to decode on first access.
+
+        records are (key, offset, length, idle seconds at snapshot time); source
+        provides read(offset, length). Records already past the idle TTL are
+        skipped. Returns the number registered.
+        """
+        now = self.clock()
+        registered = 0
+        for key, offset, length, idle_seconds in records:
+            if self.ttl_seconds is not None and idle_seconds >= self.ttl_seconds:
+                continue
+            self._lazy[key] = (source, offset, length, now - idle_seconds)
+            registered += 1
+        return registered
+
+    def encoded_items(self) -> Iterator[Tuple[str, float, bytes]]:
+        """
+        (key, idle seconds, encoded value) for every live entry.
+
+        Undecoded snapshot records are copied through as raw bytes.
+        """
+        now = self.clock()
+        for key, (value, last_access, _) in list(self._entries.items()):
+            if not self._expired(last_access, now):
+                yield key, now - last_access, encode(value)
+        for key, (source, offset, length, last_access) in list(self._lazy.items()):
+            if not self._expired(last_access, now):
+                yield key, now - last_access, source.read(offset, length)
+
+    def mark_dirty(self, key: str) -> None:
+        """Record that an entry was mutated in place, re-measuring its footprint."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        value, _, old_size = entry
+        size = self.size_of(value)
+        self._entries[key] = (value, self.clock(), size)
+        self._entries.move_to_end(key)
+        self.total_bytes += size - old_size
+        self._enforce_limits()
+
+    def transaction(self) -> ContextManager[None]:
+        """
+        Group a read-modify-write of entries.
+
+        A no-op for a single process, where handlers do not yield mid-update;
+        stores shared between processes make the block atomic.
+        """
+        return contextlib.nullcontext()
+
+    def poll_changes(self) -> List[V]:
+        """Values changed by other processes since the last call (none for a local store)."""
+        return []
+
+    def sweep(self) -> int:
+        """Evict every expired entry. Returns the number evicted."""
+        if self.ttl_seconds is None:
+            return 0
+        deadline = self.clock() - self.ttl_seconds
+        evicted = 0
+        while self._entries:
+            key, (_, last_access, _) = next(iter(self._entries.items()))
+            if last_access > deadline:
+                break
+            self._evict(key, "ttl")
+            evicted += 1
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """Current size, footprint and eviction counts."""
+        return {
+            "entries": len(self._entries),
+            "estimated_bytes": self.total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": dict(self.evictions),
+            "hits": self.hits,
+            "misses": self.misses,
+            "undecoded": len(self._lazy),
+        }
+
+    def _live_entry(self, key: object) -> Optional[Tuple[V, float, int]]:
+        entry = self._entries.get(key)  # type: ignore[arg-type]
+        if entry is None:
+            return self._decode_lazy(key) if self._lazy else None  # type: ignore[arg-type]
+        if self._expired(entry[1], self.clock()):
+            self._evict(key, "ttl")  # type: ignore[arg-type]
+            return None
+        return entry
+
+    def _decode_lazy(self, key: str) -> Optional[Tuple[V, float, int]]:
+        record = self._lazy.pop(key, None)
+        if record is None:
+            return None
+        source, offset, length, last_access = record
+        if self._expired(last_access, self.clock()):
+            self.evictions["ttl"] += 1
+            return None
+        self.cache(key, self._after_load(decode(source.read(offset, length))))
+        return self._entries.get(key)
+
+    def _after_load(self, value: V) -> V:
+        return self.after_load(value) if self.after_load is not None else value
+
+    def _expired(self, last_access: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - last_access >= self.ttl_seconds
+
+    def _enforce_limits(self) -> None:
+        while self._entries and self._over_capacity():
+            self._evict(next(iter(self._entries)), "capacity")
+
+    def _over_capacity(self) -> bool:
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.total_bytes > self.max_bytes and len(self._entries) > 1
+
+    def _evict(self, key: str, reason: str) -> None:
+        value, _, size = self._entries.pop(key)
+        self.total_bytes -= size
+        self.evictions[reason] += 1
+        if self.on_evict is not None:
+            self.on_evict(key, value, reason)
+
+
+class StoreSweeper:
+    """Background task that periodically sweeps expired entries from stores."""
+
+    def __init__(self, stores: List[MemoryStore], interval_seconds: float = 30.0):
+        self.stores = stores
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start sweeping on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the sweeper and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def sweep_once(self) -> int:
+        """Sweep every store once. Returns the total number of evicted entries."""
+        return sum(store.sweep() for store in self.stores)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            self.sweep_once()
@@ -0,0 +1,284 @@
+"""
+SQLite (WAL) backend shared by several worker processes.
+"""
+
+import contextlib
+import os
+import sqlite3
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple, TypeVar
+from .codec import decode, encode
+from .memory_store import MemoryStore
+from .sqlite_store import TABLES
+
+V = TypeVar("V")
+
+# How long a worker waits for another worker's write lock before giving up.
+# Transactions run on the event loop, so this bounds how long one contended
+# request can stall every other request on the worker.
+BUSY_TIMEOUT_ENV = "PET_BATTLER_SHARED_BUSY_TIMEOUT_MS"
+DEFAULT_BUSY_TIMEOUT_MS = 50
+# Creating the tables at startup, when every worker opens the file at once, may wait longer
+SETUP_BUSY_TIMEOUT_MS = 5000
+
+
+class StorageBusyError(RuntimeError):
+    """Raised when another worker held the shared database's write lock for longer than the busy timeout."""
+
+
+class SharedSQLiteRepository:
+    """
+    Versioned key-value tables in a SQLite file that several processes open at once.
+
+    Each row carries a version, bumped on every write, and a per-table change
+    sequence so a process can find rows other processes changed since it last
+    looked. All access is synchronous on the caller's thread; WAL mode lets
+    readers in other processes proceed while one process writes. Writers wait
+    at most busy_timeout_ms for the write lock, then get StorageBusyError.
+    """
+
+    def __init__(self, path: str, busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute(f"PRAGMA busy_timeout={max(int(busy_timeout_ms), SETUP_BUSY_TIMEOUT_MS)}")
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._depth = 0
+        with self.transaction():
+            for table in TABLES:
+                self._connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS shared_{table} ("
+                    "id TEXT PRIMARY KEY, version INTEGER NOT NULL, seq INTEGER NOT NULL, data BLOB NOT NULL)"
+                )
+                self._connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS shared_{table}_seq ON shared_{table} (seq)"
+                )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS shared_rate_limits ("
+                "client TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+        self._connection.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Hold the database write lock for a read-modify-write.
+
+        BEGIN IMMEDIATE takes the lock up front, so reads inside the block see
+        the latest committed rows and no other process can write until commit.
+        Nested blocks join the outermost transaction. Raises StorageBusyError
+        if another process holds the lock for longer than the busy timeout.
+        """
+        if self._depth:
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+            return
+
+        try:
+            self._connection.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as e:
+            raise StorageBusyError(f"{self.path} is locked by another worker") from e
+        self._depth = 1
+        try:
+            yield
+        except BaseException:
+            self._depth = 0
+            self._connection.execute("ROLLBACK")
+            raise
+        self._depth = 0
+        self._connection.execute("COMMIT")
+
+    def load(self, table: str, key: str, known_version: int = -1) -> Optional[Tuple[int, Optional[bytes]]]:
+        """
+        Current (version, data) of a row, or None if it does not exist.
+
+        data is None when the row is still at known_version, so revalidating a
+        cached value costs one indexed lookup and no blob transfer.
+        """
+        return self._connection.execute(
+            f"SELECT version, CASE WHEN version != ? THEN data END FROM shared_{table} WHERE id = ?",
+            (known_version, key)
+        ).fetchone()
+
+    def write(self, table: str, key: str, data: bytes) -> int:
+        """Insert or overwrite a row. Returns its new version."""
+        with self.transaction():
+            return self._connection.execute(
+                f"INSERT INTO shared_{table} (id, version, seq, data) "
+                f"VALUES (?, 1, (SELECT COALESCE(MAX(seq), 0) + 1 FROM shared_{table}), ?) "
+                "ON CONFLICT(id) DO UPDATE SET version = version + 1, seq = excluded.seq, data = excluded.data "
+                "RETURNING version",
+                (key, data)
+            ).fetchone()[0]
+
+    def changes_since(self, table: str, seq: int) -> List[Tuple[int, str, int, bytes]]:
+        """Rows written after a change sequence, as (seq, key, version, data), oldest first."""
+        return self._connection.execute(
+            f"SELECT seq, id, version, data FROM shared_{table} WHERE seq > ? ORDER BY seq",
+            (seq,)
+        ).fetchall()
+
+    def count(self, table: str) -> int:
+        """Number of stored rows in a table."""
+        return self._connection.execute(f"SELECT COUNT(*) FROM shared_{table}").fetchone()[0]
+
+    def take_tokens(
+        self,
+        client: str,
+        need: float,
+        want: float,
+        capacity: float,
+        rate_per_second: float,
+        now: float,
+    ) -> Tuple[float, float]:
+        """
+        Atomically take tokens from a client's shared token bucket.
+
+        The bucket is refilled for the time since it was last touched, then
+        between need and want tokens are taken if at least need are there.
+        Returns (tokens taken, seconds until need would be available); one of
+        the two is 0.
+        """
+        with self.transaction():
+            row = self._connection.execute(
+                "SELECT tokens, updated FROM shared_rate_limits WHERE client = ?", (client,)
+            ).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + max(0.0, now - row[1]) * rate_per_second)
+            taken = min(tokens, want) if tokens >= need else 0.0
+            self._connection.execute(
+                "INSERT INTO shared_rate_limits (client, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(client) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (client, tokens - taken, now)
+            )
+        if taken or need <= 0:
+            return taken, 0.0
+        if rate_per_second <= 0 or need > capacity:
+            return 0.0, float("inf")
+        return 0.0, (need - tokens) / rate_per_second
+
+    def forget_full_buckets(self, updated_before: float) -> int:
+        """Delete rate-limit buckets untouched since updated_before (refilled by now). Returns how many."""
+        with self.transaction():
+            return self._connection.execute(
+                "DELETE FROM shared_rate_limits WHERE updated < ?", (updated_before,)
+            ).rowcount
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._connection.close()
+
+
+class SharedStore(MemoryStore[V]):
+    """
+    MemoryStore whose source of truth is a SQLite file shared between processes.
+
+    The in-memory entries are a local cache. Every read revalidates the cached
+    value's version against SQLite and reloads it if another process wrote a
+    newer one; writes and mark_dirty() go straight through to SQLite. Wrap
+    read-modify-write sequences in transaction() so they are atomic across
+    processes.
+    """
+
+    persistent = True
+
+    def __init__(
+        self,
+        name: str,
+        repository: SharedSQLiteRepository,
+        after_load: Optional[Callable[[V], V]] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(name, after_load=after_load, **kwargs)
+        self.repository = repository
+        self._versions: Dict[str, int] = {}
+        self._change_seq = 0
+        self.loads = 0
+        self.writes = 0
+
+    def __getitem__(self, key: str) -> V:
+        if not self._revalidate(key):
+            self.misses += 1
+            raise KeyError(key)
+        return super().__getitem__(key)
+
+    def __setitem__(self, key: str, value: V) -> None:
+        super().__setitem__(key, value)
+        self._write(key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return self._revalidate(key)  # type: ignore[arg-type]
+
+    def mark_dirty(self, key: str) -> None:
+        super().mark_dirty(key)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._write(key, entry[0])
+
+    def peek(self, key: str) -> Optional[V]:
+        """Current value without refreshing its recency, or None."""
+        return super().peek(key) if self._revalidate(key) else None
+
+    def transaction(self) -> ContextManager[None]:
+        return self.repository.transaction()
+
+    def poll_changes(self) -> List[V]:
+        """Values written (by any process) since the previous call, oldest first."""
+        changed = []
+        for seq, key, version, data in self.repository.changes_since(self.name, self._change_seq):
+            self._change_seq = seq
+            value = super().peek(key)
+            if value is None or self._versions.get(key) != version:
+                value = self._cache_loaded(key, version, data)
+            changed.append(value)
+        return changed
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({"loads": self.loads, "writes": self.writes})
+        return stats
+
+    def _revalidate(self, key: str) -> bool:
+        """Make sure the cached value for key is current. Returns False if it does not exist."""
+        cached = self._live_entry(key) is not None
+        row = self.repository.load(self.name, key, self._versions.get(key, -1) if cached else -1)
+        if row is None:
+            if cached:
+                MemoryStore.__delitem__(self, key)
+                self._versions.pop(key, None)
+            return False
+        version, data = row
+        if data is not None:
+            self._cache_loaded(key, version, data)
+        return True
+
+    def _cache_loaded(self, key: str, version: int, data: bytes) -> V:
+        value = self._after_load(decode(data))
+        self.loads += 1
+        self.cache(key, value)
+        self._versions[key] = version
+        return value
+
+    def _write(self, key: str, value: V) -> None:
+        self._versions[key] = self.repository.write(self.name, key, encode(value))
+        self.writes += 1
+
+    def _evict(self, key: str, reason: str) -> None:
+        self._versions.pop(key, None)
+        super()._evict(key, reason)
+
+
+_repositories: Dict[str, SharedSQLiteRepository] = {}
+
+
+def open_shared_repository(path: str) -> SharedSQLiteRepository:
+    """Shared-mode repository for a database path, opened once per process."""
+    repository = _repositories.get(path)
+    if repository is None:
+        repository = SharedSQLiteRepository(
+            path, busy_timeout_ms=int(os.getenv(BUSY_TIMEOUT_ENV, str(DEFAULT_BUSY_TIMEOUT_MS)))
+        )
+        _repositories[path] = repository
+    return repository
+
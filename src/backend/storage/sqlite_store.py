@@ -0,0 +1,268 @@
+"""
+SQLite persistence for games and creatures, with an in-memory hot cache and write-behind flushing.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from .codec import decode, encode
+from .memory_store import MemoryStore
+
+V = TypeVar("V")
+
+logger = logging.getLogger(__name__)
+
+TABLES = ("games", "creatures")
+
+
+class SQLiteRepository:
+    """
+    Key-value tables of encoded games and creatures in one SQLite file.
+
+    Reads happen on the event loop thread through their own connection; batched
+    writes run in a worker thread on a second connection. WAL mode lets the two
+    proceed without blocking each other.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._reader = self._connect()
+        self._writer = self._connect()
+        self._write_lock = threading.Lock()
+        with self._writer:
+            for table in TABLES:
+                self._writer.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} (id TEXT PRIMARY KEY, data BLOB NOT NULL)"
+                )
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def load(self, table: str, key: str) -> Optional[bytes]:
+        """Encoded value for a key, or None."""
+        row = self._reader.execute(f"SELECT data FROM {table} WHERE id = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def write_batch(self, table: str, rows: Iterable[Tuple[str, bytes]]) -> int:
+        """Upsert encoded rows in a single transaction. Returns the number of rows written."""
+        rows = list(rows)
+        with self._write_lock:
+            self._writer.execute("BEGIN")
+            try:
+                self._writer.executemany(
+                    f"INSERT INTO {table} (id, data) VALUES (?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+                    rows
+                )
+            except BaseException:
+                self._writer.execute("ROLLBACK")
+                raise
+            self._writer.execute("COMMIT")
+        return len(rows)
+
+    def rows(self, table: str) -> Iterator[Tuple[str, bytes]]:
+        """Iterate over every (key, encoded value) row in a table."""
+        cursor = self._reader.cursor()
+        try:
+            yield from cursor.execute(f"SELECT id, data FROM {table}")
+        finally:
+            cursor.close()
+
+    def count(self, table: str) -> int:
+        """Number of stored rows in a table."""
+        return self._reader.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def close(self) -> None:
+        """Close both connections."""
+        self._reader.close()
+        self._writer.close()
+
+
+class PersistentStore(MemoryStore[V]):
+    """
+    MemoryStore backed by a SQLite table.
+
+    The in-memory entries act as a hot cache: a miss falls through to SQLite and
+    caches the decoded value (after_load can fix up references). Writes and
+    mark_dirty() only record the key as dirty; flush() encodes the dirty values
+    on the event loop and writes them in one transaction on a worker thread.
+    Dirty entries evicted from the cache are held until the next flush so no
+    change is lost.
+    """
+
+    persistent = True
+
+    def __init__(
+        self,
+        name: str,
+        repository: SQLiteRepository,
+        after_load: Optional[Callable[[V], V]] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(name, after_load=after_load, **kwargs)
+        self.repository = repository
+        self._dirty: Dict[str, None] = {}
+        self._pending: Dict[str, V] = {}
+        self._flush_lock = asyncio.Lock()
+        self.loads = 0
+        self.flushes = 0
+        self.rows_written = 0
+
+    def __getitem__(self, key: str) -> V:
+        if self._live_entry(key) is None and not self._load(key):
+            self.misses += 1
+            raise KeyError(key)
+        return super().__getitem__(key)
+
+    def __setitem__(self, key: str, value: V) -> None:
+        super().__setitem__(key, value)
+        self._dirty[key] = None
+
+    def __contains__(self, key: object) -> bool:
+        return self._live_entry(key) is not None or self._load(key)  # type: ignore[arg-type]
+
+    def mark_dirty(self, key: str) -> None:
+        super().mark_dirty(key)
+        if key in self._entries:
+            self._dirty[key] = None
+
+    def peek(self, key: str) -> Optional[V]:
+        """Return a value without changing the cache, reading through to SQLite on a miss."""
+        value = super().peek(key)
+        if value is None:
+            value = self._pending.get(key)
+        if value is None:
+            data = self.repository.load(self.name, key)
+            if data is not None:
+                value = self._after_load(decode(data))
+        return value
+
+    def load_all(self) -> Iterator[V]:
+        """Decode every stored value, preferring cached instances."""
+        for key, data in self.repository.rows(self.name):
+            value = super().peek(key)
+            if value is None:
+                value = self._pending.get(key)
+            yield value if value is not None else self._after_load(decode(data))
+
+    @property
+    def dirty_count(self) -> int:
+        """Number of entries waiting to be flushed."""
+        return len(self._dirty)
+
+    async def flush(self) -> int:
+        """Write every dirty entry to SQLite. Returns the number of rows written."""
+        async with self._flush_lock:
+            if not self._dirty:
+                return 0
+            keys, self._dirty = list(self._dirty), {}
+            rows: List[Tuple[str, bytes]] = []
+            flushed: List[Tuple[str, V]] = []
+            for key in keys:
+                entry = self._entries.get(key)
+                value = entry[0] if entry is not None else self._pending.get(key)
+                if value is None:
+                    continue
+                rows.append((key, encode(value)))
+                flushed.append((key, value))
+
+            try:
+                written = await asyncio.to_thread(self.repository.write_batch, self.name, rows)
+            except Exception:
+                # Keep the changes for the next attempt
+                for key in keys:
+                    self._dirty[key] = None
+                raise
+
+            for key, value in flushed:
+                if self._pending.get(key) is value and key not in self._dirty:
+                    del self._pending[key]
+            self.flushes += 1
+            self.rows_written += written
+            return written
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "dirty": len(self._dirty),
+            "pending_evicted": len(self._pending),
+            "loads": self.loads,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+        })
+        return stats
+
+    def _load(self, key: str) -> bool:
+        """Bring a key into the cache from pending writes or SQLite."""
+        value = self._pending.get(key)
+        if value is None:
+            data = self.repository.load(self.name, key)
+            if data is None:
+                return False
+            value = self._after_load(decode(data))
+            self.loads += 1
+        self.cache(key, value)
+        return True
+
+    def _evict(self, key: str, reason: str) -> None:
+        if key in self._dirty:
+            self._pending[key] = self._entries[key][0]
+        super()._evict(key, reason)
+
+
+class WriteBehindFlusher:
+    """Background task that periodically flushes dirty entries of persistent stores."""
+
+    def __init__(self, stores: List[PersistentStore], interval_seconds: float = 0.5):
+        self.stores = stores
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start flushing on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and flush whatever is still dirty."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Flush every store once. Returns the total number of rows written."""
+        written = 0
+        for store in self.stores:
+            written += await store.flush()
+        return written
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.flush()
+            except sqlite3.Error as e:
+                # Dirty keys are kept, so the next interval retries them
+                logger.exception("Write-behind flush failed: %s", e)
+
+
+_repositories: Dict[str, SQLiteRepository] = {}
+
+
+def open_repository(path: str) -> SQLiteRepository:
+    """Shared repository for a database path, opened on first use."""
+    repository = _repositories.get(path)
+    if repository is None:
+        repository = SQLiteRepository(path)
+        _repositories[path] = repository
+    return repository
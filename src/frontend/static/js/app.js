@@ -18,6 +18,10 @@ let gameState = {
     specialUses: 1
 };
 
+// Battle WebSocket and the narration text streamed so far
+let battleSocket = null;
+let narrationText = '';
+
 // ASCII Art for creatures (compact versions)
 // Reduced to minimal size to avoid scrollbars.
 const CREATURE_ASCII = {
@@ -589,6 +593,7 @@ async function createCreatureAndStartGame() {
         const game = await gameResponse.json();
         gameState.gameId = game.game_id;
         gameState.currentMatch = game.current_match;
+        openBattleSocket();
         
         // Set up creature tracking for first match
         if (game.current_match) {
@@ -633,6 +638,15 @@ async function submitMove(moveType) {
     // Disable buttons
     document.querySelectorAll('.move-btn').forEach(btn => btn.disabled = true);
 
+    if (battleSocket && battleSocket.readyState === WebSocket.OPEN) {
+        battleSocket.send(JSON.stringify({
+            type: 'move',
+            creature_id: gameState.creatureId,
+            move_type: moveType
+        }));
+        return;
+    }
+
     try {
         const narratorStart = performance.now();
         const response = await fetch(`${API_BASE}/game/${gameState.gameId}/move`, {
@@ -648,59 +662,130 @@ async function submitMove(moveType) {
         console.log(`[Narrator API] Response time: ${narratorDuration.toFixed(2)} ms`);
 
         const result = await response.json();
-        gameState.currentMatch = result.current_match;
+        handleMoveResult(result, true);
+    } catch (error) {
+        console.error('Error submitting move:', error);
+        alert('Failed to submit move: ' + error.message);
+        ensureMoveButtonsEnabled();
+    }
+}
 
-        // Update opponent's creature type if available
-        if (result.current_match) {
-            gameState.creature2Type = result.current_match.creature2_type;
-        }
+// Apply a move result from either the HTTP endpoint or the battle WebSocket
+function handleMoveResult(result, streamViaSse) {
+    gameState.currentMatch = result.current_match;
 
-        // Update display with results
-        updateBattleDisplay(result.current_match?.latest_results);
+    // Update opponent's creature type if available
+    if (result.current_match) {
+        gameState.creature2Type = result.current_match.creature2_type;
+    }
 
-        // Display LLM narration in narrator box
-        const narratorBox = document.getElementById('narrator-message');
-        if (narratorBox) {
-            narratorBox.textContent = result.narration || '';
-        }
+    // Update display with results
+    updateBattleDisplay(result.current_match?.latest_results);
 
-        // Store last battle narration for victory/defeat/levelup screens
-        gameState.lastBattleNarration = result.last_battle_narration || result.narration || '';
+    // Display LLM narration in narrator box (streamed after the combat result)
+    const narratorBox = document.getElementById('narrator-message');
+    if (narratorBox) {
+        narratorBox.textContent = result.narration || '';
+    }
 
-        // Check if match is complete
-        if (result.tournament_complete) {
-            showVictoryScreen(result.champion_name);
-        } else if (result.match_just_completed) {
-            // A match just finished - check if player won or lost
-            const playerWon = result.player_won_match;
-
-            // Show narration on level-up screen
-            const levelupNarratorBox = document.getElementById('levelup-narrator-message');
-            if (levelupNarratorBox) {
-                levelupNarratorBox.textContent = gameState.lastBattleNarration;
-            }
+    // Store last battle narration for victory/defeat/levelup screens
+    gameState.lastBattleNarration = result.last_battle_narration || result.narration || '';
+    if (streamViaSse && result.narration_pending && result.narration_stream_url) {
+        streamNarration(result.narration_stream_url);
+    }
 
-            if (playerWon && result.stat_points_available > 0) {
-                // Player won - show level-up screen
-                showLevelUpScreen(result.current_stats);
-            } else if (!playerWon) {
-                // Player lost - return to character selection
-                alert('You have been eliminated from the tournament!');
-                setTimeout(() => resetGame(), 2000);
-            } else {
-                // No stat points (shouldn't happen, but just in case)
-                document.getElementById('next-match-btn').style.display = 'block';
-            }
+    // Check if match is complete
+    if (result.tournament_complete) {
+        showVictoryScreen(result.champion_name);
+    } else if (result.match_just_completed) {
+        // A match just finished - check if player won or lost
+        const playerWon = result.player_won_match;
+
+        // Show narration on level-up screen
+        const levelupNarratorBox = document.getElementById('levelup-narrator-message');
+        if (levelupNarratorBox) {
+            levelupNarratorBox.textContent = gameState.lastBattleNarration;
+        }
+
+        if (playerWon && result.stat_points_available > 0) {
+            // Player won - show level-up screen
+            showLevelUpScreen(result.current_stats);
+        } else if (!playerWon) {
+            // Player lost - return to character selection
+            alert('You have been eliminated from the tournament!');
+            setTimeout(() => resetGame(), 2000);
         } else {
-            // Re-enable move buttons for next round
-            setTimeout(() => {
+            // No stat points (shouldn't happen, but just in case)
+            document.getElementById('next-match-btn').style.display = 'block';
+        }
+    } else {
+        // Re-enable move buttons for next round
+        setTimeout(() => {
+            ensureMoveButtonsEnabled();
+        }, 1000);
+    }
+}
+
+// Append a streamed narration token to the battle narrator box
+function appendNarrationToken(token) {
+    narrationText += token;
+    const narratorBox = document.getElementById('narrator-message');
+    if (narratorBox) narratorBox.textContent = narrationText;
+}
+
+// Store the completed narration and show it on any visible result screen
+function finishNarration(text) {
+    gameState.lastBattleNarration = text;
+    ['levelup-narrator-message', 'victory-narrator-message'].forEach(id => {
+        const box = document.getElementById(id);
+        if (box && box.offsetParent !== null) box.textContent = text;
+    });
+    narrationText = '';
+}
+
+// Stream narration tokens over Server-Sent Events into the narrator boxes
+function streamNarration(url) {
+    const source = new EventSource(`${API_BASE}${url}`);
+    narrationText = '';
+    source.addEventListener('token', (event) => appendNarrationToken(JSON.parse(event.data).text));
+    source.addEventListener('narration', (event) => finishNarration(JSON.parse(event.data).text));
+    source.addEventListener('end', () => source.close());
+    source.onerror = () => source.close();
+}
+
+// Open the battle WebSocket for the current game (moves fall back to HTTP without it)
+function openBattleSocket() {
+    closeBattleSocket();
+    const socket = new WebSocket(`${API_BASE.replace(/^http/, 'ws')}/game/${gameState.gameId}/ws`);
+    socket.onmessage = (event) => {
+        const message = JSON.parse(event.data);
+        switch (message.type) {
+            case 'move_result':
+                narrationText = '';
+                handleMoveResult(message, false);
+                break;
+            case 'narration_token':
+                appendNarrationToken(message.text);
+                break;
+            case 'narration':
+                finishNarration(message.text);
+                break;
+            case 'error':
+                alert('Failed to submit move: ' + message.detail);
                 ensureMoveButtonsEnabled();
-            }, 1000);
+                break;
         }
-    } catch (error) {
-        console.error('Error submitting move:', error);
-        alert('Failed to submit move: ' + error.message);
-        ensureMoveButtonsEnabled();
+    };
+    socket.onclose = () => {
+        if (battleSocket === socket) battleSocket = null;
+    };
+    battleSocket = socket;
+}
+
+function closeBattleSocket() {
+    if (battleSocket) {
+        battleSocket.close();
+        battleSocket = null;
     }
 }
 
@@ -945,6 +1030,7 @@ function switchScreen(screenId) {
 
 // Reset game
 function resetGame() {
+    closeBattleSocket();
     gameState = {
         creatureTypes: gameState.creatureTypes,
         selectedType: null,
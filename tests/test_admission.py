@@ -0,0 +1,128 @@
+import asyncio
+import sys
+from fastapi.testclient import TestClient
+from src.backend.app import app
+from src.backend.middleware.admission import (
+    HIGH, LOW, NORMAL, AdmissionControlMiddleware, AdmissionController, release_admission_slot
+)
+
+
+def test_waiters_are_admitted_by_priority():
+    controller = AdmissionController(max_concurrent=1, max_queue=10, max_queue_seconds=1)
+    order = []
+
+    async def request(name, priority):
+        assert await controller.acquire(priority)
+        order.append(name)
+        await asyncio.sleep(0.01)
+        controller.release()
+
+    async def main():
+        first = asyncio.create_task(request("first", NORMAL))
+        await asyncio.sleep(0)
+        others = [
+            asyncio.create_task(request(name, priority))
+            for name, priority in [("listing", LOW), ("state", NORMAL), ("move", HIGH)]
+        ]
+        await asyncio.sleep(0)
+        assert controller.queue_depth() == {"high": 1, "normal": 1, "low": 1}
+        await asyncio.gather(first, *others)
+
+    asyncio.run(main())
+    assert order == ["first", "move", "state", "listing"]
+    assert controller.in_flight == 0
+    assert controller.stats()["queued_total"] == 3
+
+
+def test_requests_are_shed_after_waiting_too_long():
+    controller = AdmissionController(max_concurrent=1, max_queue=10, max_queue_seconds=0.01)
+
+    async def main():
+        assert await controller.acquire()
+        assert not await controller.acquire()
+        controller.release()
+        assert await controller.acquire()
+
+    asyncio.run(main())
+    assert controller.shed["timeout"] == 1
+    assert controller.queue_depth() == {"high": 0, "normal": 0, "low": 0}
+
+
+def test_full_queue_displaces_lower_priority():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, max_queue_seconds=1)
+
+    async def main():
+        await controller.acquire()
+        listing = asyncio.create_task(controller.acquire(LOW))
+        await asyncio.sleep(0)
+        move = asyncio.create_task(controller.acquire(HIGH))
+        await asyncio.sleep(0)
+        # A second listing finds the queue full of more urgent work
+        assert not await controller.acquire(LOW)
+        assert not await listing
+        controller.release()
+        assert await move
+
+    asyncio.run(main())
+    assert controller.shed == {"queue_full": 1, "timeout": 0, "displaced": 1}
+    assert controller.stats()["shed_by_priority"] == {"high": 0, "normal": 0, "low": 2}
+
+
+def test_middleware_sheds_with_503():
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    controller = AdmissionController(max_concurrent=0, max_queue=0)
+    middleware = AdmissionControlMiddleware(endpoint, controller)
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def call(path):
+        messages.clear()
+        await middleware({"type": "http", "method": "GET", "path": path}, None, send)
+        return messages[0]
+
+    shed = asyncio.run(call("/creatures"))
+    assert shed["status"] == 503
+    assert dict(shed["headers"])[b"retry-after"] == b"2"
+    # Health checks and streams are never queued
+    assert asyncio.run(call("/health"))["status"] == 200
+    assert asyncio.run(call("/game/abc/spectate"))["status"] == 200
+
+
+def test_handler_can_release_its_slot_early():
+    controller = AdmissionController(max_concurrent=1, max_queue=10, max_queue_seconds=1)
+    in_flight = []
+
+    async def endpoint(scope, receive, send):
+        release_admission_slot()
+        release_admission_slot()
+        in_flight.append(controller.in_flight)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = AdmissionControlMiddleware(endpoint, controller)
+
+    async def send(message):
+        pass
+
+    asyncio.run(middleware({"type": "http", "method": "POST", "path": "/game/abc/move"}, None, send))
+    assert in_flight == [0]
+    assert controller.in_flight == 0
+    # Outside a request there is no slot to give back
+    release_admission_slot()
+    assert controller.in_flight == 0
+
+
+def test_load_stats_endpoint(monkeypatch):
+    load_client = TestClient(app, client=("load-tests", 50000))
+    load_client.get("/creatures")
+    monkeypatch.setattr(sys.modules["src.backend.app"], "admin_token", b"secret")
+    assert load_client.get("/admin/load").status_code == 403
+    data = load_client.get("/admin/load", headers={"X-Profile-Token": "secret"}).json()
+    assert data["admission"]["admitted"]["low"] >= 1
+    assert set(data["admission"]["shed"]) == {"queue_full", "timeout", "displaced"}
+    assert data["rate_limit"]["clients"] >= 1
@@ -1,3 +1,4 @@
+import sys
 import pytest
 from fastapi.testclient import TestClient
 from src.backend.app import app
@@ -25,3 +26,18 @@ def test_rate_limit_exceeded():
     for _ in range(61):
         response = client.get("/health")
     assert response.status_code in [200, 429]
+
+def test_admin_storage_stats(monkeypatch):
+    stats_client = TestClient(app, client=("admin-tests", 50000))
+    stats_client.post("/creatures", json={"name": "Counted", "creature_type": "robot"})
+    monkeypatch.setattr(sys.modules["src.backend.app"], "admin_token", None)
+    assert stats_client.get("/admin/storage", headers={"X-Profile-Token": "secret"}).status_code == 403
+    monkeypatch.setattr(sys.modules["src.backend.app"], "admin_token", b"secret")
+    assert stats_client.get("/admin/storage").status_code == 403
+    assert stats_client.get("/admin/storage", headers={"X-Profile-Token": "wrong"}).status_code == 403
+    response = stats_client.get("/admin/storage", headers={"X-Profile-Token": "secret"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["creatures"]["entries"] >= 1
+    assert data["creatures"]["estimated_bytes"] > 0
+    assert set(data["games"]["evictions"]) == {"ttl", "capacity"}
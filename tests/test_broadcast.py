@@ -0,0 +1,55 @@
+import asyncio
+import json
+import pytest
+from src.backend.logic.broadcast import BroadcastHub, format_sse
+
+
+def test_publish_without_subscribers():
+    hub = BroadcastHub()
+    assert hub.publish("game-1", "match_update", {"hp": 10}) == 0
+
+
+def test_publish_fans_out_same_frame():
+    hub = BroadcastHub()
+    sub1 = hub.subscribe("game-1")
+    sub2 = hub.subscribe("game-1")
+    other = hub.subscribe("game-2")
+    assert hub.publish("game-1", "match_update", {"hp": 10}) == 2
+    assert sub1.queue[0] is sub2.queue[0]
+    assert sub1.queue[0] == 'event: match_update\ndata: {"hp": 10}\n\n'
+    assert not other.queue
+
+
+def test_slow_subscriber_drops_oldest():
+    hub = BroadcastHub(max_queue_size=3)
+    sub = hub.subscribe("game-1")
+    for i in range(5):
+        hub.publish("game-1", "tick", i)
+    assert sub.dropped == 2
+    assert [json.loads(m.split("data: ")[1]) for m in sub.queue] == [2, 3, 4]
+
+
+def test_unsubscribe_removes_topic():
+    hub = BroadcastHub()
+    sub = hub.subscribe("game-1")
+    assert hub.subscriber_count("game-1") == 1
+    hub.unsubscribe(sub)
+    hub.unsubscribe(sub)
+    assert hub.subscriber_count("game-1") == 0
+
+
+@pytest.mark.asyncio
+async def test_get_waits_for_publish():
+    hub = BroadcastHub()
+    sub = hub.subscribe("game-1")
+    waiter = asyncio.create_task(sub.get(timeout=1))
+    await asyncio.sleep(0)
+    hub.publish("game-1", "tick", 1)
+    assert await waiter == format_sse("tick", 1)
+
+
+@pytest.mark.asyncio
+async def test_get_timeout_returns_none():
+    hub = BroadcastHub()
+    sub = hub.subscribe("game-1")
+    assert await sub.get(timeout=0.01) is None
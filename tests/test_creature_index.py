@@ -0,0 +1,76 @@
+import pytest
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.storage import CreatureIndex
+
+
+def make_creature(creature_id, speed, creature_type=CreatureType.GNOME, is_ai=False, luck=5):
+    creature = Creature.create_with_biases(name=creature_id, creature_type=creature_type, is_ai=is_ai)
+    creature.id = creature_id
+    creature.base_stats.speed = speed
+    creature.base_stats.luck = luck
+    return creature
+
+
+def collect(index, **kwargs):
+    pages, cursor = [], None
+    while True:
+        page, cursor = index.query(cursor=cursor, **kwargs)
+        pages.append(page)
+        if cursor is None:
+            return pages
+
+
+def test_pages_follow_creation_order():
+    index = CreatureIndex()
+    for i in range(7):
+        index.add(make_creature(f"c{i}", speed=i))
+    pages = collect(index, limit=3)
+    assert pages == [["c0", "c1", "c2"], ["c3", "c4", "c5"], ["c6"]]
+
+
+def test_sort_by_stat_descending_with_ties():
+    index = CreatureIndex()
+    for i, speed in enumerate([4, 9, 4, 1, 9]):
+        index.add(make_creature(f"c{i}", speed=speed))
+    pages = collect(index, sort="speed", descending=True, limit=2)
+    assert [cid for page in pages for cid in page] == ["c4", "c1", "c2", "c0", "c3"]
+
+
+def test_filters_by_type_ai_and_ranges():
+    index = CreatureIndex()
+    index.add(make_creature("slow-gnome", speed=2))
+    index.add(make_creature("fast-gnome", speed=8, luck=1))
+    index.add(make_creature("fast-lucky-gnome", speed=9, luck=9))
+    index.add(make_creature("fast-ai-gnome", speed=9, is_ai=True))
+    index.add(make_creature("fast-dragon", speed=9, creature_type=CreatureType.DRAGON))
+
+    page, _ = index.query(creature_type=CreatureType.GNOME, is_ai=False, sort="speed",
+                          ranges={"speed": (5, None), "luck": (5, None)})
+    assert page == ["fast-lucky-gnome"]
+
+    page, _ = index.query(is_ai=True)
+    assert page == ["fast-ai-gnome"]
+
+
+def test_update_and_remove_keep_indexes_in_sync():
+    index = CreatureIndex()
+    first, second = make_creature("a", speed=1), make_creature("b", speed=5)
+    index.add(first)
+    index.add(second)
+
+    first.base_stats.speed = 10
+    index.update(first)
+    assert index.query(sort="speed")[0] == ["b", "a"]
+
+    index.remove("b")
+    assert index.query(sort="speed")[0] == ["a"]
+    assert index.query(sort="speed", ranges={"speed": (None, 5)})[0] == []
+    assert len(index) == 1
+
+
+def test_invalid_cursor_and_sort():
+    index = CreatureIndex()
+    with pytest.raises(ValueError):
+        index.query(cursor="not a cursor")
+    with pytest.raises(ValueError):
+        index.query(sort="max_hp")
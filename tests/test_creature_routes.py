@@ -39,3 +39,114 @@ def test_list_creatures():
     resp = client.get("/creatures")
     assert resp.status_code == 200
     assert isinstance(resp.json(), list)
+
+
+etag_client = TestClient(app, client=("etag-tests", 50000))
+
+
+def test_creature_types_etag():
+    resp = etag_client.get("/creatures/types")
+    assert resp.status_code == 200
+    assert len(resp.json()) == 12
+    assert resp.headers["cache-control"].startswith("public")
+    cached = etag_client.get("/creatures/types", headers={"If-None-Match": resp.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_creature_etag_changes_with_state():
+    from src.backend.routes.creature_routes import creatures_db
+    creature_id = etag_client.post("/creatures", json={"name": "Tagged", "creature_type": "gnome"}).json()["id"]
+    etag = etag_client.get(f"/creatures/{creature_id}").headers["etag"]
+    assert etag_client.get(f"/creatures/{creature_id}", headers={"If-None-Match": etag}).status_code == 304
+    creatures_db[creature_id].take_damage(1)
+    assert etag_client.get(f"/creatures/{creature_id}", headers={"If-None-Match": etag}).status_code == 200
+
+
+listing_client = TestClient(app, client=("listing-tests", 50000))
+
+
+def test_list_creatures_paginates_and_filters():
+    created = [
+        listing_client.post("/creatures", json={"name": f"Page{i}", "creature_type": "beyblade"}).json()["id"]
+        for i in range(3)
+    ]
+
+    first = listing_client.get("/creatures", params={"creature_type": "beyblade", "limit": 2})
+    assert first.status_code == 200
+    assert len(first.json()) == 2
+    cursor = first.headers["x-next-cursor"]
+
+    seen = [c["id"] for c in first.json()]
+    while cursor:
+        page = listing_client.get("/creatures", params={"creature_type": "beyblade", "limit": 2, "cursor": cursor})
+        seen += [c["id"] for c in page.json()]
+        cursor = page.headers.get("x-next-cursor")
+    assert seen[-3:] == created
+    assert all(c["creature_type"] == "beyblade" for c in first.json())
+
+
+def test_list_creatures_sorted_by_stat_range():
+    resp = listing_client.get("/creatures", params={"sort": "speed", "order": "desc", "min_speed": 3, "max_speed": 30})
+    assert resp.status_code == 200
+    speeds = [c["stats"]["speed"] for c in resp.json()]
+    assert speeds == sorted(speeds, reverse=True)
+    assert all(3 <= speed <= 30 for speed in speeds)
+
+
+def test_list_creatures_skips_creatures_gone_from_storage(monkeypatch):
+    from src.backend.routes.creature_routes import creature_index, creatures_db
+
+    kept, gone = [
+        listing_client.post("/creatures", json={"name": name, "creature_type": "beyblade"}).json()["id"]
+        for name in ("Kept", "Gone")
+    ]
+    peek = creatures_db.peek
+    monkeypatch.setattr(creatures_db, "peek", lambda creature_id: None if creature_id == gone else peek(creature_id))
+
+    resp = listing_client.get("/creatures", params={"creature_type": "beyblade", "sort": "created", "order": "desc"})
+    assert resp.status_code == 200
+    ids = [c["id"] for c in resp.json()]
+    assert kept in ids and gone not in ids
+    assert gone not in creature_index and kept in creature_index
+
+
+def test_list_creatures_rejects_bad_cursor():
+    assert listing_client.get("/creatures", params={"cursor": "!!"}).status_code == 400
+    assert listing_client.get("/creatures", params={"sort": "max_hp"}).status_code == 422
+
+
+bulk_client = TestClient(app, client=("bulk-tests", 50000))
+
+
+def test_bulk_create_reports_per_item_errors():
+    resp = bulk_client.post("/creatures/bulk", json={"creatures": [
+        {"name": "BulkOne", "creature_type": "gnome"},
+        {"name": "BulkBad", "creature_type": "not-a-type"},
+        {"name": "BulkGreedy", "creature_type": "gnome", "stat_allocations": {"speed": 7}},
+        {"name": "BulkTwo", "creature_type": "robot", "stat_allocations": {"defense": 2}},
+    ]})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["created"], data["failed"]) == (2, 2)
+    assert [r["status"] for r in data["results"]] == [201, 422, 400, 201]
+    assert "creature_type" in data["results"][1]["error"]
+
+    creature_id = data["results"][3]["creature"]["id"]
+    assert bulk_client.get(f"/creatures/{creature_id}").json()["name"] == "BulkTwo"
+
+
+def test_bulk_create_limits_batch_size():
+    assert bulk_client.post("/creatures/bulk", json={"creatures": []}).status_code == 422
+    too_many = [{"name": f"C{i}", "creature_type": "gnome"} for i in range(501)]
+    assert bulk_client.post("/creatures/bulk", json={"creatures": too_many}).status_code == 422
+
+
+def test_batch_get_reports_missing_ids():
+    creature_id = bulk_client.post("/creatures", json={"name": "Fetched", "creature_type": "medusa"}).json()["id"]
+    resp = bulk_client.post("/creatures/batch-get", json={"ids": [creature_id, "missing-id"]})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["found"], data["missing"]) == (1, 1)
+    assert data["results"][0]["creature"]["name"] == "Fetched"
+    assert data["results"][1] == {"id": "missing-id", "status": 404, "error": "Creature not found"}
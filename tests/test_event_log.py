@@ -0,0 +1,159 @@
+import asyncio
+import json
+import os
+import pytest
+from src.backend.logic import journal
+from src.backend.logic.journal import EventType, GameJournal
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.routes import creature_routes, game_routes
+from src.backend.storage import EventLog, EventLogError, read_records
+
+
+def game_fields(game):
+    return game.model_dump(exclude={"pending_narrations", "narration_count"})
+
+
+@pytest.fixture
+def journal_on(tmp_path, monkeypatch):
+    game_journal = GameJournal(EventLog(str(tmp_path / "events")))
+    monkeypatch.setattr(game_routes, "game_journal", game_journal)
+    yield game_journal
+    game_journal.log.close()
+
+
+def start_game(creature):
+    response = asyncio.run(game_routes.start_game(
+        game_routes.StartGameRequest(creature_ids=[creature.id], tournament_size=4)
+    ))
+    return json.loads(response.body)["game_id"]
+
+
+def play_game(name):
+    """Create a creature, start a 4-creature tournament and play it out with stat allocations."""
+    creature = Creature.create_with_biases(name=name, creature_type=CreatureType.DRAGON)
+    creature.id = f"{name}-id"
+    creature_routes.store_creature(creature)
+    game_id = start_game(creature)
+    game = game_routes.games_db[game_id]
+
+    while not game.is_complete:
+        request = game_routes.SubmitMoveRequest(creature_id=creature.id, move_type="attack")
+        response = asyncio.run(game_routes.play_move(game_id, request))
+        if response["stat_points_available"]:
+            asyncio.run(game_routes.apply_stat_allocation(game_id, game_routes.AllocateStatsRequest(
+                creature_id=creature.id, stat_allocations={"health": 1, "strength": 2}
+            )))
+    return game
+
+
+def test_records_round_trip_and_torn_tail_is_truncated(tmp_path):
+    directory = str(tmp_path / "log")
+    log = EventLog(directory)
+    log.append(1, b"first")
+    log.extend([(2, b"second"), (3, b"")])
+    log.close()
+    segment = os.path.join(directory, "segment-00000001.log")
+    with open(segment, "ab") as file:
+        file.write(b"\x04\x10\x00\x00\x00torn")
+
+    with pytest.raises(EventLogError):
+        list(read_records(segment))
+    reopened = EventLog(directory)
+    assert reopened.truncated_bytes == 9
+    assert list(reopened.records()) == [(1, b"first"), (2, b"second"), (3, b"")]
+    reopened.append(5, b"after restart")
+    assert list(reopened.records())[-1] == (5, b"after restart")
+    reopened.close()
+
+
+def test_segments_rotate_at_the_size_limit(tmp_path):
+    log = EventLog(str(tmp_path / "log"), segment_bytes=64)
+    for index in range(10):
+        log.append(1, bytes([index]) * 20)
+    assert log.sealed_count == 3
+    assert [payload[0] for _, payload in log.records()] == list(range(10))
+    log.close()
+
+
+def test_replay_rebuilds_games_and_creatures(journal_on):
+    game = play_game("Replayed")
+    creature = game.player_creatures[0]
+
+    games, creatures = {}, {}
+    journal_on.replay(games, creatures)
+    assert journal_on.replay_skipped == 0
+    assert game_fields(games[game.game_id]) == game_fields(game)
+    assert games[game.game_id].version == game.version
+    assert creatures[creature.id].base_stats == creature.base_stats
+
+
+def test_replay_skips_rounds_for_unknown_matches(journal_on):
+    game = play_game("Skipped")
+    journal_on.log.append(EventType.ROUND_ADVANCED, journal.encode((game.game_id, [("no-such-match", "nobody")], [])))
+
+    games, creatures = {}, {}
+    journal_on.replay(games, creatures)
+    assert journal_on.replay_skipped == 1
+    assert game_fields(games[game.game_id]) == game_fields(game)
+
+
+def test_each_move_appends_one_small_record(journal_on):
+    creature = Creature.create_with_biases(name="Small", creature_type=CreatureType.ROBOT)
+    creature.id = "small-id"
+    creature_routes.store_creature(creature)
+    game_id = start_game(creature)
+    appends, written = journal_on.log.appends, journal_on.log.bytes_appended
+
+    request = game_routes.SubmitMoveRequest(creature_id=creature.id, move_type="defend")
+    asyncio.run(game_routes.play_move(game_id, request))
+    assert journal_on.log.appends == appends + 1
+    assert journal_on.log.bytes_appended - written < 512
+
+
+def test_compaction_folds_finished_games(journal_on):
+    finished = play_game("Folded")
+    records_before = len(list(journal_on.log.records()))
+
+    result = asyncio.run(journal_on.compact())
+    assert result["games_folded"] == 1
+    records = list(journal_on.log.records())
+    assert len(records) < records_before
+    types = [event_type for event_type, _ in records]
+    assert EventType.GAME_SUMMARY in types
+    assert EventType.TURN_RESOLVED not in types
+
+    games, creatures = {}, {}
+    journal_on.replay(games, creatures)
+    assert game_fields(games[finished.game_id]) == game_fields(finished)
+    assert creatures[finished.player_creatures[0].id].base_stats == finished.player_creatures[0].base_stats
+
+    # Compacting again copies the summary through unchanged
+    journal_on.log.append(*journal.stats_allocated(None, "nobody", {"luck": 3}))
+    assert asyncio.run(journal_on.compact())["games_folded"] == 0
+    assert len(list(journal_on.log.records())) == len(records) + 1
+
+
+def test_rotate_async_seals_the_active_segment(tmp_path):
+    log = EventLog(str(tmp_path / "log"))
+    assert asyncio.run(log.rotate_async()) is None
+    log.append(1, b"sealed")
+    assert asyncio.run(log.rotate_async()) == 1
+    log.append(2, b"active")
+    assert log.sealed_count == 1
+    assert list(log.records()) == [(1, b"sealed"), (2, b"active")]
+    log.close()
+
+
+def test_unfinished_compaction_is_discarded_on_restart(tmp_path):
+    directory = str(tmp_path / "log")
+    log = EventLog(directory)
+    log.append(1, b"kept")
+    log.rotate()
+    log.close()
+    with open(os.path.join(directory, "compacted-00000001.log.tmp"), "wb") as file:
+        file.write(b"partial")
+
+    reopened = EventLog(directory)
+    assert list(reopened.records()) == [(1, b"kept")]
+    assert not any(name.endswith(".tmp") for name in os.listdir(directory))
+    reopened.close()
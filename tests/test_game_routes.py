@@ -1,6 +1,9 @@
+import sys
 import pytest
 from fastapi.testclient import TestClient
 from src.backend.app import app
+from src.backend.middleware.rate_limit import TokenBucketLimiter
+from src.backend.routes import game_routes
 
 client = TestClient(app)
 
@@ -69,3 +72,234 @@ def test_allocate_stats_invalid_points():
         "stat_allocations": {"speed": 3, "health": 1}  # 4 points
     })
     assert resp.status_code == 400
+
+# Dedicated client address so these tests get their own rate-limit bucket
+move_client = TestClient(app, client=("move-tests", 50000))
+
+
+def _start_game(name="Streamer", http=move_client):
+    create_resp = http.post("/creatures", json={"name": name, "creature_type": "dragon"})
+    creature_id = create_resp.json()["id"]
+    start_resp = http.post("/game/start", json={
+        "num_players": 1,
+        "creature_ids": [creature_id],
+        "tournament_size": 4
+    })
+    return start_resp.json()["game_id"], creature_id
+
+
+class FakeNarrator:
+    async def stream_narration(self, event):
+        for token in ["The ", "crowd ", "roars!"]:
+            yield token
+
+
+def test_submit_move_returns_before_narration(monkeypatch):
+    monkeypatch.setattr(game_routes, "get_narrator", lambda: None)
+    game_id, creature_id = _start_game()
+    resp = move_client.post(f"/game/{game_id}/move", json={"creature_id": creature_id, "move_type": "attack"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["narration"] is None
+    assert data["narration_pending"] is True
+    assert data["narration_stream_url"] == f"/game/{game_id}/narration/stream?after=0"
+    assert len(game_routes.games_db[game_id].pending_narrations) == 1
+
+
+def test_narration_stream_emits_tokens(monkeypatch):
+    monkeypatch.setattr(game_routes, "get_narrator", lambda: FakeNarrator())
+    game_id, creature_id = _start_game()
+    move = move_client.post(f"/game/{game_id}/move", json={"creature_id": creature_id, "move_type": "attack"})
+    resp = move_client.get(move.json()["narration_stream_url"])
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    body = resp.text
+    assert body.count("event: token") == 3
+    assert '"text": "The crowd roars!"' in body
+    assert body.rstrip().endswith("event: end\ndata: {}")
+    # Every reader gets the narration past its own cursor; nothing is drained
+    assert move_client.get(move.json()["narration_stream_url"]).text == body
+    assert "event: token" not in move_client.get(f"/game/{game_id}/narration/stream?after=1").text
+
+
+def test_narration_stream_not_found():
+    resp = move_client.get("/game/invalid_id/narration/stream")
+    assert resp.status_code == 404
+
+
+def test_battle_socket_move_and_narration(monkeypatch):
+    monkeypatch.setattr(game_routes, "get_narrator", lambda: FakeNarrator())
+    game_id, creature_id = _start_game("Socketeer")
+    # Queued before the socket connected, so it is not narrated to it
+    game = game_routes.games_db[game_id]
+    game.narration_count = 1
+    game.pending_narrations.append({"round": 0, "seq": 1})
+    with move_client.websocket_connect(f"/game/{game_id}/ws") as ws:
+        state = ws.receive_json()
+        assert state["type"] == "state"
+        assert state["game_id"] == game_id
+
+        ws.send_json({"type": "move", "creature_id": creature_id, "move_type": "attack"})
+        result = ws.receive_json()
+        assert result["type"] == "move_result"
+        assert len(result["current_match"]["latest_results"]) >= 2
+
+        tokens = [ws.receive_json() for _ in range(3)]
+        assert [t["type"] for t in tokens] == ["narration_token"] * 3
+        narration = ws.receive_json()
+        assert narration == {"type": "narration", "round": 1, "text": "The crowd roars!"}
+        ws.send_json({"type": "state"})
+        assert ws.receive_json()["type"] == "state"
+
+
+def test_battle_socket_reports_errors():
+    game_id, creature_id = _start_game("Socketeer2")
+    with move_client.websocket_connect(f"/game/{game_id}/ws") as ws:
+        ws.receive_json()
+        ws.send_json({"type": "move", "creature_id": creature_id, "move_type": "dance"})
+        error = ws.receive_json()
+        assert error["type"] == "error"
+        assert error["status_code"] == 400
+
+        ws.send_json({"type": "move"})
+        assert ws.receive_json()["type"] == "error"
+
+        ws.send_json({"type": "state"})
+        assert ws.receive_json()["type"] == "state"
+
+        ws.send_text("{not json")
+        assert ws.receive_json()["type"] == "error"
+        ws.send_bytes(b"{}")
+        assert ws.receive_json()["type"] == "error"
+        ws.send_json({"type": "state"})
+        assert ws.receive_json()["type"] == "state"
+
+
+def test_battle_socket_moves_are_rate_limited(monkeypatch):
+    monkeypatch.setattr(game_routes, "get_narrator", lambda: None)
+    game_id, creature_id = _start_game("Socketeer3")
+    # Room for exactly one move
+    limiter = TokenBucketLimiter(capacity=game_routes.WS_MOVE_COST, rate_per_second=0.001)
+    monkeypatch.setattr(sys.modules["src.backend.app"], "rate_limiter", limiter)
+    with move_client.websocket_connect(f"/game/{game_id}/ws") as ws:
+        ws.receive_json()
+        ws.send_json({"type": "move", "creature_id": creature_id, "move_type": "attack"})
+        assert ws.receive_json()["type"] == "move_result"
+        while ws.receive_json()["type"] != "narration":
+            pass
+        ws.send_json({"type": "move", "creature_id": creature_id, "move_type": "attack"})
+        error = ws.receive_json()
+        assert error["type"] == "error"
+        assert error["status_code"] == 429
+        assert error["retry_after"] >= 1
+
+
+def test_move_is_published_to_spectators(monkeypatch):
+    monkeypatch.setattr(game_routes, "get_narrator", lambda: None)
+    game_id, creature_id = _start_game("Showboat")
+    subscription = game_routes.spectator_hub.subscribe(game_id)
+    try:
+        move_client.post(f"/game/{game_id}/move", json={"creature_id": creature_id, "move_type": "attack"})
+        assert len(subscription.queue) == 1
+        assert subscription.queue[0].startswith("event: match_update\n")
+    finally:
+        game_routes.spectator_hub.unsubscribe(subscription)
+
+
+def test_move_without_spectators_skips_state_build(monkeypatch):
+    monkeypatch.setattr(game_routes, "get_narrator", lambda: None)
+    game_id, creature_id = _start_game("Unwatched")
+    built = []
+    monkeypatch.setattr(game_routes, "build_game_state", lambda game: built.append(game) or {})
+    resp = move_client.post(f"/game/{game_id}/move", json={"creature_id": creature_id, "move_type": "attack"})
+    assert resp.status_code == 200
+    assert built == []
+
+
+def test_spectate_not_found():
+    resp = move_client.get("/game/invalid_id/spectate")
+    assert resp.status_code == 404
+
+
+# Batch and state tests spend more of a bucket, so they get their own
+batch_client = TestClient(app, client=("batch-tests", 50000))
+state_client = TestClient(app, client=("state-tests", 50000))
+
+
+def test_batch_moves_sequence():
+    game_id, creature_id = _start_game("Batcher", batch_client)
+    resp = batch_client.post(f"/game/{game_id}/moves", json={
+        "creature_id": creature_id,
+        "moves": ["attack", "defend"]
+    })
+    assert resp.status_code == 200
+    data = resp.json()
+    assert 1 <= data["turns_played"] <= 2
+    assert data["turns"][0]["player_move"] == "attack"
+    assert data["turns"][0]["turn"] == 1
+    # Batch play skips narration unless asked for
+    assert data["final"]["narration_pending"] is False
+    assert not game_routes.games_db[game_id].pending_narrations
+
+
+def test_batch_moves_auto_finishes_match():
+    game_id, creature_id = _start_game("Autopilot", batch_client)
+    resp = batch_client.post(f"/game/{game_id}/moves", json={"creature_id": creature_id, "policy": "auto"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["final"]["match_just_completed"] is True
+    last_turn = data["turns"][-1]
+    assert last_turn["player_hp"] == 0 or last_turn["opponent_hp"] == 0
+
+
+def test_batch_moves_invalid_requests():
+    game_id, creature_id = _start_game("Batcher2", batch_client)
+    both = batch_client.post(f"/game/{game_id}/moves", json={
+        "creature_id": creature_id, "moves": ["attack"], "policy": "auto"
+    })
+    assert both.status_code == 400
+    bad_move = batch_client.post(f"/game/{game_id}/moves", json={"creature_id": creature_id, "moves": ["dance"]})
+    assert bad_move.status_code == 400
+    bad_policy = batch_client.post(f"/game/{game_id}/moves", json={"creature_id": creature_id, "policy": "random"})
+    assert bad_policy.status_code == 400
+    missing = batch_client.post("/game/invalid_id/moves", json={"creature_id": creature_id, "policy": "auto"})
+    assert missing.status_code == 404
+
+
+def test_game_state_versions_and_deltas(monkeypatch):
+    monkeypatch.setattr(game_routes, "get_narrator", lambda: None)
+    game_id, creature_id = _start_game("Versioned", state_client)
+    full = state_client.get(f"/game/{game_id}/state").json()
+    assert full["version"] == 0
+    assert full["delta"] is False
+
+    unchanged = state_client.get(f"/game/{game_id}/state", params={"since": 0})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert unchanged.headers["x-state-version"] == "0"
+
+    state_client.post(f"/game/{game_id}/move", json={"creature_id": creature_id, "move_type": "attack"})
+    delta = state_client.get(f"/game/{game_id}/state", params={"since": 0}).json()
+    assert delta["delta"] is True
+    assert delta["version"] == 1
+    match_changes = delta["changes"]["current_match"]
+    assert match_changes["turn_number"] == 1
+    assert "creature1_name" not in match_changes
+
+    stale = state_client.get(f"/game/{game_id}/state", params={"since": 99}).json()
+    assert stale["delta"] is False
+    assert stale["current_match"]["creature1_name"]
+
+
+def test_game_state_etag(monkeypatch):
+    monkeypatch.setattr(game_routes, "get_narrator", lambda: None)
+    game_id, creature_id = _start_game("Tagged", state_client)
+    first = state_client.get(f"/game/{game_id}/state")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+    cached = state_client.get(f"/game/{game_id}/state", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    state_client.post(f"/game/{game_id}/move", json={"creature_id": creature_id, "move_type": "attack"})
+    changed = state_client.get(f"/game/{game_id}/state", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
@@ -1,6 +1,6 @@
 import pytest
 from datetime import datetime
-from src.backend.models.game_state import Match, TournamentBracket, GameState
+from src.backend.models.game_state import MAX_PENDING_NARRATIONS, Match, TournamentBracket, GameState
 from src.backend.models.creature import Creature, CreatureType
 from src.backend.models.move import Move, MoveType, MoveResult
 
@@ -134,3 +134,12 @@ def test_tournament_bracket_empty_matches():
 def test_game_state_empty_player_creatures():
     gs = GameState(game_id="g1", num_players=1, player_creatures=[], tournament=None)
     assert gs.player_creatures == []
+
+def test_game_state_pending_narrations_keep_the_newest():
+    gs = GameState(game_id="g1", num_players=1)
+    for turn in range(MAX_PENDING_NARRATIONS + 5):
+        gs.pending_narrations.append({"round": turn})
+    assert len(gs.pending_narrations) == MAX_PENDING_NARRATIONS
+    assert gs.pending_narrations[0] == {"round": 5}
+    restored = GameState(game_id="g1", num_players=1, pending_narrations=list(gs.pending_narrations) * 2)
+    assert len(restored.pending_narrations) == MAX_PENDING_NARRATIONS
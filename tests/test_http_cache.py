@@ -0,0 +1,17 @@
+from src.backend.routes.http_cache import etag_for_bytes, etag_matches
+
+
+def test_etag_for_bytes_is_stable_and_quoted():
+    etag = etag_for_bytes(b"payload")
+    assert etag == etag_for_bytes(b"payload")
+    assert etag != etag_for_bytes(b"other")
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+def test_etag_matches():
+    assert not etag_matches(None, '"a"')
+    assert etag_matches('"a"', '"a"')
+    assert etag_matches('"b", "a"', '"a"')
+    assert etag_matches('W/"a"', '"a"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches('"b"', '"a"')
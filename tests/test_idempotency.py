@@ -0,0 +1,194 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from src.backend.app import app
+from src.backend.routes import game_routes
+from src.backend.routes.idempotency import IdempotencyCache, provisional
+from src.backend.routes.serializers import FastJSONResponse
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_retry_replays_without_running_again():
+    cache = IdempotencyCache()
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        return FastJSONResponse({"turn": len(calls)})
+
+    async def main():
+        first = await cache.respond("game-1", "key-1", "body", handler)
+        second = await cache.respond("game-1", "key-1", "body", handler)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert len(calls) == 1
+    assert second.body == first.body
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert cache.stats()["replays"] == 1
+
+
+def test_concurrent_duplicates_wait_for_the_first():
+    cache = IdempotencyCache()
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return FastJSONResponse({"ok": True})
+
+    async def main():
+        return await asyncio.gather(*(cache.respond("game-1", "key-1", "body", handler) for _ in range(5)))
+
+    responses = asyncio.run(main())
+    assert len(calls) == 1
+    assert {response.body for response in responses} == {b'{"ok":true}'}
+
+
+def test_failures_are_not_stored_and_key_reuse_is_rejected():
+    cache = IdempotencyCache()
+    outcomes = [HTTPException(status_code=400, detail="No active match"), None]
+
+    async def handler():
+        error = outcomes.pop(0)
+        if error is not None:
+            raise error
+        return FastJSONResponse({"ok": True})
+
+    async def main():
+        with pytest.raises(HTTPException):
+            await cache.respond("game-1", "key-1", "body", handler)
+        await cache.respond("game-1", "key-1", "body", handler)
+        with pytest.raises(HTTPException) as excinfo:
+            await cache.respond("game-1", "key-1", "other body", handler)
+        return excinfo.value
+
+    error = asyncio.run(main())
+    assert outcomes == []
+    assert error.status_code == 422
+
+
+def test_keys_expire_and_are_capped_per_game():
+    clock = Clock()
+    cache = IdempotencyCache(ttl_seconds=10, max_keys_per_game=2, max_games=2, clock=clock)
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        return FastJSONResponse({})
+
+    async def main():
+        for key in ["a", "b", "c"]:
+            await cache.respond("game-1", key, "body", handler)
+        assert cache.stats()["keys"] == 2
+        # "a" was dropped to stay under the cap, so it runs again
+        await cache.respond("game-1", "a", "body", handler)
+        assert len(calls) == 4
+
+        clock.now = 11
+        await cache.respond("game-2", "a", "body", handler)
+        # game-1's keys all expired, so the game is dropped
+        assert cache.stats() == {"games": 1, "keys": 1, "replays": 0}
+
+    asyncio.run(main())
+
+
+def test_provisional_responses_resume_on_retry():
+    cache = IdempotencyCache()
+    turn = {"resolved": False}
+
+    async def resume():
+        if turn["resolved"]:
+            return FastJSONResponse({"waiting": False})
+        return provisional(FastJSONResponse({"waiting": True}), resume)
+
+    async def main():
+        first = await cache.respond("game-1", "key-1", "body", resume)
+        again = await cache.respond("game-1", "key-1", "body", resume)
+        turn["resolved"] = True
+        resolved = await cache.respond("game-1", "key-1", "body", resume)
+        turn["resolved"] = False
+        replayed = await cache.respond("game-1", "key-1", "body", resume)
+        return first, again, resolved, replayed
+
+    first, again, resolved, replayed = asyncio.run(main())
+    assert first.body == again.body == b'{"waiting":true}'
+    assert resolved.body == replayed.body == b'{"waiting":false}'
+    assert replayed.headers["Idempotent-Replayed"] == "true"
+    assert cache.replays == 1
+
+
+# Dedicated client address so these tests get their own rate-limit bucket
+idempotency_client = TestClient(app, client=("idempotency-tests", 50000))
+
+
+def _start_game():
+    create_resp = idempotency_client.post("/creatures", json={"name": "Retrier", "creature_type": "dragon"})
+    creature_id = create_resp.json()["id"]
+    start_resp = idempotency_client.post("/game/start", json={
+        "num_players": 1,
+        "creature_ids": [creature_id],
+        "tournament_size": 4
+    })
+    return start_resp.json()["game_id"], creature_id
+
+
+def test_move_retry_with_same_key_plays_once(monkeypatch):
+    monkeypatch.setattr(game_routes, "get_narrator", lambda: None)
+    game_id, creature_id = _start_game()
+    move = {"creature_id": creature_id, "move_type": "attack"}
+    headers = {"Idempotency-Key": "move-1"}
+
+    first = idempotency_client.post(f"/game/{game_id}/move", json=move, headers=headers)
+    version = game_routes.games_db[game_id].version
+    retry = idempotency_client.post(f"/game/{game_id}/move", json=move, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert game_routes.games_db[game_id].version == version
+
+    # A new key plays another turn
+    idempotency_client.post(f"/game/{game_id}/move", json=move, headers={"Idempotency-Key": "move-2"})
+    assert game_routes.games_db[game_id].version > version
+
+
+def test_idempotency_key_reused_for_other_endpoint():
+    game_id, creature_id = _start_game()
+    headers = {"Idempotency-Key": "shared"}
+    idempotency_client.post(f"/game/{game_id}/move", json={"creature_id": creature_id, "move_type": "defend"}, headers=headers)
+    resp = idempotency_client.post(f"/game/{game_id}/allocate-stats", json={
+        "creature_id": creature_id,
+        "stat_allocations": {"speed": 3}
+    }, headers=headers)
+    assert resp.status_code == 422
+
+
+def test_pvp_move_retry_after_the_opponent_moved_gets_the_resolved_turn(monkeypatch):
+    monkeypatch.setattr(game_routes, "get_narrator", lambda: None)
+    monkeypatch.setattr(game_routes, "OPPONENT_WAIT_SECONDS", 0.01)
+    ids = [
+        idempotency_client.post("/creatures", json={"name": name, "creature_type": "jacob"}).json()["id"]
+        for name in ("Patient", "Late")
+    ]
+    idempotency_client.post("/game/matchmaking", json={"creature_id": ids[0], "rating": 5000})
+    game_id = idempotency_client.post("/game/matchmaking", json={"creature_id": ids[1], "rating": 5000}).json()["game_id"]
+
+    move = {"creature_id": ids[0], "move_type": "attack"}
+    headers = {"Idempotency-Key": "pvp-1"}
+    first = idempotency_client.post(f"/game/{game_id}/move", json=move, headers=headers).json()
+    assert first["waiting_for_opponent"] is True
+    second = idempotency_client.post(f"/game/{game_id}/move", json={"creature_id": ids[1], "move_type": "defend"})
+
+    retry = idempotency_client.post(f"/game/{game_id}/move", json=move, headers=headers).json()
+    assert retry["waiting_for_opponent"] is False
+    assert retry["current_match"]["turn_number"] == 1
+    assert retry["current_match"]["latest_results"] == second.json()["current_match"]["latest_results"]
@@ -0,0 +1,43 @@
+import asyncio
+from src.backend.logic.locks import KeyedLocks
+
+
+def test_same_key_shares_a_lock_while_in_use():
+    locks = KeyedLocks()
+    lock, other = locks.lock("game-1"), locks.lock("game-2")
+    assert locks.lock("game-1") is lock
+    assert other is not lock
+    assert len(locks) == 2
+
+
+def test_idle_locks_are_dropped():
+    locks = KeyedLocks()
+
+    async def use():
+        async with locks.lock("game-1"):
+            assert locks.locked("game-1")
+            assert len(locks) == 1
+
+    asyncio.run(use())
+    assert len(locks) == 0
+    assert not locks.locked("game-1")
+
+
+def test_serializes_one_key_and_leaves_others_parallel():
+    locks = KeyedLocks()
+    events = []
+
+    async def change(key, name):
+        async with locks.lock(key):
+            events.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} end")
+
+    async def main():
+        await asyncio.gather(change("game-1", "a"), change("game-1", "b"), change("game-2", "c"))
+
+    asyncio.run(main())
+    assert events.index("a end") < events.index("b start")
+    # The other game started while game-1 was still locked
+    assert events.index("c start") < events.index("a end")
+    assert len(locks) == 0
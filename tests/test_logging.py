@@ -0,0 +1,91 @@
+import io
+import json
+import logging
+import pytest
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.models.game_state import GameState, Match, TournamentBracket
+from src.backend.observability import LogPipeline, SamplingFilter
+from src.backend.observability.log import parse_levels
+
+
+STATS = {"strength": 10, "defense": 5, "speed": 5, "health": 20, "luck": 1}
+
+
+def make_creature(name):
+    return Creature(
+        id=name, name=name, creature_type=CreatureType.DRAGON, base_stats=STATS, stat_allocations=STATS,
+        is_ai=name != "A", current_hp=20, max_hp=20
+    )
+
+
+def make_game():
+    creatures = [make_creature(name) for name in ("A", "B", "C", "D")]
+    matches = [
+        Match(match_id="m1", creature1=creatures[2], creature2=creatures[3], bracket_round=0),
+        Match(match_id="m2", creature1=creatures[0], creature2=creatures[1], bracket_round=0),
+    ]
+    bracket = TournamentBracket(bracket_id="b1", total_rounds=2, matches=matches)
+    return GameState(game_id="g1", num_players=1, player_creatures=[creatures[0]], tournament=bracket)
+
+
+def test_parse_levels():
+    assert parse_levels("") == {}
+    assert parse_levels("src.backend.models=debug, src.backend.storage=WARNING") == {
+        "src.backend.models": logging.DEBUG,
+        "src.backend.storage": logging.WARNING,
+    }
+    with pytest.raises(ValueError):
+        parse_levels("src.backend.models")
+    with pytest.raises(ValueError):
+        parse_levels("src.backend.models=LOUD")
+
+
+def test_sampling_filter_only_samples_debug_records():
+    samples = iter([0.05, 0.5])
+    sampler = SamplingFilter(0.1, sample=lambda: next(samples))
+    debug = logging.LogRecord("x", logging.DEBUG, "", 0, "debug", None, None)
+    warning = logging.LogRecord("x", logging.WARNING, "", 0, "warning", None, None)
+    assert sampler.filter(debug)
+    assert not sampler.filter(debug)
+    # Consumes no sample
+    assert sampler.filter(warning)
+
+
+def test_get_current_match_does_not_print(capsys):
+    game = make_game()
+    assert game.get_current_match().match_id == "m2"
+    assert capsys.readouterr().out == ""
+
+
+def test_get_current_match_logs_at_debug(caplog):
+    game = make_game()
+    with caplog.at_level(logging.INFO, logger="src.backend"):
+        game.get_current_match()
+    assert caplog.records == []
+
+    with caplog.at_level(logging.DEBUG, logger="src.backend.models.game_state"):
+        game.get_current_match()
+    assert [record.game_id for record in caplog.records] == ["g1", "g1"]
+    assert "m2" in caplog.records[-1].getMessage()
+
+
+def test_pipeline_writes_json_with_extra_fields():
+    stream = io.StringIO()
+    pipeline = LogPipeline(level=logging.INFO, levels={"src.backend.models": logging.DEBUG}, stream=stream)
+    pipeline.start()
+    try:
+        make_game().get_current_match()
+        logging.getLogger("src.backend.storage.tests").debug("below the package level")
+        logging.getLogger("src.backend.storage.tests").warning("Flush failed for %s", "g1", extra={"rows": 3})
+    finally:
+        pipeline.stop()
+        logging.getLogger("src.backend.models").setLevel(logging.NOTSET)
+        logging.getLogger("src.backend").setLevel(logging.NOTSET)
+
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [entry["level"] for entry in entries] == ["DEBUG", "DEBUG", "WARNING"]
+    assert entries[0]["logger"] == "src.backend.models.game_state"
+    assert entries[0]["game_id"] == "g1"
+    assert entries[-1]["message"] == "Flush failed for g1"
+    assert entries[-1]["rows"] == 3
+    assert logging.getLogger("src.backend").propagate
@@ -0,0 +1,133 @@
+import asyncio
+import uuid
+import pytest
+from httpx import ASGITransport, AsyncClient
+from src.backend.app import app
+from src.backend.logic.matchmaking import MatchmakingQueue, TurnSynchronizer, creature_power
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.routes import game_routes
+
+
+def make_creature(name="Duelist"):
+    creature = Creature.create_with_biases(name=name, creature_type=CreatureType.JACOB)
+    creature.id = str(uuid.uuid4())
+    return creature
+
+
+def test_first_player_waits():
+    queue = MatchmakingQueue()
+    ticket, opponent = queue.join(make_creature(), rating=50)
+    assert opponent is None
+    assert len(queue) == 1
+    assert ticket.to_dict()["status"] == "waiting"
+
+
+def test_pairs_closest_rating():
+    queue = MatchmakingQueue(max_rating_gap=15)
+    low, _ = queue.join(make_creature(), rating=10)
+    high, _ = queue.join(make_creature(), rating=90)
+    mid, _ = queue.join(make_creature(), rating=60)
+    assert len(queue) == 3
+    ticket, opponent = queue.join(make_creature(), rating=70)
+    assert opponent is mid
+    assert len(queue) == 2
+    queue.complete(ticket, opponent, "game-1")
+    assert ticket.game_id == opponent.game_id == "game-1"
+    assert queue.get(mid.ticket_id).to_dict()["status"] == "matched"
+    assert queue.get(low.ticket_id) is low and queue.get(high.ticket_id) is high
+
+
+def test_rating_gap_limit():
+    queue = MatchmakingQueue(max_rating_gap=5)
+    queue.join(make_creature(), rating=10)
+    _, opponent = queue.join(make_creature(), rating=20)
+    assert opponent is None
+    assert len(queue) == 2
+
+
+def test_duplicate_creature_rejected():
+    queue = MatchmakingQueue()
+    creature = make_creature()
+    queue.join(creature)
+    with pytest.raises(ValueError):
+        queue.join(creature)
+
+
+def test_cancel():
+    queue = MatchmakingQueue()
+    ticket, _ = queue.join(make_creature(), rating=30)
+    assert queue.cancel(ticket.ticket_id)
+    assert not queue.cancel(ticket.ticket_id)
+    assert len(queue) == 0
+
+
+def test_cancelled_tickets_are_skipped():
+    queue = MatchmakingQueue(max_rating_gap=30)
+    near, _ = queue.join(make_creature(), rating=50)
+    far, _ = queue.join(make_creature(), rating=90)
+    assert queue.cancel(near.ticket_id)
+    assert queue.join(make_creature(), rating=60)[1] is far
+    assert len(queue) == 0
+    # Nothing live is left within reach, so the next player waits
+    assert queue.join(make_creature(), rating=50)[1] is None
+    assert len(queue) == 1
+
+
+def test_default_rating_is_creature_power():
+    creature = make_creature()
+    ticket, _ = MatchmakingQueue().join(creature)
+    assert ticket.rating == creature_power(creature)
+
+
+@pytest.mark.asyncio
+async def test_wait_wakes_on_match():
+    queue = MatchmakingQueue()
+    ticket, _ = queue.join(make_creature(), rating=40)
+    waiter = asyncio.create_task(queue.wait(ticket.ticket_id, timeout=1))
+    await asyncio.sleep(0)
+    other, opponent = queue.join(make_creature(), rating=41)
+    queue.complete(other, opponent, "game-2")
+    assert (await waiter).game_id == "game-2"
+
+
+@pytest.mark.asyncio
+async def test_turn_synchronizer():
+    turns = TurnSynchronizer()
+    waiter = asyncio.create_task(turns.wait(("match", 0), timeout=1))
+    await asyncio.sleep(0)
+    turns.resolve(("match", 0), "outcome")
+    assert await waiter == "outcome"
+    assert await turns.wait(("match", 1), timeout=0.01) is None
+    assert len(turns) == 0
+
+
+@pytest.mark.asyncio
+async def test_pvp_match_flow(monkeypatch):
+    monkeypatch.setattr(game_routes, "get_narrator", lambda: None)
+    transport = ASGITransport(app=app, client=("pvp-tests", 50000))
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        ids = []
+        for name in ("Red", "Blue"):
+            resp = await client.post("/creatures", json={"name": name, "creature_type": "jacob"})
+            ids.append(resp.json()["id"])
+
+        first = await client.post("/game/matchmaking", json={"creature_id": ids[0], "rating": 100})
+        assert first.json()["status"] == "waiting"
+        second = await client.post("/game/matchmaking", json={"creature_id": ids[1], "rating": 100})
+        assert second.json()["status"] == "matched"
+        polled = await client.get(f"/game/matchmaking/{first.json()['ticket_id']}", params={"timeout": 0})
+        game_id = polled.json()["game_id"]
+        assert game_id == second.json()["game_id"]
+
+        first_move = asyncio.create_task(
+            client.post(f"/game/{game_id}/move", json={"creature_id": ids[0], "move_type": "attack"})
+        )
+        await asyncio.sleep(0.05)
+        assert not first_move.done()
+        second_move = await client.post(f"/game/{game_id}/move", json={"creature_id": ids[1], "move_type": "defend"})
+        first_resp = (await first_move).json()
+        second_resp = second_move.json()
+
+        assert first_resp["waiting_for_opponent"] is False
+        assert first_resp["current_match"]["turn_number"] == 1
+        assert first_resp["current_match"]["latest_results"] == second_resp["current_match"]["latest_results"]
@@ -0,0 +1,87 @@
+import asyncio
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.storage import MemoryStore, StoreSweeper, estimate_game_bytes
+from src.backend.logic.tournament import TournamentManager
+from src.backend.models.game_state import GameState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_idle_entries_expire_on_access_and_sweep():
+    clock = FakeClock()
+    store = MemoryStore("test", ttl_seconds=10, clock=clock)
+    store["a"] = 1
+    store["b"] = 2
+    clock.now = 6
+    assert store["a"] == 1  # refreshes a
+    clock.now = 12
+    assert "b" not in store
+    assert store.sweep() == 0
+    clock.now = 20
+    assert store.sweep() == 1
+    assert len(store) == 0
+    assert store.stats()["evictions"] == {"ttl": 2, "capacity": 0}
+
+
+def test_max_entries_evicts_least_recently_used():
+    evicted = []
+    store = MemoryStore("test", max_entries=2, on_evict=lambda key, value, reason: evicted.append((key, reason)))
+    store["a"] = 1
+    store["b"] = 2
+    store["a"]
+    store["c"] = 3
+    assert set(store) == {"a", "c"}
+    assert evicted == [("b", "capacity")]
+
+
+def test_max_bytes_tracks_in_place_growth():
+    sizes = {"a": 10, "b": 10}
+    store = MemoryStore("test", max_bytes=25, size_of=lambda value: sizes[value])
+    store["a"] = "a"
+    store["b"] = "b"
+    assert store.total_bytes == 20
+    sizes["b"] = 20
+    store.mark_dirty("b")
+    assert list(store) == ["b"]
+    assert store.total_bytes == 20
+
+
+def test_peek_and_values_do_not_refresh_recency():
+    store = MemoryStore("test", max_entries=2)
+    store["a"] = 1
+    store["b"] = 2
+    assert store.peek("a") == 1
+    assert store.values() == [1, 2]
+    store["c"] = 3
+    assert "a" not in store
+
+
+def test_game_estimate_grows_with_move_history():
+    creature = Creature.create_with_biases(name="Sizer", creature_type=CreatureType.GNOME)
+    tournament = TournamentManager.create_tournament(player_creatures=[creature], tournament_size=4)
+    game = GameState(game_id="g", num_players=1, player_creatures=[creature], tournament=tournament)
+    before = estimate_game_bytes(game)
+    tournament.matches[0].move_history.append({"turn": 1})
+    assert estimate_game_bytes(game) > before
+
+
+def test_sweeper_runs_in_background():
+    clock = FakeClock()
+    store = MemoryStore("test", ttl_seconds=1, clock=clock)
+    store["a"] = 1
+    clock.now = 5
+
+    async def run():
+        sweeper = StoreSweeper([store], interval_seconds=0.01)
+        sweeper.start()
+        await asyncio.sleep(0.05)
+        await sweeper.stop()
+
+    asyncio.run(run())
+    assert len(store) == 0
@@ -0,0 +1,60 @@
+from fastapi.testclient import TestClient
+from src.backend.app import app
+from src.backend.observability import Registry
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    fast = latency.labels("/fast")
+    fast.observe(0.05)
+    fast.observe(0.1)
+    fast.observe(3.0)
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{route="/fast",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{route="/fast",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/fast",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/fast"} 3' in text
+
+
+def test_counters_gauges_and_callbacks():
+    registry = Registry()
+    turns = registry.counter("turns_total", "Turns.")
+    turns.inc()
+    turns.inc(2)
+    errors = registry.counter("errors_total", "Errors.", ("reason",))
+    errors.labels('say "hi"\n').inc()
+    registry.gauge("depth", "Depth.", function=lambda: 7)
+    registry.callback("shed_total", "Shed.", "counter", lambda: [({"reason": "timeout"}, 4)])
+    text = registry.render()
+    assert "turns_total 3" in text
+    assert 'errors_total{reason="say \\"hi\\"\\n"} 1' in text
+    assert "depth 7" in text
+    assert 'shed_total{reason="timeout"} 4' in text
+
+
+def test_metrics_endpoint_reports_routes_and_turns():
+    metrics_client = TestClient(app, client=("metrics-tests", 50000))
+    create_resp = metrics_client.post("/creatures", json={"name": "Measured", "creature_type": "dragon"})
+    creature_id = create_resp.json()["id"]
+    game_id = metrics_client.post("/game/start", json={
+        "num_players": 1, "creature_ids": [creature_id], "tournament_size": 4
+    }).json()["game_id"]
+    metrics_client.post(f"/game/{game_id}/move", json={"creature_id": creature_id, "move_type": "attack"})
+
+    resp = metrics_client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+    assert 'route="/game/{game_id}/move",status="200"' in text
+    assert "pet_battler_http_requests_in_flight 1" in text
+    turns = next(line for line in text.splitlines() if line.startswith("pet_battler_combat_turns_total "))
+    assert float(turns.split()[1]) >= 1
+    for name in ["pet_battler_games_active", "pet_battler_rate_limit_rejections_total",
+                 "pet_battler_admission_shed_total", "pet_battler_narration_duration_seconds",
+                 "pet_battler_store_evictions_total", "pet_battler_store_bytes",
+                 "pet_battler_store_hits_total", "pet_battler_store_misses_total"]:
+        assert f"# TYPE {name}" in text
+    assert 'pet_battler_store_evictions_total{store="games",reason="ttl"}' in text
+    assert 'pet_battler_store_hits_total{store="creatures"}' in text
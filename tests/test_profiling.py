@@ -0,0 +1,110 @@
+import asyncio
+import cProfile
+import pstats
+import sys
+from fastapi.testclient import TestClient
+from src.backend.app import app
+from src.backend.middleware.profiling import ProfilingMiddleware
+from src.backend.observability import ProfileStore, RequestProfiler
+
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def make_profile():
+    profile = cProfile.Profile()
+    profile.enable()
+    sorted(range(100), key=str)
+    profile.disable()
+    return profile
+
+
+def call(middleware, path="/creatures", headers=()):
+    """Run one request through the middleware. Returns the response headers."""
+    scope = {"type": "http", "method": "GET", "path": path, "headers": list(headers)}
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, None, send))
+    return dict(sent[0]["headers"])
+
+
+def test_store_keeps_the_newest_profiles(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=2)
+    for index in range(3):
+        store.save(f"2026-{index}", make_profile(), {"path": f"/{index}"})
+
+    assert [entry["id"] for entry in store.list()] == ["2026-2", "2026-1"]
+    assert store.path("2026-0") is None
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "2026-1.json", "2026-1.prof", "2026-2.json", "2026-2.prof"
+    ]
+    assert pstats.Stats(str(store.path("2026-2"))).total_calls > 0
+
+    reopened = ProfileStore(str(tmp_path), max_profiles=1)
+    assert [entry["id"] for entry in reopened.list()] == ["2026-2"]
+    assert not (tmp_path / "2026-1.prof").exists()
+
+
+def test_requests_with_the_token_are_profiled(tmp_path):
+    profiler = RequestProfiler(ProfileStore(str(tmp_path)), token="secret")
+    middleware = ProfilingMiddleware(endpoint, profiler)
+
+    assert b"x-profile-id" not in call(middleware)
+    assert b"x-profile-id" not in call(middleware, headers=[(b"x-profile-token", b"wrong")])
+    # Admin requests are never profiled, even with the token
+    assert b"x-profile-id" not in call(middleware, path="/admin/profiles", headers=[(b"x-profile-token", b"secret")])
+    assert b"x-profile-id" not in call(middleware, path="/admin/load", headers=[(b"x-profile-token", b"secret")])
+    headers = call(middleware, headers=[(b"x-profile-token", b"secret")])
+
+    profile_id = headers[b"x-profile-id"].decode()
+    [entry] = profiler.store.list()
+    assert entry["id"] == profile_id
+    assert entry["path"] == "/creatures"
+    assert entry["status"] == 200
+    assert entry["trigger"] == "token"
+    assert profiler.stats()["taken"] == {"token": 1, "sampled": 0}
+
+
+def test_sampling_skips_unsampled_paths_and_busy_profiler(tmp_path):
+    profiler = RequestProfiler(ProfileStore(str(tmp_path)), sample_rate=0.5, sample=lambda: 0.25)
+    middleware = ProfilingMiddleware(endpoint, profiler)
+
+    assert b"x-profile-id" in call(middleware)
+    assert b"x-profile-id" not in call(middleware, path="/metrics")
+    assert b"x-profile-id" not in call(middleware, path="/admin/profiles/some-id")
+
+    profiler.active = True
+    assert b"x-profile-id" not in call(middleware)
+    assert profiler.busy == 1
+    assert profiler.taken == {"token": 0, "sampled": 1}
+
+
+def test_admin_profile_endpoints(tmp_path, monkeypatch):
+    admin_client = TestClient(app, client=("profiling-tests", 50000))
+    monkeypatch.setattr(sys.modules["src.backend.app"], "request_profiler", None)
+    assert admin_client.get("/admin/profiles").status_code == 404
+
+    profiler = RequestProfiler(ProfileStore(str(tmp_path)), token="secret")
+    profiler.store.save("2026-0", make_profile(), {"path": "/creatures"})
+    monkeypatch.setattr(sys.modules["src.backend.app"], "request_profiler", profiler)
+    token = {"X-Profile-Token": "secret"}
+
+    assert admin_client.get("/admin/profiles").status_code == 403
+    assert admin_client.get("/admin/profiles/2026-0", headers={"X-Profile-Token": "wrong"}).status_code == 403
+    listing = admin_client.get("/admin/profiles", headers=token).json()
+    assert [entry["id"] for entry in listing["profiles"]] == ["2026-0"]
+    assert listing["profiling"]["stored"] == 1
+
+    download = admin_client.get("/admin/profiles/2026-0", headers=token)
+    assert download.status_code == 200
+    assert download.content == (tmp_path / "2026-0.prof").read_bytes()
+    assert admin_client.get("/admin/profiles/missing", headers=token).status_code == 404
+
+    # Without a configured token nobody can read the profiles
+    profiler.token = None
+    assert admin_client.get("/admin/profiles", headers=token).status_code == 403
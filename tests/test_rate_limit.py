@@ -1,68 +1,205 @@
+import asyncio
 import pytest
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from src.backend.middleware.rate_limit import RateLimitMiddleware
+from src.backend.middleware.rate_limit import RateLimitMiddleware, TokenBucketLimiter
+
 
 class DummyApp:
+    def __init__(self):
+        self.calls = 0
+
     async def __call__(self, scope, receive, send):
-        pass
+        self.calls += 1
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+def call(middleware, host, path="/creatures", method="GET"):
+    """Send one HTTP request through the middleware; returns (status, headers)."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
 
-class DummyRequest:
-    def __init__(self, host):
-        self.client = type('client', (), {'host': host})
+    scope = {"type": "http", "method": method, "path": path, "client": (host, 1234) if host is not None else None}
+    asyncio.run(middleware(scope, receive, send))
+    return messages[0]["status"], dict(messages[0]["headers"])
 
-@pytest.mark.asyncio
-async def test_rate_limit_typical():
+
+def test_rate_limit_typical():
     app = DummyApp()
     middleware = RateLimitMiddleware(app, requests_per_minute=2)
-    request = DummyRequest("127.0.0.1")
-    async def call_next(req):
-        return "ok"
-    # First request
-    response = await middleware.dispatch(request, call_next)
-    assert response == "ok"
-    # Second request
-    response = await middleware.dispatch(request, call_next)
-    assert response == "ok"
-
-@pytest.mark.asyncio
-async def test_rate_limit_exceeded():
-    app = DummyApp()
-    middleware = RateLimitMiddleware(app, requests_per_minute=1)
-    request = DummyRequest("127.0.0.1")
-    async def call_next(req):
-        return "ok"
-    await middleware.dispatch(request, call_next)
-    with pytest.raises(Exception):
-        await middleware.dispatch(request, call_next)
-
-@pytest.mark.asyncio
-async def test_rate_limit_different_ips():
-    app = DummyApp()
-    middleware = RateLimitMiddleware(app, requests_per_minute=1)
-    request1 = DummyRequest("127.0.0.1")
-    request2 = DummyRequest("192.168.1.1")
-    async def call_next(req):
-        return "ok"
-    await middleware.dispatch(request1, call_next)
-    await middleware.dispatch(request2, call_next)
-
-@pytest.mark.asyncio
-async def test_rate_limit_null_ip():
+    assert call(middleware, "127.0.0.1")[0] == 200
+    assert call(middleware, "127.0.0.1")[0] == 200
+    assert app.calls == 2
+
+
+def test_rate_limit_exceeded():
     app = DummyApp()
     middleware = RateLimitMiddleware(app, requests_per_minute=1)
-    request = DummyRequest(None)
-    async def call_next(req):
-        return "ok"
-    response = await middleware.dispatch(request, call_next)
-    assert response == "ok"
-
-@pytest.mark.asyncio
-async def test_rate_limit_zero_limit():
-    app = DummyApp()
-    middleware = RateLimitMiddleware(app, requests_per_minute=0)
-    request = DummyRequest("127.0.0.1")
-    async def call_next(req):
-        return "ok"
-    with pytest.raises(Exception):
-        await middleware.dispatch(request, call_next)
+    call(middleware, "127.0.0.1")
+    status, headers = call(middleware, "127.0.0.1")
+    assert status == 429
+    assert 1 <= int(headers[b"retry-after"]) <= 60
+    # Rejected requests never reach the app
+    assert app.calls == 1
+
+
+def test_rate_limit_different_ips():
+    middleware = RateLimitMiddleware(DummyApp(), requests_per_minute=1)
+    assert call(middleware, "127.0.0.1")[0] == 200
+    assert call(middleware, "192.168.1.1")[0] == 200
+
+
+def test_rate_limit_null_ip():
+    middleware = RateLimitMiddleware(DummyApp(), requests_per_minute=1)
+    assert call(middleware, None)[0] == 200
+
+
+def test_rate_limit_zero_limit():
+    middleware = RateLimitMiddleware(DummyApp(), requests_per_minute=0)
+    assert call(middleware, "127.0.0.1")[0] == 429
+
+
+def test_rate_limit_exempt_paths():
+    middleware = RateLimitMiddleware(DummyApp(), requests_per_minute=0)
+    assert call(middleware, "127.0.0.1", "/health")[0] == 200
+    assert call(middleware, "127.0.0.1", "/static/css/styles.css")[0] == 200
+    assert call(middleware, "127.0.0.1", "/healthz")[0] == 429
+
+
+def test_rate_limit_route_costs():
+    middleware = RateLimitMiddleware(
+        DummyApp(),
+        requests_per_minute=4,
+        route_costs=[("POST", "/game/{game_id}/move", 3.0)]
+    )
+    assert middleware.cost("POST", "/game/abc/move") == 3.0
+    assert middleware.cost("GET", "/game/abc/move") == 1.0
+    assert call(middleware, "127.0.0.1", "/game/abc/move", "POST")[0] == 200
+    # One token left: a cheap request fits, another move does not
+    assert call(middleware, "127.0.0.1", "/game/abc/move", "POST")[0] == 429
+    assert call(middleware, "127.0.0.1", "/game/abc/state")[0] == 200
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_over_time():
+    clock = Clock()
+    limiter = TokenBucketLimiter(capacity=2, rate_per_second=1, clock=clock)
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == pytest.approx(1.0)
+    clock.now = 0.5
+    assert limiter.acquire("a") == pytest.approx(0.5)
+    clock.now = 1.0
+    assert limiter.acquire("a") == 0
+    # Refill stops at capacity
+    clock.now = 100.0
+    assert [limiter.acquire("a") for _ in range(3)][:2] == [0, 0]
+    assert limiter.rejected == 3
+
+
+def test_token_bucket_caps_clients_lru():
+    limiter = TokenBucketLimiter(capacity=1, rate_per_second=0.001, max_clients=2, clock=Clock())
+    limiter.acquire("a")
+    limiter.acquire("b")
+    limiter.acquire("a")
+    limiter.acquire("c")
+    assert len(limiter) == 2
+    # "a" is still tracked with an empty bucket; "b" was least recently seen and
+    # was dropped, so it starts over with a full one
+    assert limiter.acquire("a") > 0
+    assert limiter.acquire("b") == 0
+
+
+def test_token_bucket_evicts_idle_clients():
+    clock = Clock()
+    limiter = TokenBucketLimiter(capacity=10, rate_per_second=1, sweep_interval_seconds=5, clock=clock)
+    limiter.acquire("a")
+    clock.now = 4
+    limiter.acquire("b")
+    clock.now = 10
+    assert limiter.evict_idle() == 1
+    assert len(limiter) == 1
+    # The periodic sweep runs from acquire once the interval has passed
+    clock.now = 20
+    limiter.acquire("c")
+    assert len(limiter) == 1
+    assert limiter.evicted == 2
+
+
+from src.backend.middleware.rate_limit import SharedTokenBucketLimiter
+from src.backend.storage import SharedSQLiteRepository
+
+
+def _workers(tmp_path, count, clock, lease_tokens):
+    # Repositories on one file stand in for worker processes
+    path = str(tmp_path / "limits.db")
+    return [
+        SharedTokenBucketLimiter(SharedSQLiteRepository(path), capacity=10, rate_per_second=1,
+                                 lease_tokens=lease_tokens, clock=clock)
+        for _ in range(count)
+    ]
+
+
+def test_shared_limiter_enforces_one_limit_across_workers(tmp_path):
+    clock = Clock()
+    workers = _workers(tmp_path, 3, clock, lease_tokens=0)
+    admitted = sum(workers[i % 3].acquire("a") == 0 for i in range(30))
+    assert admitted == 10
+    clock.now = 2
+    assert workers[0].acquire("a") == 0
+    assert workers[1].acquire("a") == 0
+    assert workers[2].acquire("a") == pytest.approx(1.0)
+
+
+def test_shared_limiter_leases_stay_within_tolerance(tmp_path):
+    clock = Clock()
+    workers = _workers(tmp_path, 3, clock, lease_tokens=2)
+    admitted = 0
+    for step in range(600):
+        clock.now = step * 0.1
+        admitted += workers[step % 3].acquire("a") == 0
+    # A single bucket admits 10 up front plus one per second
+    exact = 10 + 60
+    assert exact - 3 * 2 <= admitted <= exact + 3 * 2
+    # Most requests were served from a lease without a database round trip
+    assert sum(worker.round_trips for worker in workers) < 600
+
+
+def test_shared_limiter_forgets_idle_clients(tmp_path):
+    clock = Clock()
+    worker = _workers(tmp_path, 1, clock, lease_tokens=2)[0]
+    worker.acquire("a")
+    clock.now = 100
+    assert worker.evict_idle() == 1
+    assert len(worker) == 0
+    assert worker.repository.forget_full_buckets(clock.now) == 0
+
+
+def test_shared_limiter_decides_locally_while_the_database_is_locked(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "limits.db")
+    worker = SharedTokenBucketLimiter(SharedSQLiteRepository(path, busy_timeout_ms=1), capacity=2,
+                                      rate_per_second=1, lease_tokens=0, clock=clock)
+    holder = SharedSQLiteRepository(path)
+    with holder.transaction():
+        assert worker.acquire("a") == 0
+        assert worker.acquire("a") == 0
+        assert worker.acquire("a") == pytest.approx(1.0)
+        clock.now = 200
+        assert worker.evict_idle() == 1
+    assert worker.fallbacks == 3
+    assert worker.rejected == 1
+    # Back on the shared bucket once the lock is free
+    assert worker.acquire("a") == 0
+    assert worker.fallbacks == 3
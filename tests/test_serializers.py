@@ -0,0 +1,93 @@
+import json
+from src.backend.logic.tournament import TournamentManager
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.models.game_state import GameState
+from src.backend.observability import encoding
+from src.backend.routes import serializers
+from src.backend.routes.serializers import (
+    FastJSONResponse,
+    diff_game_state,
+    state_history,
+    serialize_creature,
+    serialize_game_state,
+    serialize_match,
+)
+
+
+def make_game():
+    creature = Creature.create_with_biases(name="Hero", creature_type=CreatureType.DRAGON)
+    creature.id = "hero-id"
+    tournament = TournamentManager.create_tournament([creature], tournament_size=4)
+    return GameState(game_id="game-id", num_players=1, player_creatures=[creature], tournament=tournament)
+
+
+def test_serialize_match_fields():
+    game = make_game()
+    match = game.tournament.matches[0]
+    state = serialize_match(match)
+    assert state["creature1_name"] == "Hero"
+    assert state["creature1_type"] == "dragon"
+    assert state["creature1_hp"] == match.creature1.current_hp
+    assert state["winner_name"] is None
+    assert "latest_results" not in state
+    assert serialize_match(match, latest_results=["hit"])["latest_results"] == ["hit"]
+
+
+def test_static_state_cached_but_dynamic_fields_fresh():
+    match = make_game().tournament.matches[0]
+    first = serialize_match(match)
+    match.creature1.current_hp -= 5
+    match.turn_number += 1
+    second = serialize_match(match)
+    assert match._static_state is not None
+    assert second["creature1_hp"] == first["creature1_hp"] - 5
+    assert second["turn_number"] == first["turn_number"] + 1
+
+
+def test_serialize_game_state_champion():
+    game = make_game()
+    assert serialize_game_state(game)["champion_name"] is None
+    game.set_champion("hero-id")
+    assert serialize_game_state(game)["champion_name"] == "Hero"
+
+
+def test_serialize_creature_shape():
+    data = serialize_creature(make_game().player_creatures[0])
+    assert set(data) == {
+        "id", "name", "creature_type", "stats", "current_hp", "max_hp", "defend_uses", "special_uses"
+    }
+    assert data["stats"]["health"] == data["max_hp"]
+
+
+def test_fast_json_response_with_and_without_orjson(monkeypatch):
+    payload = {"name": "Hëro", "values": [1, 2]}
+    assert json.loads(FastJSONResponse(payload).body) == payload
+    monkeypatch.setattr(encoding, "orjson", None)
+    assert FastJSONResponse(payload).body == '{"name":"Hëro","values":[1,2]}'.encode("utf-8")
+
+
+def test_dumps_default_with_and_without_orjson(monkeypatch):
+    payload = {"kind": object, "ids": [1]}
+    encoded = encoding.dumps(payload, default=str)
+    monkeypatch.setattr(encoding, "orjson", None)
+    assert encoding.dumps(payload, default=str) == encoded == b'{"kind":"<class \'object\'>","ids":[1]}'
+
+
+def test_diff_game_state():
+    old = {"tournament_complete": False, "current_match": {"match_id": "m1", "creature1_hp": 10, "turn_number": 0}}
+    same_match = {"tournament_complete": False, "current_match": {"match_id": "m1", "creature1_hp": 7, "turn_number": 1}}
+    assert diff_game_state(old, same_match) == {"current_match": {"creature1_hp": 7, "turn_number": 1}}
+    new_match = {"tournament_complete": True, "current_match": {"match_id": "m2", "creature1_hp": 20, "turn_number": 0}}
+    assert diff_game_state(old, new_match) == new_match
+    assert diff_game_state(old, old) == {}
+
+
+def test_state_history_reuses_snapshot_per_version():
+    game = make_game()
+    history = state_history(game)
+    first = history.snapshot(game)
+    assert history.snapshot(game) is first
+    game.bump_version()
+    assert history.snapshot(game) is not first
+    assert history.get(0) is first
+    assert state_history(game) is history
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import pytest
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.routes import creature_routes, game_routes
+from src.backend.storage import SharedSQLiteRepository, SharedStore, StorageBusyError
+
+
+def make_creature(creature_id, name="Shared"):
+    creature = Creature.create_with_biases(name=name, creature_type=CreatureType.CERBERUS)
+    creature.id = creature_id
+    return creature
+
+
+@pytest.fixture
+def stores(tmp_path):
+    # Two repositories on one file stand in for two worker processes
+    path = str(tmp_path / "shared.db")
+    return (
+        SharedStore("creatures", SharedSQLiteRepository(path)),
+        SharedStore("creatures", SharedSQLiteRepository(path)),
+    )
+
+
+def test_writes_are_visible_to_other_workers(stores):
+    first, second = stores
+    first["c1"] = make_creature("c1")
+    assert "c1" in second
+    assert second["c1"].name == "Shared"
+    assert "missing" not in second
+
+
+def test_cached_values_are_revalidated(stores):
+    first, second = stores
+    creature = make_creature("c1")
+    first["c1"] = creature
+    cached = second["c1"]
+    assert second["c1"] is cached
+
+    creature.base_stats.speed = 15
+    first.mark_dirty("c1")
+    reloaded = second["c1"]
+    assert reloaded is not cached
+    assert reloaded.base_stats.speed == 15
+    assert second.stats()["loads"] == 2
+
+
+def test_failed_transaction_rolls_back(stores):
+    first, second = stores
+    first["c1"] = make_creature("c1")
+    with pytest.raises(RuntimeError):
+        with first.transaction():
+            creature = first["c1"]
+            creature.name = "Renamed"
+            first.mark_dirty("c1")
+            raise RuntimeError("handler failed")
+    assert second["c1"].name == "Shared"
+    assert first["c1"].name == "Shared"
+
+
+def test_transaction_holds_the_write_lock(tmp_path):
+    path = str(tmp_path / "shared.db")
+    first = SharedStore("creatures", SharedSQLiteRepository(path))
+    second = SharedStore("creatures", SharedSQLiteRepository(path, busy_timeout_ms=50))
+    first["c1"] = make_creature("c1")
+    with first.transaction():
+        with pytest.raises(StorageBusyError, match="locked"):
+            second["c2"] = make_creature("c2")
+    second["c2"] = make_creature("c2")
+    assert first.repository.count("creatures") == 2
+
+
+def test_poll_changes_reports_new_and_updated_rows(stores):
+    first, second = stores
+    first["c1"] = make_creature("c1", "One")
+    first["c2"] = make_creature("c2", "Two")
+    assert [creature.name for creature in second.poll_changes()] == ["One", "Two"]
+    assert second.poll_changes() == []
+
+    creature = first["c1"]
+    creature.name = "Uno"
+    first.mark_dirty("c1")
+    assert [creature.name for creature in second.poll_changes()] == ["Uno"]
+
+
+def test_moves_write_player_creatures_back(tmp_path, monkeypatch):
+    path = str(tmp_path / "shared.db")
+    repository = SharedSQLiteRepository(path)
+    monkeypatch.setattr(creature_routes, "creatures_db", SharedStore("creatures", repository))
+    monkeypatch.setattr(game_routes, "games_db", SharedStore("games", repository))
+    monkeypatch.setattr(game_routes, "get_narrator", lambda: None)
+
+    creature = make_creature("fighter")
+    creature_routes.store_creature(creature)
+    response = asyncio.run(game_routes.start_game(
+        game_routes.StartGameRequest(creature_ids=[creature.id], tournament_size=4)
+    ))
+    game_id = json.loads(response.body)["game_id"]
+    game = game_routes.games_db[game_id]
+    [player] = game.player_creatures
+    while player.current_hp == player.max_hp and not game.is_complete:
+        request = game_routes.SubmitMoveRequest(creature_id=player.id, move_type="attack")
+        asyncio.run(game_routes.play_move(game_id, request))
+
+    # Another worker sees the creature as the game left it
+    other = SharedSQLiteRepository(path)
+    other_game = SharedStore("games", other)[game_id]
+    assert SharedStore("creatures", other)[player.id].current_hp == other_game.player_creatures[0].current_hp
+    assert other_game.player_creatures[0].current_hp == player.current_hp < player.max_hp
+
+
+def test_busy_storage_answers_503(monkeypatch):
+    from fastapi.testclient import TestClient
+    from src.backend.app import app
+
+    def locked():
+        raise StorageBusyError("shared.db is locked by another worker")
+
+    monkeypatch.setattr(game_routes.games_db, "transaction", locked)
+    resp = TestClient(app, client=("busy-tests", 50000)).post(
+        "/game/busy-game/move", json={"creature_id": "c1", "move_type": "attack"}
+    )
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "1"
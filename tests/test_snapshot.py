@@ -0,0 +1,122 @@
+import pytest
+from src.backend.logic.tournament import TournamentManager
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.models.game_state import GameState
+from src.backend.storage import MemoryStore, SnapshotError, restore_snapshot, write_snapshot
+from src.backend.storage.codec import encode
+from src.backend.storage.snapshot import HEADER, MAGIC, RECORD, SECTIONS
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_game(index):
+    creature = Creature.create_with_biases(name=f"Snap{index}", creature_type=CreatureType.PYTHON)
+    creature.id = f"creature-{index}"
+    tournament = TournamentManager.create_tournament(player_creatures=[creature], tournament_size=4)
+    return GameState(game_id=f"game-{index}", num_players=1, player_creatures=[creature], tournament=tournament)
+
+
+def fill_stores(count):
+    creatures, games = MemoryStore("creatures"), MemoryStore("games")
+    for index in range(count):
+        game = make_game(index)
+        games[game.game_id] = game
+        creatures[game.player_creatures[0].id] = game.player_creatures[0]
+    return {"creatures": creatures, "games": games}
+
+
+def test_round_trip_decodes_games_lazily(tmp_path):
+    path = str(tmp_path / "state.snap")
+    assert write_snapshot(path, fill_stores(3)) == 6
+
+    restored = {"creatures": MemoryStore("creatures"), "games": MemoryStore("games")}
+    assert restore_snapshot(path, restored, eager=("creatures",)) == {"creatures": 3, "games": 3}
+    games = restored["games"]
+    assert len(games) == 3
+    assert games.stats()["undecoded"] == 3
+    assert restored["creatures"].stats()["undecoded"] == 0
+
+    game = games["game-1"]
+    assert game.player_creatures[0].name == "Snap1"
+    assert games.stats()["undecoded"] == 2
+    assert "missing" not in games
+
+
+def test_undecoded_records_are_copied_into_the_next_snapshot(tmp_path):
+    first, second = str(tmp_path / "first.snap"), str(tmp_path / "second.snap")
+    write_snapshot(first, fill_stores(2))
+    stores = {"creatures": MemoryStore("creatures"), "games": MemoryStore("games")}
+    restore_snapshot(first, stores)
+    stores["games"]["game-0"].version = 7
+
+    write_snapshot(second, stores)
+    again = {"creatures": MemoryStore("creatures"), "games": MemoryStore("games")}
+    restore_snapshot(second, again)
+    assert again["games"]["game-0"].version == 7
+    assert again["games"]["game-1"].game_id == "game-1"
+
+
+def test_idle_time_carries_across_restarts(tmp_path):
+    path = str(tmp_path / "state.snap")
+    clock = FakeClock()
+    games = MemoryStore("games", ttl_seconds=60, clock=clock)
+    games["old"] = make_game(0)
+    clock.now += 50
+    games["new"] = make_game(1)
+    clock.now += 20
+    write_snapshot(path, {"games": games})
+    assert sorted(key for key, _, _ in games.encoded_items()) == ["new"]
+
+    restored = MemoryStore("games", ttl_seconds=60, clock=clock)
+    restore_snapshot(path, {"games": restored})
+    assert list(restored) == ["new"]
+    clock.now += 45
+    assert "new" not in restored
+
+
+def test_values_are_compressed_and_version_1_files_still_load(tmp_path):
+    stores = fill_stores(20)
+    path = tmp_path / "state.snap"
+    write_snapshot(str(path), stores)
+    encoded_bytes = sum(len(data) for store in stores.values() for _, _, data in store.encoded_items())
+    assert path.stat().st_size < encoded_bytes / 2
+
+    game = make_game(7)
+    record = RECORD.pack(SECTIONS["games"], len(b"game-7"), len(encode(game)), 0.0) + b"game-7" + encode(game)
+    old = tmp_path / "version1.snap"
+    old.write_bytes(HEADER.pack(MAGIC, 1) + record + bytes([0]))
+    games = MemoryStore("games")
+    assert restore_snapshot(str(old), {"games": games}) == {"games": 1}
+    assert games["game-7"].player_creatures[0].name == "Snap7"
+
+
+def test_after_load_runs_on_lazy_decode(tmp_path):
+    path = str(tmp_path / "state.snap")
+    write_snapshot(path, fill_stores(1))
+    loaded = []
+    games = MemoryStore("games", after_load=lambda game: loaded.append(game.game_id) or game)
+    restore_snapshot(path, {"games": games})
+    assert loaded == []
+    games["game-0"]
+    assert loaded == ["game-0"]
+
+
+def test_rejects_bad_files(tmp_path):
+    assert restore_snapshot(str(tmp_path / "missing.snap"), {}) is None
+
+    bogus = tmp_path / "bogus.snap"
+    bogus.write_bytes(b"not a snapshot at all")
+    with pytest.raises(SnapshotError):
+        restore_snapshot(str(bogus), {"games": MemoryStore("games")})
+
+    path = tmp_path / "truncated.snap"
+    write_snapshot(str(path), fill_stores(1))
+    path.write_bytes(path.read_bytes()[:-10])
+    with pytest.raises(SnapshotError):
+        restore_snapshot(str(path), {"games": MemoryStore("games")})
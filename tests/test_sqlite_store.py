@@ -0,0 +1,87 @@
+import asyncio
+from src.backend.logic.tournament import TournamentManager
+from src.backend.models.creature import Creature, CreatureType
+from src.backend.models.game_state import GameState
+from src.backend.storage import PersistentStore, SQLiteRepository, WriteBehindFlusher
+
+
+def make_game(game_id="g1"):
+    creature = Creature.create_with_biases(name="Saved", creature_type=CreatureType.KRAKEN)
+    creature.id = f"{game_id}-creature"
+    tournament = TournamentManager.create_tournament(player_creatures=[creature], tournament_size=4)
+    return GameState(game_id=game_id, num_players=1, player_creatures=[creature], tournament=tournament)
+
+
+def test_flush_then_lazy_load(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = PersistentStore("games", SQLiteRepository(path))
+    game = make_game()
+    store[game.game_id] = game
+    assert store.dirty_count == 1
+    assert asyncio.run(store.flush()) == 1
+    assert store.dirty_count == 0
+
+    reopened = PersistentStore("games", SQLiteRepository(path))
+    assert len(reopened) == 0
+    assert "g1" in reopened
+    loaded = reopened["g1"]
+    assert loaded.game_id == "g1"
+    assert reopened.loads == 1
+    # Shared references inside the game survive the round trip
+    player = loaded.player_creatures[0]
+    first_match = loaded.tournament.matches[0]
+    assert player is first_match.creature1 or player is first_match.creature2
+
+
+def test_mutations_are_written_on_next_flush(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = PersistentStore("games", SQLiteRepository(path))
+    game = make_game()
+    store[game.game_id] = game
+    asyncio.run(store.flush())
+
+    game.bump_version()
+    store.mark_dirty(game.game_id)
+    asyncio.run(store.flush())
+    assert PersistentStore("games", SQLiteRepository(path))["g1"].version == 1
+
+
+def test_dirty_entries_survive_eviction_until_flushed(tmp_path):
+    store = PersistentStore("games", SQLiteRepository(str(tmp_path / "state.db")), max_entries=1)
+    store["g1"] = make_game("g1")
+    store["g2"] = make_game("g2")
+    assert store.stats()["pending_evicted"] == 1
+    assert store["g1"].game_id == "g1"
+
+    asyncio.run(store.flush())
+    assert store.stats()["pending_evicted"] == 0
+    assert store.repository.count("games") == 2
+    assert store.peek("g2").game_id == "g2"
+
+
+def test_after_load_and_missing_keys(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = PersistentStore("games", SQLiteRepository(path))
+    store["g1"] = make_game()
+    asyncio.run(store.flush())
+
+    seen = []
+    reopened = PersistentStore("games", SQLiteRepository(path), after_load=lambda game: seen.append(game) or game)
+    assert "missing" not in reopened
+    assert reopened.peek("missing") is None
+    reopened["g1"]
+    assert [game.game_id for game in seen] == ["g1"]
+
+
+def test_flusher_flushes_on_stop(tmp_path):
+    store = PersistentStore("creatures", SQLiteRepository(str(tmp_path / "state.db")))
+
+    async def run():
+        flusher = WriteBehindFlusher([store], interval_seconds=60)
+        flusher.start()
+        store["c1"] = make_game().player_creatures[0]
+        await flusher.stop()
+
+    asyncio.run(run())
+    assert store.repository.count("creatures") == 1
+    assert [creature.name for creature in store.load_all()] == ["Saved"]
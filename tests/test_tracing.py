@@ -0,0 +1,95 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from src.backend.app import app
+from src.backend.observability import BatchSpanExporter, InMemorySpanCollector, JsonlSpanSink, TRACER, Tracer
+from src.backend.observability.tracing import NOOP_SPAN, STATUS_ERROR
+
+
+@pytest.fixture
+def collector():
+    spans = InMemorySpanCollector()
+    exporter = BatchSpanExporter(spans)
+    TRACER.start(exporter)
+    yield spans
+    TRACER.stop()
+
+
+def test_spans_nest_and_carry_otel_fields():
+    spans = InMemorySpanCollector()
+    tracer = Tracer()
+    tracer.start(BatchSpanExporter(spans))
+    with tracer.start_span("outer", attributes={"game.id": "g1"}) as outer:
+        with tracer.start_span("inner"):
+            pass
+        with pytest.raises(ValueError):
+            with tracer.start_span("failing"):
+                raise ValueError("bad move")
+        outer.set_attribute("turns", 2)
+    tracer.stop()
+
+    inner, failing, root = spans.spans
+    assert root["name"] == "outer"
+    assert root["parent_span_id"] == ""
+    assert len(root["trace_id"]) == 32 and len(root["span_id"]) == 16
+    assert root["attributes"] == {"game.id": "g1", "turns": 2}
+    assert root["kind"] == "SPAN_KIND_INTERNAL"
+    assert root["start_time_unix_nano"] <= inner["start_time_unix_nano"] <= inner["end_time_unix_nano"]
+    assert inner["trace_id"] == failing["trace_id"] == root["trace_id"]
+    assert inner["parent_span_id"] == failing["parent_span_id"] == root["span_id"]
+    assert failing["status"] == {"code": STATUS_ERROR, "message": "bad move"}
+    assert failing["attributes"]["exception.type"] == "ValueError"
+
+
+def test_tracing_off_and_unsampled_traces_record_nothing():
+    tracer = Tracer(sample=lambda: 0.9)
+    assert tracer.start_span("anything") is NOOP_SPAN
+
+    spans = InMemorySpanCollector()
+    tracer.start(BatchSpanExporter(spans), sample_rate=0.5)
+    with tracer.start_span("root"):
+        with tracer.start_span("child"):
+            pass
+    tracer.stop()
+    assert spans.spans == []
+
+
+def test_exporter_drops_spans_past_its_queue_and_writes_jsonl(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = BatchSpanExporter(JsonlSpanSink(str(path)), max_queue_size=2)
+    tracer = Tracer()
+    tracer.exporter = exporter  # not started: spans stay queued until stop()
+    for name in ("a", "b", "c"):
+        with tracer.start_span(name):
+            pass
+    assert exporter.stats() == {"exported": 0, "dropped": 1, "queued": 2}
+    exporter.stop()
+
+    lines = [json.loads(line) for line in path.read_bytes().splitlines()]
+    assert [line["name"] for line in lines] == ["a", "b"]
+    assert lines[0]["resource"] == {"service.name": "pet-battler"}
+
+
+def test_move_spans_cover_combat_ai_and_serialization(collector):
+    trace_client = TestClient(app, client=("tracing-tests", 50000))
+    creature_id = trace_client.post("/creatures", json={"name": "Traced", "creature_type": "dragon"}).json()["id"]
+    game_id = trace_client.post("/game/start", json={
+        "num_players": 1, "creature_ids": [creature_id], "tournament_size": 4
+    }).json()["game_id"]
+    collector.spans.clear()
+    resp = trace_client.post(f"/game/{game_id}/move", json={"creature_id": creature_id, "move_type": "attack"})
+    assert resp.status_code == 200
+    TRACER.exporter.flush()
+
+    [root] = collector.named("submit_move")
+    assert root["kind"] == "SPAN_KIND_SERVER"
+    assert root["attributes"]["game.id"] == game_id
+    [apply] = collector.named("apply_move")
+    assert apply["parent_span_id"] == root["span_id"]
+    for name in ("AIOpponentGenerator.decide_move", "CombatEngine.execute_moves"):
+        [span] = collector.named(name)
+        assert span["parent_span_id"] == apply["span_id"]
+    for name in ("build_move_response", "serialize_response"):
+        [span] = collector.named(name)
+        assert span["parent_span_id"] == root["span_id"]
+    assert {span["trace_id"] for span in collector.spans} == {root["trace_id"]}